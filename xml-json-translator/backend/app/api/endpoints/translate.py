@@ -1,21 +1,29 @@
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse  # Make sure this is imported too
+from functools import partial
 import json
 import logging
 import os
 import tempfile
-from typing import Optional, List
+import zipfile
+from typing import Dict, Optional, List
 
 from app.core.config import get_settings, Settings
+from app.core.exceptions import TranslationServiceError
 from app.models.translation import Language, SupportedLanguagesResponse, TranslationResponse
 from app.services.translation_factory import TranslationServiceFactory
-from app.utils.xml_processor import XMLProcessor
+from app.utils.xml_processor import SegmentStats, Translators, XMLProcessor
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Create an instance of XML processor
-xml_processor = XMLProcessor()
+_settings = get_settings()
+xml_processor = XMLProcessor(
+    max_concurrency=_settings.TRANSLATION_MAX_CONCURRENCY,
+    batch_size=_settings.TRANSLATION_BATCH_SIZE
+)
 
 @router.get("/languages", response_model=SupportedLanguagesResponse)
 async def get_supported_languages(
@@ -33,37 +41,169 @@ async def get_supported_languages(
         raise HTTPException(status_code=500, detail=f"Failed to get supported languages: {str(e)}")
 
 
+@router.get("/stats")
+async def get_translation_stats():
+    """
+    Get runtime statistics of the translation memory and caches
+    """
+    return TranslationServiceFactory.get_stats()
+
+
+def _validate_profile(profile: Optional[str], settings: Settings) -> None:
+    """Reject generation profiles that are not configured"""
+    if profile and profile not in settings.HUGGINGFACE_GENERATION_PROFILES:
+        available = ", ".join(settings.HUGGINGFACE_GENERATION_PROFILES)
+        raise HTTPException(status_code=400, detail=f"Unknown profile '{profile}'. Available profiles: {available}")
+
+
+def _parse_target_languages(target_language: Optional[str], target_languages: Optional[str]) -> List[str]:
+    """
+    Target languages of a request
+    
+    Returns:
+        The comma-separated target_languages without duplicates, or an empty list
+        for a single-language request
+    """
+    languages = list(dict.fromkeys(
+        language.strip() for language in (target_languages or "").split(",") if language.strip()
+    ))
+    if not languages and not target_language:
+        raise HTTPException(status_code=400, detail="target_language or target_languages is required")
+    return languages
+
+
+def _make_translators(
+    languages: List[str], service_type: Optional[str], profile: Optional[str], json_fields: bool = False
+) -> Translators:
+    """Translation functions for each target language of a fan-out request"""
+    if json_fields:
+        translate = TranslationServiceFactory.translate_json_field
+        translate_batch = TranslationServiceFactory.translate_json_batch
+    else:
+        translate = TranslationServiceFactory.translate
+        translate_batch = TranslationServiceFactory.translate_batch
+    
+    return {
+        language: (
+            partial(translate, target_lang=language, service_type=service_type, profile=profile),
+            partial(translate_batch, target_lang=language, service_type=service_type, profile=profile),
+        )
+        for language in languages
+    }
+
+
+def _zip_response(
+    outputs: Dict[str, str],
+    filename: str,
+    extension: str,
+    timings: Dict[str, Dict[str, float]],
+    stats: SegmentStats,
+    background_tasks: BackgroundTasks
+) -> FileResponse:
+    """Pack the translated documents and timings.json into a zip and return it"""
+    original_name = os.path.splitext(filename)[0]
+    fd, temp_path = tempfile.mkstemp(suffix='.zip')
+    with os.fdopen(fd, 'wb') as tmp, zipfile.ZipFile(tmp, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for language, content in outputs.items():
+            archive.writestr(f"{original_name}_{language.lower()}.{extension}", content)
+        archive.writestr("timings.json", json.dumps(timings, indent=2))
+    
+    # Remove the temporary file after the response is sent
+    background_tasks.add_task(os.unlink, temp_path)
+    
+    # Total milliseconds per language, e.g. "fi=812.4;sv=640.2"
+    timing_header = ";".join(
+        f"{language}={sum(language_timings.values()):.1f}" for language, language_timings in timings.items()
+    )
+    output_filename = f"{original_name}_translations.zip"
+    return FileResponse(
+        path=temp_path,
+        media_type='application/zip',
+        filename=output_filename,
+        headers={
+            "Content-Disposition": f"attachment; filename={output_filename}",
+            "X-Translation-Timings": timing_header,
+            **stats.to_headers()
+        }
+    )
+
+
 @router.post("/xml", response_model=TranslationResponse)
 async def translate_xml_file(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    target_language: str = Form(...),
+    target_language: Optional[str] = Form(None),
+    target_languages: Optional[str] = Form(None),
     service_type: Optional[str] = Form(None),
+    profile: Optional[str] = Form(None),
     settings: Settings = Depends(get_settings)
 ):
     """
     Translate an XML file from English to the specified target language
+    
+    The optional profile (fast, balanced or quality) selects the generation
+    settings of the HuggingFace models. With a comma-separated target_languages
+    list the file is parsed once, translated into every language in parallel and
+    returned as a zip that includes per-language timings.
     """
     # Check file extension
     if not file.filename.lower().endswith('.xml'):
         raise HTTPException(status_code=400, detail="Only XML files are supported")
+    _validate_profile(profile, settings)
+    languages = _parse_target_languages(target_language, target_languages)
+    
+    if languages:
+        try:
+            content = await file.read()
+            stats = SegmentStats()
+            timings = {}
+            outputs = await run_in_threadpool(
+                xml_processor.process_xml_multi,
+                content.decode('utf-8'), _make_translators(languages, service_type, profile),
+                settings.TRANSLATION_FANOUT_MAX_WORKERS, stats, timings
+            )
+            return _zip_response(outputs, file.filename, 'xml', timings, stats, background_tasks)
+        except Exception as e:
+            logger.error(f"Error translating XML into {', '.join(languages)}: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Translation failed: {str(e)}")
     
     try:
-        # Read file content
-        content = await file.read()
-        xml_content = content.decode('utf-8')
-        
         # Create a translation function that will be called by the XML processor
         def translate_text(text):
-            return TranslationServiceFactory.translate(text, target_language, service_type)
+            return TranslationServiceFactory.translate(text, target_language, service_type, profile)
+        
+        # Batch function so all segments go to the service in one call
+        def translate_batch(texts):
+            return TranslationServiceFactory.translate_batch(texts, target_language, service_type, profile)
         
-        # Process the XML and translate the text
-        translated_xml = xml_processor.process_xml(xml_content, translate_text)
+        # Collect segment and deduplication counts for the response headers
+        stats = SegmentStats()
         
         # Create a temporary file to store the translated XML
         target_lang_suffix = target_language.lower()
         fd, temp_path = tempfile.mkstemp(suffix=f'_{target_lang_suffix}.xml')
-        with os.fdopen(fd, 'w', encoding='utf-8') as tmp:
-            tmp.write(translated_xml)
+        
+        if settings.XML_STREAMING_ENABLED:
+            # Stream the upload straight into the output file window by window
+            await file.seek(0)
+            with os.fdopen(fd, 'w', encoding='utf-8') as tmp:
+                await run_in_threadpool(
+                    xml_processor.process_xml_stream,
+                    file.file, tmp, translate_text, translate_batch,
+                    window_size=settings.XML_STREAM_WINDOW_SIZE, stats=stats
+                )
+        else:
+            # Read file content
+            content = await file.read()
+            xml_content = content.decode('utf-8')
+            
+            # Process the XML and translate the text off the event loop
+            translated_xml = await run_in_threadpool(
+                xml_processor.process_xml, xml_content, translate_text, translate_batch, stats
+            )
+            
+            with os.fdopen(fd, 'w', encoding='utf-8') as tmp:
+                tmp.write(translated_xml)
         
         # Generate output filename
         original_name = os.path.splitext(file.filename)[0]
@@ -74,7 +214,7 @@ async def translate_xml_file(
             path=temp_path,
             media_type='application/xml',
             filename=output_filename,
-            headers={"Content-Disposition": f"attachment; filename={output_filename}"}
+            headers={"Content-Disposition": f"attachment; filename={output_filename}", **stats.to_headers()}
         )
     
     except Exception as e:
@@ -86,16 +226,25 @@ async def translate_xml_file(
 async def translate_json_file(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    target_language: str = Form(...),
+    target_language: Optional[str] = Form(None),
+    target_languages: Optional[str] = Form(None),
     service_type: Optional[str] = Form(None),
+    profile: Optional[str] = Form(None),
     settings: Settings = Depends(get_settings)
 ):
     """
     Translate a JSON file from English to the specified target language
+    
+    The optional profile (fast, balanced or quality) selects the generation
+    settings of the HuggingFace models. With a comma-separated target_languages
+    list the file is parsed once, translated into every language in parallel and
+    returned as a zip that includes per-language timings.
     """
     # Check file extension
     if not file.filename.lower().endswith(('.json', '.jsonl')):
         raise HTTPException(status_code=400, detail="Only JSON files are supported")
+    _validate_profile(profile, settings)
+    languages = _parse_target_languages(target_language, target_languages)
     
     # Check file size
     file_size = 0
@@ -121,6 +270,26 @@ async def translate_json_file(
         except json.JSONDecodeError:
             raise HTTPException(status_code=400, detail="Invalid JSON file")
         
+        if languages:
+            # Claude has a JSON-specific prompt
+            translators = _make_translators(languages, service_type, profile, json_fields=service_type == 'claude')
+            stats = SegmentStats()
+            timings = {}
+            try:
+                outputs = await run_in_threadpool(
+                    xml_processor.process_json_multi,
+                    json_data, translators, settings.TRANSLATION_FANOUT_MAX_WORKERS, stats, timings
+                )
+            except Exception as e:
+                logger.exception(f"JSON processing error: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"JSON processing error: {str(e)}")
+            
+            serialized = {
+                language: json.dumps(translated, ensure_ascii=False, indent=2)
+                for language, translated in outputs.items()
+            }
+            return _zip_response(serialized, file.filename, 'json', timings, stats, background_tasks)
+        
         # Create a translation function that will be called by the processor
         def translate_text(text):
             if not text or text.isspace():
@@ -134,7 +303,10 @@ async def translate_json_file(
                     translate_text.service_type = service_type
                 
                 logger.debug(f"Translating text: {text[:50]}...")
-                return TranslationServiceFactory.translate(text, target_language, service_type)
+                return TranslationServiceFactory.translate(text, target_language, service_type, profile)
+            except TranslationServiceError:
+                # Fail the request instead of shipping the source text
+                raise
             except Exception as e:
                 logger.error(f"Translation error: {str(e)}")
                 return text  # Return original text on error
@@ -142,10 +314,22 @@ async def translate_json_file(
         # Flag whether we're using Claude
         is_claude = service_type == 'claude'
         
+        # Batch function so all fields go to the service in one call
+        def translate_batch(texts):
+            if is_claude:
+                return TranslationServiceFactory.translate_json_batch(texts, target_language, service_type, profile)
+            return TranslationServiceFactory.translate_batch(texts, target_language, service_type, profile)
+        
+        # Collect segment and deduplication counts for the response headers
+        stats = SegmentStats()
+        
         # Process the JSON and translate the text
         try:
             # Pass the is_claude flag to the processor
-            translated_json = xml_processor.process_json(json_data, translate_text, is_claude=is_claude)
+            translated_json = await run_in_threadpool(
+                xml_processor.process_json,
+                json_data, translate_text, is_claude=is_claude, translate_batch=translate_batch, stats=stats
+            )
         except Exception as e:
             logger.exception(f"JSON processing error: {str(e)}")
             raise HTTPException(status_code=500, detail=f"JSON processing error: {str(e)}")
@@ -168,7 +352,7 @@ async def translate_json_file(
             path=temp_path,
             media_type='application/json',
             filename=output_filename,
-            headers={"Content-Disposition": f"attachment; filename={output_filename}"}
+            headers={"Content-Disposition": f"attachment; filename={output_filename}", **stats.to_headers()}
         )
     
     except Exception as e:
@@ -1,5 +1,5 @@
 import os
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from functools import lru_cache
 from pydantic_settings import BaseSettings
 import logging
@@ -23,6 +23,9 @@ class Settings(BaseSettings):
     
     # Translation model settings
     MODEL_CACHE_DIR: str = os.getenv("MODEL_CACHE_DIR", "/tmp/huggingface")
+    # Models listed in MODEL_CACHE_DIR/manifest.json (written by download_models.py) load from local paths;
+    # verification checks every file checksum at startup
+    HUGGINGFACE_VERIFY_MANIFEST: bool = False
     
     # Hugging Face models configuration
     HUGGINGFACE_LANGUAGE_MODELS: Dict[str, str] = {
@@ -38,12 +41,114 @@ class Settings(BaseSettings):
         "ru": "Helsinki-NLP/opus-mt-en-ru",  # English to Russian
     }
     
+    # Startup warmup: languages loaded and warmed in the background; /ready waits for them
+    HUGGINGFACE_PRELOAD_LANGUAGES: List[str] = []
+    HUGGINGFACE_WARMUP_WORKERS: int = 4
+    # Report ready when some preloaded languages failed to warm; when all of them fail it never is
+    HUGGINGFACE_READY_WITH_FAILED_LANGUAGES: bool = False
+    
+    # Model store: convert checkpoints to safetensors under MODEL_CACHE_DIR/safetensors and memory-map
+    # them copy-on-write so worker processes share one copy of the weights in the page cache
+    HUGGINGFACE_MMAP_MODELS: bool = False
+    # Load HUGGINGFACE_PRELOAD_LANGUAGES at import time, in the master process before workers fork
+    HUGGINGFACE_PRELOAD_BEFORE_FORK: bool = False
+    
+    # Model residency: evict least recently used models above this footprint (0 = unlimited)
+    HUGGINGFACE_MODEL_MEMORY_BUDGET_MB: int = 0
+    HUGGINGFACE_PINNED_LANGUAGES: List[str] = []  # Languages that are never evicted
+    
+    # CPU inference: dynamic int8 quantization of Linear layers, cached under MODEL_CACHE_DIR/quantized
+    HUGGINGFACE_QUANTIZE: bool = False
+    
+    # Inference engine per language: "torch" (default) or "onnx" for ONNX Runtime on CPU,
+    # exported under MODEL_CACHE_DIR/onnx on first use and falling back to torch without it
+    HUGGINGFACE_LANGUAGE_ENGINES: Dict[str, str] = {}
+    HUGGINGFACE_ONNX_THREADS: int = 0  # Intra-op threads per ONNX session (0 = runtime default)
+    
+    # Process pool: run inference in N worker processes instead of request threads (0 = in-process)
+    HUGGINGFACE_WORKER_PROCESSES: int = 0
+    HUGGINGFACE_WORKER_THREADS: int = 0  # torch threads per worker (0 = cores / workers)
+    
+    # Batched inference: padded tokens per generate call and maximum inputs per batch
+    HUGGINGFACE_BATCH_TOKEN_BUDGET: int = 8192
+    HUGGINGFACE_MAX_BATCH_SIZE: int = 64
+    # Longer inputs (in tokens, capped at the model limit) are packed into sentence chunks
+    HUGGINGFACE_MAX_INPUT_TOKENS: int = 512
+    
+    # Generation profiles selectable per request: beam count, early stopping and an output limit
+    # of input_tokens * max_new_tokens_ratio + max_new_tokens_margin new tokens
+    HUGGINGFACE_GENERATION_PROFILES: Dict[str, Dict[str, Any]] = {
+        "fast": {"num_beams": 1, "max_new_tokens_ratio": 1.5, "max_new_tokens_margin": 8},
+        "balanced": {"num_beams": 2, "max_new_tokens_ratio": 2.0, "max_new_tokens_margin": 16, "early_stopping": True},
+        "quality": {"num_beams": 4, "max_new_tokens_ratio": 3.0, "max_new_tokens_margin": 32, "early_stopping": True},
+    }
+    HUGGINGFACE_DEFAULT_PROFILE: str = "quality"
+    HUGGINGFACE_LANGUAGE_PROFILES: Dict[str, str] = {}  # Per-language default profile
+    
+    # Cross-request micro-batching: collect segments from concurrent requests for a short window
+    HUGGINGFACE_MICRO_BATCHING: bool = False
+    HUGGINGFACE_MICRO_BATCH_WAIT_MS: int = 10
+    
     # Claude API configuration
     CLAUDE_API_KEY: Optional[str] = None
     CLAUDE_MODEL: str = os.getenv("CLAUDE_MODEL", "claude-3-5-sonnet-20241022")
+    CLAUDE_API_BASE_URL: str = os.getenv("CLAUDE_API_BASE_URL", "https://api.anthropic.com")
+    
+    # Pooled HTTP client shared by all requests to the Claude API (HTTP/2 when h2 is installed)
+    CLAUDE_MAX_CONNECTIONS: int = 20
+    CLAUDE_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    CLAUDE_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    CLAUDE_HTTP2: bool = True
+    
+    # Segment packing: batches go to Claude as JSON arrays of segments, bisected when the answer is misaligned
+    CLAUDE_PACK_SEGMENTS: bool = True
+    CLAUDE_PACK_TOKEN_BUDGET: int = 2000  # Estimated input tokens of the segments in one request
+    CLAUDE_PACK_MAX_SEGMENTS: int = 50
+    CLAUDE_PACK_CONCURRENCY: int = 8  # Packs of one batch in flight at once; the async client's limit still applies
+    
+    # Async Claude client: token-bucket rate limits, retries with jittered backoff and AIMD concurrency
+    CLAUDE_ASYNC_CLIENT: bool = True
+    CLAUDE_REQUESTS_PER_MINUTE: int = 50  # 0 disables the limit
+    CLAUDE_INPUT_TOKENS_PER_MINUTE: int = 40000  # 0 disables the limit
+    CLAUDE_MAX_RETRIES: int = 5
+    CLAUDE_BACKOFF_BASE_SECONDS: float = 1.0
+    CLAUDE_BACKOFF_MAX_SECONDS: float = 60.0
+    CLAUDE_INITIAL_CONCURRENCY: int = 4
+    CLAUDE_MAX_CONCURRENCY: int = 16
+    
+    # Message Batches bulk mode for offline jobs: batches are polled until they end
+    CLAUDE_BATCH_POLL_SECONDS: float = 30.0
+    CLAUDE_BATCH_TIMEOUT_SECONDS: int = 86400
+    CLAUDE_BATCH_MAX_REQUESTS: int = 10000  # Requests per submitted batch
+    
+    # Prompt caching of the static instructions; CLAUDE_GLOSSARY_DIR/<lang>.json adds a cached glossary per language
+    CLAUDE_PROMPT_CACHING: bool = True
+    CLAUDE_GLOSSARY_DIR: str = os.getenv("CLAUDE_GLOSSARY_DIR", "")
     
     # Service selection (huggingface or claude)
     TRANSLATION_SERVICE: str = os.getenv("TRANSLATION_SERVICE", "huggingface")
+    
+    # In-process cache of hot translations, bounded by size with per-entry expiry
+    TRANSLATION_CACHE_ENABLED: bool = True
+    TRANSLATION_CACHE_MAX_MB: int = 64
+    TRANSLATION_CACHE_TTL_SECONDS: int = 86400  # 0 keeps entries until evicted
+    
+    # Persistent translation memory shared by all worker processes
+    TRANSLATION_MEMORY_ENABLED: bool = False
+    TRANSLATION_MEMORY_PATH: str = os.getenv("TRANSLATION_MEMORY_PATH", "/tmp/translation_memory/memory.sqlite3")
+    TRANSLATION_MEMORY_MAX_MB: int = 512  # Least recently used entries are evicted above this size
+    TRANSLATION_MEMORY_TOUCH_INTERVAL_SECONDS: int = 3600  # Hits refresh an entry's access time at most this often
+    
+    # Segment dispatch: calls in flight per document and segments per batch call (0 = whole document)
+    TRANSLATION_MAX_CONCURRENCY: int = 1
+    TRANSLATION_BATCH_SIZE: int = 0
+    
+    # Multi-target requests: target languages translated at the same time
+    TRANSLATION_FANOUT_MAX_WORKERS: int = 4
+    
+    # XML processing: stream uploads through iterparse instead of building the whole tree
+    XML_STREAMING_ENABLED: bool = False
+    XML_STREAM_WINDOW_SIZE: int = 256  # TEXT segments translated per window
 
     class Config:
         case_sensitive = True
@@ -0,0 +1,10 @@
+# app/core/exceptions.py
+
+
+class TranslationServiceError(RuntimeError):
+    """
+    A translation service gave up on a request, e.g. after exhausting its retries
+
+    Unlike other translation errors this one must fail the document: callers
+    neither fall back to the source text nor retry segment by segment.
+    """
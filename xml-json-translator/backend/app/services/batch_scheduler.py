@@ -0,0 +1,187 @@
+# app/services/batch_scheduler.py
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the batch size histogram buckets
+_BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128]
+
+class MicroBatchScheduler:
+    """
+    Dynamic micro-batching of translation requests across callers
+
+    Callers from any request thread submit segments and get one future per segment.
+    A single scheduler thread takes the first waiting segment, keeps collecting
+    for up to max_wait_ms or until the batch reaches its token or size limit, runs
+    one batch call and resolves every caller's future.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run_batch: Callable[[List[str]], List[str]],
+        max_wait_ms: float = 10,
+        max_batch_tokens: int = 8192,
+        max_batch_size: int = 64,
+        count_tokens: Optional[Callable[[str], int]] = None
+    ):
+        """
+        Args:
+            name: Label used in logs and the scheduler thread name
+            run_batch: Function translating a list of texts, returning results in order
+            max_wait_ms: How long to wait for more segments after the first one arrives
+            max_batch_tokens: Approximate token limit of one batch
+            max_batch_size: Maximum number of segments in one batch
+            count_tokens: Function estimating the token count of a text
+        """
+        self.name = name
+        self.run_batch = run_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.count_tokens = count_tokens or (lambda text: len(text.split()) + 1)
+
+        self._queue = queue.Queue()
+        self._carry = None
+        self._stopped = threading.Event()
+        self._metrics_lock = threading.Lock()
+        self._batch_sizes = {_size_bucket(bucket): 0 for bucket in _BATCH_SIZE_BUCKETS + [None]}
+        self._wait_times = deque(maxlen=1000)
+        self.batches = 0
+        self.segments = 0
+
+        self._thread = threading.Thread(target=self._run, name=f"micro-batch-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> List[Future]:
+        """Queue texts for translation and return a future per text"""
+        if self._stopped.is_set():
+            raise RuntimeError(f"Scheduler {self.name} is stopped")
+
+        futures = []
+        now = time.monotonic()
+        for text in texts:
+            future = Future()
+            self._queue.put((text, future, now))
+            futures.append(future)
+        return futures
+
+    def translate(self, texts: List[str]) -> List[str]:
+        """Translate texts through the shared batches, blocking until all are done"""
+        return [future.result() for future in self.submit(texts)]
+
+    def stop(self) -> None:
+        """Stop the scheduler thread after the current batch and fail anything still queued"""
+        self._stopped.set()
+        self._thread.join(timeout=5)
+
+        while True:
+            try:
+                _, future, _ = self._next_item(timeout=0)
+            except queue.Empty:
+                break
+            future.set_exception(RuntimeError(f"Scheduler {self.name} is stopped"))
+
+    def _next_item(self, timeout: Optional[float]):
+        """Take the segment left over from the previous batch, or the next queued one"""
+        if self._carry is not None:
+            item, self._carry = self._carry, None
+            return item
+        return self._queue.get(timeout=timeout)
+
+    def _collect(self) -> List:
+        """Block for the first segment, then gather more until the window closes or the batch is full"""
+        first = self._next_item(timeout=0.5)
+        batch = [first]
+        tokens = self.count_tokens(first[0])
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._next_item(timeout=remaining)
+            except queue.Empty:
+                break
+
+            item_tokens = self.count_tokens(item[0])
+            if tokens + item_tokens > self.max_batch_tokens:
+                # Keep it for the next batch
+                self._carry = item
+                break
+            batch.append(item)
+            tokens += item_tokens
+
+        return batch
+
+    def _run(self) -> None:
+        """Scheduler loop"""
+        while not self._stopped.is_set():
+            try:
+                batch = self._collect()
+            except queue.Empty:
+                continue
+
+            started = time.monotonic()
+            texts = [text for text, _, _ in batch]
+            try:
+                results = self.run_batch(texts)
+                if len(results) != len(texts):
+                    raise ValueError(f"Batch returned {len(results)} results for {len(texts)} inputs")
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                logger.error(f"Micro-batch for {self.name} failed: {str(e)}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+
+            self._record(batch, started)
+
+    def _record(self, batch: List, started: float) -> None:
+        """Update batch size and queue wait metrics"""
+        with self._metrics_lock:
+            self.batches += 1
+            self.segments += len(batch)
+            self._batch_sizes[_size_bucket(len(batch))] += 1
+            self._wait_times.extend(started - enqueued for _, _, enqueued in batch)
+
+    def metrics(self) -> Dict:
+        """Queue depth, batch size distribution and queue wait times in milliseconds"""
+        with self._metrics_lock:
+            waits = sorted(self._wait_times)
+            batch_sizes = dict(self._batch_sizes)
+            batches = self.batches
+            segments = self.segments
+
+        def percentile(fraction):
+            if not waits:
+                return 0.0
+            return waits[min(len(waits) - 1, int(fraction * len(waits)))] * 1000
+
+        return {
+            "queue_depth": self._queue.qsize() + (1 if self._carry is not None else 0),
+            "batches": batches,
+            "segments": segments,
+            "mean_batch_size": segments / batches if batches else 0.0,
+            "batch_size_distribution": batch_sizes,
+            "wait_ms_p50": percentile(0.5),
+            "wait_ms_p95": percentile(0.95),
+            "wait_ms_max": waits[-1] * 1000 if waits else 0.0,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+
+def _size_bucket(size: Optional[int]) -> str:
+    """Histogram label for a batch size; None gives the overflow bucket"""
+    if size is not None:
+        for bucket in _BATCH_SIZE_BUCKETS:
+            if size <= bucket:
+                return f"<={bucket}"
+    return f">{_BATCH_SIZE_BUCKETS[-1]}"
@@ -0,0 +1,353 @@
+# app/services/claude_client.py
+import asyncio
+import concurrent.futures
+import logging
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+import httpx
+
+from app.core.exceptions import TranslationServiceError
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: rate limited, overloaded and transient server errors
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# Responses that mean the account is over its limits, which shrink the concurrency
+THROTTLED_STATUS = {429, 529}
+
+
+class ClaudeAPIError(TranslationServiceError):
+    """The Claude API kept failing after every retry"""
+
+
+class TokenBucket:
+    """
+    Rate limit of a quantity per minute
+
+    The bucket holds at most one minute's allowance and refills continuously,
+    so short bursts are allowed while the average stays under the limit.
+    """
+
+    def __init__(self, per_minute: int):
+        """
+        Args:
+            per_minute: Allowance per minute
+        """
+        self.capacity = per_minute
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60
+        self.updated = time.monotonic()
+
+    async def acquire(self, amount: int) -> None:
+        """Wait until the amount is available and take it"""
+        # A request larger than the whole allowance waits for a full bucket instead of forever
+        amount = min(amount, self.capacity)
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class AimdLimiter:
+    """
+    Concurrency limit adjusted by additive increase, multiplicative decrease
+
+    The limit grows by one after a limit's worth of successful requests and
+    halves when a request is throttled. Requests started before a decrease
+    cannot halve it again, so a burst of 429s counts as one congestion event.
+    The limiter is used from a single event loop; release is synchronous so it
+    can run in a finally block even while the request is being cancelled.
+    """
+
+    def __init__(self, initial: int, maximum: int, minimum: int = 1):
+        """
+        Args:
+            initial: Starting number of requests in flight
+            maximum: Upper bound of the limit
+            minimum: Lower bound of the limit
+        """
+        self.limit = max(minimum, min(initial, maximum))
+        self.maximum = maximum
+        self.minimum = minimum
+        self.in_flight = 0
+        self.successes = 0
+        self.epoch = 0
+        self.decreases = 0
+        self._waiters = deque()
+
+    async def acquire(self) -> int:
+        """Wait for a free slot; returns the epoch the request started in"""
+        while self.in_flight >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Pass a wake-up this waiter can no longer use on to the next one
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                self._wake()
+                raise
+        self.in_flight += 1
+        return self.epoch
+
+    def release(self, epoch: int, success: bool, throttled: bool) -> None:
+        """Free a slot and adjust the limit by the outcome of the request"""
+        self.in_flight -= 1
+        if throttled:
+            if epoch == self.epoch:
+                self.limit = max(self.minimum, self.limit // 2)
+                self.epoch += 1
+                self.decreases += 1
+                logger.info(f"Claude API throttled, concurrency limit lowered to {self.limit}")
+            self.successes = 0
+        elif success:
+            self.successes += 1
+            if self.successes >= self.limit and self.limit < self.maximum:
+                self.limit += 1
+                self.successes = 0
+        self._wake()
+
+    def _wake(self) -> None:
+        """Wake as many waiters as there are free slots"""
+        free = self.limit - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+
+class AsyncClaudeClient:
+    """
+    asyncio client for the messages API with rate limiting and retries
+
+    Requests pass a requests-per-minute and an input-tokens-per-minute token
+    bucket and an AIMD concurrency limit before they are sent. Throttled and
+    transient failures are retried after the retry-after delay when the API
+    gives one, otherwise after a jittered exponential backoff; a retry-after
+    pauses every request, not just the one that got it. Once the retries are
+    exhausted ClaudeAPIError is raised instead of returning the failure.
+
+    The client runs its own event loop on a background thread, so the limits
+    are shared by every caller: worker threads use send_sync and coroutines on
+    any other event loop await send. Callers on other threads wait at most the
+    time every attempt and backoff could take, and sending on a closed client
+    raises ClaudeAPIError instead of waiting for a loop that no longer runs.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: Dict[str, str],
+        timeout: float,
+        limits: httpx.Limits,
+        http2: bool = False,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        initial_concurrency: int = 4,
+        max_concurrency: int = 16,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        Args:
+            base_url: API base URL
+            headers: Headers sent with every request
+            timeout: Request timeout in seconds
+            limits: Connection pool limits
+            http2: Whether to negotiate HTTP/2
+            requests_per_minute: Request rate limit; 0 disables it
+            tokens_per_minute: Input token rate limit; 0 disables it
+            max_retries: Retries after the first attempt
+            backoff_base: First backoff delay in seconds, doubled on every retry
+            backoff_max: Longest backoff delay in seconds
+            initial_concurrency: Starting number of requests in flight
+            max_concurrency: Upper bound of requests in flight
+            transport: Optional transport replacing the network, e.g. for tests
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.limiter = AimdLimiter(initial_concurrency, max_concurrency)
+        self.paused_until = 0.0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            limits=limits,
+            http2=http2,
+            transport=transport
+        )
+        self._closed = False
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="claude-client", daemon=True)
+        self._thread.start()
+
+    async def send(self, data: Dict, input_tokens: int, trace: Optional[Callable] = None) -> httpx.Response:
+        """
+        Send a messages request from any event loop
+
+        Args:
+            data: Request body
+            input_tokens: Estimated input tokens, charged to the token bucket
+            trace: Optional httpcore trace callback
+
+        Returns:
+            The response; successful or a non-retryable error
+        """
+        if asyncio.get_running_loop() is self._loop:
+            return await self._post(data, input_tokens, trace)
+        future = self._submit(data, input_tokens, trace)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self._wait_timeout())
+        except asyncio.TimeoutError:
+            raise ClaudeAPIError(f"Claude API request did not finish within {self._wait_timeout():.0f}s")
+        except asyncio.CancelledError:
+            # Cancelled by close(), not by the caller
+            if future.cancelled():
+                raise ClaudeAPIError("Claude API client was closed during the request")
+            raise
+
+    def send_sync(self, data: Dict, input_tokens: int, trace: Optional[Callable] = None) -> httpx.Response:
+        """Blocking send for threads, including threads that are running an event loop of their own"""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("send_sync cannot be called from the client's event loop, await send instead")
+        future = self._submit(data, input_tokens, trace)
+        try:
+            return future.result(timeout=self._wait_timeout())
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise ClaudeAPIError(f"Claude API request did not finish within {self._wait_timeout():.0f}s")
+        except concurrent.futures.CancelledError:
+            raise ClaudeAPIError("Claude API client was closed during the request")
+
+    def _submit(self, data: Dict, input_tokens: int, trace: Optional[Callable]) -> concurrent.futures.Future:
+        """Schedule a request on the client's loop from another thread; raises if the loop is gone"""
+        if self._closed or not self._loop.is_running() or not self._thread.is_alive():
+            raise ClaudeAPIError("Claude API client is closed")
+        return asyncio.run_coroutine_threadsafe(self._post(data, input_tokens, trace), self._loop)
+
+    def _wait_timeout(self) -> float:
+        """Longest a request can legitimately take: every attempt timing out plus the longest backoffs"""
+        return self.timeout * (self.max_retries + 1) + self.backoff_max * self.max_retries
+
+    def metrics(self) -> Dict:
+        """Current concurrency limit, requests in flight and retry counters"""
+        return {
+            "concurrency_limit": self.limiter.limit,
+            "in_flight": self.limiter.in_flight,
+            "concurrency_decreases": self.limiter.decreases,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "failures": self.failures,
+        }
+
+    def close(self) -> None:
+        """Fail the requests in flight, close the connections and stop the event loop thread"""
+        self._closed = True
+        if not self._loop.is_running():
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    async def _shutdown(self) -> None:
+        """Cancel the requests in flight, so their callers fail now, then close the connections"""
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._client.aclose()
+
+    async def _post(self, data: Dict, input_tokens: int, trace: Optional[Callable]) -> httpx.Response:
+        """Send a request through the rate limits, retrying throttled and transient failures"""
+        extensions = {"trace": trace} if trace is not None else {}
+        error = ""
+        for attempt in range(self.max_retries + 1):
+            await self._wait_for_pause()
+            if self.request_bucket is not None:
+                await self.request_bucket.acquire(1)
+            if self.token_bucket is not None:
+                await self.token_bucket.acquire(input_tokens)
+
+            epoch = await self.limiter.acquire()
+            response = None
+            try:
+                response = await self._client.post("/v1/messages", json=data, extensions=extensions)
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {str(e)}"
+            finally:
+                # Every outcome frees the slot; only a throttling response lowers the limit
+                status = response.status_code if response is not None else None
+                self.limiter.release(epoch, success=status == 200, throttled=status in THROTTLED_STATUS)
+
+            if response is not None:
+                if response.status_code not in RETRYABLE_STATUS:
+                    return response
+                if response.status_code in THROTTLED_STATUS:
+                    self.throttled += 1
+                error = f"HTTP {response.status_code}"
+
+            if attempt == self.max_retries:
+                break
+
+            delay = self._retry_delay(response, attempt)
+            self.retries += 1
+            logger.warning(
+                f"Claude API request failed ({error}), retrying in {delay:.1f}s "
+                f"(retry {attempt + 1} of {self.max_retries})"
+            )
+            await asyncio.sleep(delay)
+
+        self.failures += 1
+        raise ClaudeAPIError(f"Claude API request failed after {self.max_retries + 1} attempts: {error}")
+
+    async def _wait_for_pause(self) -> None:
+        """Wait out a retry-after pause set by any request"""
+        delay = self.paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self, response: Optional[httpx.Response], attempt: int) -> float:
+        """Delay before a retry: the server's retry-after if given, otherwise full-jitter exponential backoff"""
+        retry_after = _parse_retry_after(response.headers.get("retry-after")) if response is not None else None
+        if retry_after is not None:
+            # Jitter keeps the paused requests from all resuming at the same instant
+            delay = retry_after + random.uniform(0, self.backoff_base)
+            self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+            return delay
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a retry-after header given in seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -1,12 +1,50 @@
 import logging
-import requests
+import importlib.util
+import httpx
 import json
 import os
 import re
-from typing import Dict, List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.services.claude_client import AsyncClaudeClient, ClaudeAPIError
 
 logger = logging.getLogger(__name__)
 
+# Output token limit of a packed request
+PACKED_MAX_TOKENS = 8192
+
+# Static instructions, sent as a cached system prompt ahead of the per-request text
+CHUNK_INSTRUCTIONS = """Translate the English text in the user message to {language_name}.
+DO NOT add any introduction, explanation, or comments.
+DO NOT include phrases like "Here's the translation".
+DO NOT modify any XML tags or placeholders.
+ONLY return the translated content, nothing else."""
+
+JSON_FIELD_INSTRUCTIONS = """You are a specialized JSON field translator.
+Translate the JSON text in the user message from English to {language_name}.
+
+IMPORTANT: Return ONLY the translated text.
+- NO introduction or explanation
+- NO phrases like "Here's the translation"
+- NO additional formatting
+- Preserve any placeholders (like {{variable}} or __name__)
+- Preserve any HTML/XML tags"""
+
+PACK_INSTRUCTIONS = """Translate each English string of the JSON array in the user message to {language_name}.
+Return ONLY a JSON array with one string per input string: the translations, in the same order.
+DO NOT add any introduction, explanation, or comments.
+DO NOT merge, split, or skip strings.
+DO NOT modify markers such as HTML_TAG_0, HTML_ATTR_0 or PLACEHOLDER_0, XML tags or placeholders."""
+
+# httpcore trace events marking a request that opened a new connection
+CONNECT_EVENTS = ("connection.connect_tcp.complete", "connection.connect_unix_socket.complete")
+
+# Usage fields of a response that are summed into the stats
+USAGE_FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
 class ClaudeTranslationService:
     def __init__(self):
         self.supported_languages = {
@@ -35,6 +73,70 @@ class ClaudeTranslationService:
         # Increased timeout for API calls (120 seconds)
         self.timeout = 120
         
+        # One pooled client for all threads, so connections are kept alive and reused
+        self.base_url = settings.CLAUDE_API_BASE_URL
+        self.http2 = settings.CLAUDE_HTTP2 and importlib.util.find_spec("h2") is not None
+        self.headers = {
+            "x-api-key": self.api_key,
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json"
+        }
+        limits = httpx.Limits(
+            max_connections=settings.CLAUDE_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.CLAUDE_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.CLAUDE_KEEPALIVE_EXPIRY_SECONDS
+        )
+        
+        # The async client adds rate limiting, retries and adaptive concurrency on its own event loop
+        self.client = None
+        self.async_client = None
+        if settings.CLAUDE_ASYNC_CLIENT:
+            self.async_client = AsyncClaudeClient(
+                self.base_url,
+                self.headers,
+                self.timeout,
+                limits,
+                http2=self.http2,
+                requests_per_minute=settings.CLAUDE_REQUESTS_PER_MINUTE,
+                tokens_per_minute=settings.CLAUDE_INPUT_TOKENS_PER_MINUTE,
+                max_retries=settings.CLAUDE_MAX_RETRIES,
+                backoff_base=settings.CLAUDE_BACKOFF_BASE_SECONDS,
+                backoff_max=settings.CLAUDE_BACKOFF_MAX_SECONDS,
+                initial_concurrency=settings.CLAUDE_INITIAL_CONCURRENCY,
+                max_concurrency=settings.CLAUDE_MAX_CONCURRENCY
+            )
+        else:
+            self.client = httpx.Client(
+                base_url=self.base_url,
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=limits,
+                http2=self.http2
+            )
+        self.stats_lock = threading.Lock()
+        self.request_count = 0
+        self.new_connections = 0
+        
+        # Batches are packed into JSON arrays of segments under an estimated token budget
+        self.pack_segments = settings.CLAUDE_PACK_SEGMENTS
+        self.pack_token_budget = settings.CLAUDE_PACK_TOKEN_BUDGET
+        self.pack_max_segments = settings.CLAUDE_PACK_MAX_SEGMENTS
+        self.pack_concurrency = settings.CLAUDE_PACK_CONCURRENCY
+        self.packed_requests = 0
+        self.bisections = 0
+        
+        # Bulk mode submits packs as message batches and polls until they end
+        self.batch_poll_interval = settings.CLAUDE_BATCH_POLL_SECONDS
+        self.batch_timeout = settings.CLAUDE_BATCH_TIMEOUT_SECONDS
+        self.batch_max_requests = settings.CLAUDE_BATCH_MAX_REQUESTS
+        self.message_batches = 0
+        
+        # Instructions go in a system prompt marked for caching, followed by the language's glossary
+        self.prompt_caching = settings.CLAUDE_PROMPT_CACHING
+        self.glossary_dir = settings.CLAUDE_GLOSSARY_DIR
+        self.glossaries = {}
+        self.usage = {field: 0 for field in USAGE_FIELDS}
+        
         # Patterns to detect and remove common Claude explanations
         self.explanation_patterns = [
             r"^Here\'s the (English|text) translated to [^:]+:(\s*)",
@@ -54,7 +156,135 @@ class ClaudeTranslationService:
         else:
             logger.info(f"Claude service initialized with model: {self.model}")
             logger.info(f"Using timeout of {self.timeout} seconds")
+            logger.info(f"Using {'HTTP/2' if self.http2 else 'HTTP/1.1'} connections to {self.base_url}")
+        
+    def close(self) -> None:
+        """Close the pooled connections"""
+        if self.async_client is not None:
+            self.async_client.close()
+        if self.client is not None:
+            self.client.close()
+    
+    def get_stats(self) -> Dict:
+        """Request count, connection reuse, packing counters and token usage including prompt cache reads"""
+        with self.stats_lock:
+            requests = self.request_count
+            new_connections = self.new_connections
+            packed_requests = self.packed_requests
+            bisections = self.bisections
+            message_batches = self.message_batches
+            usage = dict(self.usage)
+        cached_input = usage["cache_creation_input_tokens"] + usage["cache_read_input_tokens"]
+        total_input = usage["input_tokens"] + cached_input
+        usage["cache_read_ratio"] = round(usage["cache_read_input_tokens"] / total_input, 4) if total_input else 0.0
+        return {
+            "http2": self.http2,
+            "requests": requests,
+            "new_connections": new_connections,
+            "connection_reuse_rate": round(1 - new_connections / requests, 4) if requests else 0.0,
+            "packed_requests": packed_requests,
+            "bisections": bisections,
+            "message_batches": message_batches,
+            "usage": usage,
+            "async_client": self.async_client.metrics() if self.async_client is not None else None,
+        }
+    
+    def _post_message(self, data: Dict) -> httpx.Response:
+        """
+        Send a request to the messages API over the pooled client
+        
+        The connection trace tells whether the request opened a new connection
+        or reused one from the pool. Through the async client the request is
+        rate limited and retried, and ClaudeAPIError is raised once the retries
+        are exhausted.
+        
+        Args:
+            data: Request body
+        
+        Returns:
+            The API response
+        """
+        connected = []
+        
+        def trace(event_name, info):
+            if event_name in CONNECT_EVENTS:
+                connected.append(event_name)
+        
+        # httpcore requires a coroutine trace callback on its asynchronous interface
+        async def async_trace(event_name, info):
+            trace(event_name, info)
+        
+        try:
+            if self.async_client is not None:
+                input_tokens = sum(self._estimate_tokens(message["content"]) for message in data["messages"])
+                input_tokens += sum(self._estimate_tokens(block["text"]) for block in data.get("system", []))
+                response = self.async_client.send_sync(data, input_tokens, async_trace)
+            else:
+                response = self.client.post("/v1/messages", json=data, extensions={"trace": trace})
+            if response.status_code == 200:
+                self._record_usage(response.json().get("usage"))
+            return response
+        finally:
+            with self.stats_lock:
+                self.request_count += 1
+                if connected:
+                    self.new_connections += 1
+    
+    def _record_usage(self, usage: Optional[Dict]) -> None:
+        """Add the token counts of a response, including prompt cache writes and reads, to the stats"""
+        if not usage:
+            return
+        with self.stats_lock:
+            for field in USAGE_FIELDS:
+                self.usage[field] += usage.get(field) or 0
+    
+    def _system_prompt(self, instructions: str, target_lang: str) -> List[Dict]:
+        """
+        System prompt blocks: the instructions for the language, then its glossary if there is one
+        
+        The last block carries the cache breakpoint, so every request of the same
+        kind and language reuses the cached prefix. The API only caches prefixes
+        above a minimum length (1024 tokens for most models); shorter prompts are
+        processed normally.
+        """
+        language_name = self.supported_languages[target_lang]
+        blocks = [{"type": "text", "text": instructions.format(language_name=language_name)}]
+        
+        glossary = self._get_glossary(target_lang)
+        if glossary:
+            blocks.append({"type": "text", "text": glossary})
+        
+        if self.prompt_caching:
+            blocks[-1]["cache_control"] = {"type": "ephemeral"}
+        return blocks
+    
+    def _get_glossary(self, target_lang: str) -> str:
+        """
+        Glossary prompt of a language, read once from CLAUDE_GLOSSARY_DIR/<lang>.json
+        
+        The file maps English terms to their required translations.
+        
+        Returns:
+            The glossary text, or an empty string if the language has none
+        """
+        if target_lang in self.glossaries:
+            return self.glossaries[target_lang]
+        
+        glossary = ""
+        path = os.path.join(self.glossary_dir, f"{target_lang}.json") if self.glossary_dir else None
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    terms = json.load(f)
+                lines = [f"{source} => {target}" for source, target in sorted(terms.items())]
+                glossary = "Always translate these terms as given (English => translation):\n" + "\n".join(lines)
+                logger.info(f"Loaded glossary with {len(terms)} terms for {target_lang}")
+            except Exception as e:
+                logger.error(f"Could not read glossary {path}: {str(e)}")
         
+        self.glossaries[target_lang] = glossary
+        return glossary
+    
     def get_supported_languages(self) -> List[Dict[str, str]]:
         """Get list of supported target languages"""
         return [
@@ -103,7 +333,7 @@ class ClaudeTranslationService:
             
             # For small texts, we can translate directly
             if len(text) < 4000:
-                return self._translate_chunk(text, target_lang, language_name)
+                return self._translate_chunk(text, target_lang)
                 
             # For larger texts, we need to split into chunks
             logger.info(f"Text is too long ({len(text)} chars), splitting into chunks")
@@ -112,7 +342,7 @@ class ClaudeTranslationService:
             
             for i, chunk in enumerate(chunks):
                 logger.info(f"Translating chunk {i+1} of {len(chunks)}")
-                translated_chunk = self._translate_chunk(chunk, target_lang, language_name)
+                translated_chunk = self._translate_chunk(chunk, target_lang)
                 translated_chunks.append(translated_chunk)
                 
             # Join the translated chunks
@@ -120,10 +350,309 @@ class ClaudeTranslationService:
             logger.info(f"Finished translating all chunks, final length: {len(result)}")
             return result
                 
+        except ClaudeAPIError:
+            raise
+        
         except Exception as e:
             logger.exception(f"Error in translation: {str(e)}")
             return text
             
+    def translate_batch(self, texts: List[str], target_lang: str) -> List[str]:
+        """Translate a list of texts to the specified target language, preserving order"""
+        if not self.pack_segments:
+            return [self.translate(text, target_lang) for text in texts]
+        return self._translate_packed(texts, target_lang, self.translate)
+    
+    def _estimate_tokens(self, text: str) -> int:
+        """Rough token count of a segment: about four characters per token plus the JSON quoting"""
+        return len(text) // 4 + 2
+    
+    def _make_packs(self, texts: List[str], indexes: List[int]) -> List[List[int]]:
+        """Group segment indexes in order into packs under the token budget and segment limit"""
+        packs = []
+        current = []
+        tokens = 0
+        for index in indexes:
+            cost = self._estimate_tokens(texts[index])
+            if current and (tokens + cost > self.pack_token_budget or len(current) >= self.pack_max_segments):
+                packs.append(current)
+                current = []
+                tokens = 0
+            current.append(index)
+            tokens += cost
+        if current:
+            packs.append(current)
+        return packs
+    
+    def _translate_packed(self, texts: List[str], target_lang: str, translate_one: Callable[[str, str], str]) -> List[str]:
+        """
+        Translate texts with several segments per request, preserving order
+        
+        Empty texts are kept as they are; a text over the token budget on its own
+        is translated with a single request. Up to pack_concurrency packs are
+        sent at once, so a large document takes about packs / concurrency round
+        trips rather than one per pack.
+        
+        Args:
+            texts: Texts to translate
+            target_lang: Target language code
+            translate_one: Single-segment translation used for lone segments
+        
+        Returns:
+            Translated texts in the same order
+        """
+        if target_lang not in self.supported_languages or not self.api_key:
+            return [translate_one(text, target_lang) for text in texts]
+        
+        results, pending = self._split_packable(texts, target_lang, translate_one)
+        packs = self._make_packs(texts, pending)
+        logger.info(f"Packed {len(pending)} segments into {len(packs)} requests")
+        
+        def run(pack):
+            return self._translate_pack([texts[index] for index in pack], target_lang, translate_one)
+        
+        if self.pack_concurrency <= 1 or len(packs) <= 1:
+            translated_packs = [run(pack) for pack in packs]
+        else:
+            # Executor.map keeps the packs in order and re-raises the first failure
+            with ThreadPoolExecutor(max_workers=min(self.pack_concurrency, len(packs))) as executor:
+                translated_packs = list(executor.map(run, packs))
+        
+        for pack, translated in zip(packs, translated_packs):
+            for index, text in zip(pack, translated):
+                results[index] = text
+        return results
+    
+    def _split_packable(
+        self, texts: List[str], target_lang: str, translate_one: Callable[[str, str], str]
+    ) -> Tuple[List[str], List[int]]:
+        """
+        Separate the texts that can be packed from the rest
+        
+        Empty texts are kept as they are and a text over the token budget on its
+        own is translated right away with a single request.
+        
+        Returns:
+            Results so far, in input order, and the indexes of the texts to pack
+        """
+        results = list(texts)
+        pending = []
+        for index, text in enumerate(texts):
+            if not text or text.isspace():
+                continue
+            if self._estimate_tokens(text) > self.pack_token_budget:
+                results[index] = translate_one(text, target_lang)
+            else:
+                pending.append(index)
+        return results, pending
+    
+    def _translate_pack(self, texts: List[str], target_lang: str, translate_one: Callable[[str, str], str]) -> List[str]:
+        """Translate one pack, bisecting it and retrying the halves while the response is misaligned"""
+        if len(texts) == 1:
+            return [translate_one(texts[0], target_lang)]
+        
+        translated = self._request_pack(texts, target_lang)
+        if translated is not None:
+            return translated
+        
+        with self.stats_lock:
+            self.bisections += 1
+        middle = len(texts) // 2
+        logger.warning(f"Misaligned response for {len(texts)} segments, retrying as {middle} and {len(texts) - middle}")
+        return (
+            self._translate_pack(texts[:middle], target_lang, translate_one)
+            + self._translate_pack(texts[middle:], target_lang, translate_one)
+        )
+    
+    def _pack_request(self, texts: List[str], target_lang: str) -> Dict:
+        """Messages API request translating several segments given as a JSON array"""
+        estimated_tokens = sum(self._estimate_tokens(text) for text in texts)
+        
+        return {
+            "model": self.model,
+            "max_tokens": min(PACKED_MAX_TOKENS, 2 * estimated_tokens + 256),
+            "temperature": 0.1,
+            "system": self._system_prompt(PACK_INSTRUCTIONS, target_lang),
+            "messages": [
+                {
+                    "role": "user",
+                    "content": f"{len(texts)} strings:\n{json.dumps(texts, ensure_ascii=False)}"
+                }
+            ]
+        }
+    
+    def _request_pack(self, texts: List[str], target_lang: str) -> Optional[List[str]]:
+        """
+        Translate several segments in one request as a JSON array
+        
+        Args:
+            texts: Segments to translate
+            target_lang: Target language code
+        
+        Returns:
+            The aligned translations, or None if the response does not have one
+            string per segment
+        
+        Raises:
+            ClaudeAPIError: The request failed; a whole pack is never passed off
+                as translated by returning its source texts
+        """
+        data = self._pack_request(texts, target_lang)
+        
+        logger.info(f"Sending {len(texts)} packed segments to Claude API")
+        try:
+            response = self._post_message(data)
+            with self.stats_lock:
+                self.packed_requests += 1
+            
+            if response.status_code != 200:
+                logger.error(f"Claude API error ({response.status_code}): {response.text}")
+                raise ClaudeAPIError(f"Claude API error ({response.status_code}) for {len(texts)} packed segments")
+            
+            response_data = response.json()
+            if 'content' not in response_data or len(response_data['content']) == 0:
+                logger.error(f"Unexpected response format: {json.dumps(response_data)}")
+                raise ClaudeAPIError(f"Unexpected response format for {len(texts)} packed segments")
+            
+            return self._parse_packed_response(response_data['content'][0]['text'], len(texts))
+        
+        except ClaudeAPIError:
+            raise
+        
+        except Exception as e:
+            logger.exception(f"Error translating packed segments: {str(e)}")
+            raise ClaudeAPIError(f"Error translating {len(texts)} packed segments: {str(e)}") from e
+    
+    def _parse_packed_response(self, text: str, expected: int) -> Optional[List[str]]:
+        """Extract the JSON array of translations from a response; None unless it holds one string per segment"""
+        start = text.find("[")
+        end = text.rfind("]")
+        if start == -1 or end < start:
+            return None
+        
+        try:
+            items = json.loads(text[start:end + 1])
+        except json.JSONDecodeError:
+            return None
+        
+        if not isinstance(items, list) or len(items) != expected or not all(isinstance(item, str) for item in items):
+            return None
+        return items
+    
+    def translate_bulk(self, texts: List[str], target_lang: str, json_fields: bool = False) -> List[str]:
+        """
+        Translate texts through the Message Batches API, preserving order
+        
+        Meant for offline jobs where cost and throughput matter more than latency.
+        Texts are packed as in translate_batch and every pack becomes one request
+        of a message batch, identified by its custom id; the call blocks until the
+        batch ends. Packs whose result failed or is misaligned are translated again
+        with regular requests.
+        
+        Args:
+            texts: Texts to translate, e.g. the segments of several documents
+            target_lang: Target language code
+            json_fields: Use the JSON field prompt for texts translated on their own
+        
+        Returns:
+            Translated texts in the same order
+        """
+        translate_one = self.translate_json_field if json_fields else self.translate
+        if target_lang not in self.supported_languages or not self.api_key:
+            return [translate_one(text, target_lang) for text in texts]
+        
+        results, pending = self._split_packable(texts, target_lang, translate_one)
+        packs = {
+            f"{target_lang}-{number}": pack
+            for number, pack in enumerate(self._make_packs(texts, pending))
+        }
+        messages = self._run_message_batches([
+            {"custom_id": custom_id, "params": self._pack_request([texts[index] for index in pack], target_lang)}
+            for custom_id, pack in packs.items()
+        ])
+        
+        for custom_id, pack in packs.items():
+            pack_texts = [texts[index] for index in pack]
+            message = messages.get(custom_id)
+            translated = None
+            if message is not None and message.get('content'):
+                translated = self._parse_packed_response(message['content'][0]['text'], len(pack))
+            if translated is None:
+                logger.warning(f"Batch result {custom_id} is missing or misaligned, translating it directly")
+                translated = self._translate_pack(pack_texts, target_lang, translate_one)
+            for index, text in zip(pack, translated):
+                results[index] = text
+        return results
+    
+    def _run_message_batches(self, requests: List[Dict]) -> Dict[str, Dict]:
+        """
+        Submit requests as message batches and wait for every batch to end
+        
+        Args:
+            requests: Batch requests with custom_id and params
+        
+        Returns:
+            Message of every succeeded request, by custom id
+        """
+        if not requests:
+            return {}
+        
+        messages = {}
+        with httpx.Client(base_url=self.base_url, headers=self.headers, timeout=self.timeout) as client:
+            batch_ids = []
+            for start in range(0, len(requests), self.batch_max_requests):
+                chunk = requests[start:start + self.batch_max_requests]
+                batch = self._batch_call(client, "POST", "/v1/messages/batches", json={"requests": chunk})
+                batch_ids.append(batch["id"])
+                logger.info(f"Submitted message batch {batch['id']} with {len(chunk)} requests")
+            
+            with self.stats_lock:
+                self.message_batches += len(batch_ids)
+            
+            for batch_id in batch_ids:
+                batch = self._wait_for_batch(client, batch_id)
+                messages.update(self._read_batch_results(client, batch))
+        return messages
+    
+    def _wait_for_batch(self, client: httpx.Client, batch_id: str) -> Dict:
+        """Poll a message batch until it ends; cancels it and raises ClaudeAPIError on timeout"""
+        deadline = time.monotonic() + self.batch_timeout
+        while True:
+            batch = self._batch_call(client, "GET", f"/v1/messages/batches/{batch_id}")
+            if batch["processing_status"] == "ended":
+                logger.info(f"Message batch {batch_id} ended: {batch.get('request_counts')}")
+                return batch
+            if time.monotonic() > deadline:
+                self._batch_call(client, "POST", f"/v1/messages/batches/{batch_id}/cancel")
+                raise ClaudeAPIError(f"Message batch {batch_id} did not end within {self.batch_timeout} seconds")
+            time.sleep(self.batch_poll_interval)
+    
+    def _read_batch_results(self, client: httpx.Client, batch: Dict) -> Dict[str, Dict]:
+        """Messages of the succeeded requests of an ended batch, by custom id"""
+        response = client.get(batch["results_url"])
+        if response.status_code != 200:
+            raise ClaudeAPIError(f"Could not read results of message batch {batch['id']} ({response.status_code})")
+        
+        messages = {}
+        for line in response.text.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            result = item["result"]
+            if result["type"] == "succeeded":
+                messages[item["custom_id"]] = result["message"]
+                self._record_usage(result["message"].get("usage"))
+            else:
+                logger.warning(f"Batch request {item['custom_id']} {result['type']}: {json.dumps(result.get('error'))}")
+        return messages
+    
+    def _batch_call(self, client: httpx.Client, method: str, path: str, **kwargs) -> Dict:
+        """Call a message batch endpoint; raises ClaudeAPIError unless it succeeds"""
+        response = client.request(method, path, **kwargs)
+        if response.status_code != 200:
+            raise ClaudeAPIError(f"{method} {path} failed ({response.status_code}): {response.text[:500]}")
+        return response.json()
+    
     def _split_text(self, text: str, max_chunk_size: int = 3500) -> List[str]:
         """Split text into chunks, trying to preserve XML structure"""
         chunks = []
@@ -148,48 +677,25 @@ class ClaudeTranslationService:
             
         return chunks
             
-    def _translate_chunk(self, text: str, target_lang: str, language_name: str = None) -> str:
+    def _translate_chunk(self, text: str, target_lang: str) -> str:
         """Translate a single chunk of text using Claude"""
-        if language_name is None:
-            language_name = self.supported_languages[target_lang]
-            
-        headers = {
-            "x-api-key": self.api_key,
-            "anthropic-version": "2023-06-01",
-            "content-type": "application/json"
-        }
-        
         # Use a very explicit prompt to avoid Claude adding explanations
         data = {
             "model": self.model,
             "max_tokens": 4000,
             "temperature": 0.1,
+            "system": self._system_prompt(CHUNK_INSTRUCTIONS, target_lang),
             "messages": [
                 {
                     "role": "user",
-                    "content": f"""
-                    Translate this English text to {language_name}.
-                    DO NOT add any introduction, explanation, or comments.
-                    DO NOT include phrases like "Here's the translation".
-                    DO NOT modify any XML tags or placeholders.
-                    ONLY return the translated content, nothing else.
-                    
-                    Text to translate:
-                    {text}
-                    """
+                    "content": text
                 }
             ]
         }
         
         logger.info(f"Sending request to Claude API with {self.timeout}s timeout")
         try:
-            # Use increased timeout
-            response = requests.post(
-                "https://api.anthropic.com/v1/messages",
-                headers=headers,
-                json=data,
-                timeout=self.timeout
-            )
+            response = self._post_message(data)
             
             if response.status_code != 200:
                 logger.error(f"Claude API error ({response.status_code}): {response.text}")
@@ -216,10 +722,13 @@ class ClaudeTranslationService:
                 logger.error(f"Failed to parse response JSON: {response.text[:500]}")
                 return text
                 
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error(f"Request timed out after {self.timeout} seconds")
             return text
             
+        except ClaudeAPIError:
+            raise
+            
         except Exception as e:
             logger.exception(f"Unexpected error calling Claude API: {str(e)}")
             return text
@@ -244,47 +753,23 @@ class ClaudeTranslationService:
             return text
         
         try:
-            language_name = self.supported_languages[target_lang]
-            
-            headers = {
-                "x-api-key": self.api_key,
-                "anthropic-version": "2023-06-01",
-                "content-type": "application/json"
-            }
-            
             # JSON-specific prompt with extra emphasis on clean output
             data = {
                 "model": self.model,
                 "max_tokens": 1000,
                 "temperature": 0.1,
+                "system": self._system_prompt(JSON_FIELD_INSTRUCTIONS, target_lang),
                 "messages": [
                     {
                         "role": "user",
-                        "content": f"""
-                        You are a specialized JSON field translator.
-                        Translate this JSON text from English to {language_name}:
-                        
-                        {text}
-                        
-                        IMPORTANT: Return ONLY the translated text.
-                        - NO introduction or explanation
-                        - NO phrases like "Here's the translation"
-                        - NO additional formatting
-                        - Preserve any placeholders (like {{variable}} or __name__)
-                        - Preserve any HTML/XML tags
-                        """
+                        "content": text
                     }
                 ]
             }
             
             logger.debug(f"Sending JSON field translation request: {text[:50]}...")
             
-            response = requests.post(
-                "https://api.anthropic.com/v1/messages",
-                headers=headers,
-                json=data,
-                timeout=self.timeout
-            )
+            response = self._post_message(data)
             
             if response.status_code != 200:
                 logger.error(f"Claude API error ({response.status_code}): {response.text}")
@@ -304,10 +789,19 @@ class ClaudeTranslationService:
                 logger.error(f"Unexpected response format: {json.dumps(response_data)}")
                 return text
                 
+        except ClaudeAPIError:
+            raise
+        
         except Exception as e:
             logger.exception(f"Error translating JSON field: {str(e)}")
             return text
     
+    def translate_json_batch(self, texts: List[str], target_lang: str) -> List[str]:
+        """Translate a list of JSON field values, preserving order"""
+        if not self.pack_segments:
+            return [self.translate_json_field(text, target_lang) for text in texts]
+        return self._translate_packed(texts, target_lang, self.translate_json_field)
+    
     def _clean_json_response(self, text: str) -> str:
         """Extra cleaning for JSON field translations"""
         
@@ -1,16 +1,26 @@
 # app/services/huggingface_service.py
 from transformers import MarianMTModel, MarianTokenizer
+import gc
 import logging
+import math
 import os
-from typing import Dict, List, Tuple
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 import torch
 import threading
 
 from app.core.config import get_settings
+from app.services.batch_scheduler import MicroBatchScheduler
+from app.services.model_manifest import MANIFEST_FILE, load_manifest
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Sentence boundaries: whitespace after terminating punctuation
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?;])\s+')
+
 class HuggingFaceTranslationService:
     _instance = None
     _lock = threading.Lock()
@@ -19,9 +29,41 @@ class HuggingFaceTranslationService:
         with cls._lock:
             if cls._instance is None:
                 cls._instance = super(HuggingFaceTranslationService, cls).__new__(cls)
-                cls._instance.models = {}
+                cls._instance.models = OrderedDict()  # Least recently used first
+                cls._instance.model_sizes = {}
+                cls._instance.models_lock = threading.RLock()
+                cls._instance.load_locks = {}
+                cls._instance.load_states = {}  # Language -> loading/warming/ready/failed/evicted
+                cls._instance.model_loads = 0
+                cls._instance.model_evictions = 0
+                cls._instance.memory_budget = settings.HUGGINGFACE_MODEL_MEMORY_BUDGET_MB * 1024 * 1024
+                cls._instance.pinned_languages = set(settings.HUGGINGFACE_PINNED_LANGUAGES)
                 cls._instance.language_models = settings.HUGGINGFACE_LANGUAGE_MODELS
                 cls._instance.cache_dir = settings.MODEL_CACHE_DIR
+                # Local paths of models bundled by download_models.py, by model name
+                cls._instance.manifest = load_manifest(
+                    os.path.join(settings.MODEL_CACHE_DIR, MANIFEST_FILE),
+                    verify=settings.HUGGINGFACE_VERIFY_MANIFEST
+                )
+                cls._instance.quantize = settings.HUGGINGFACE_QUANTIZE
+                cls._instance.model_store = None
+                if settings.HUGGINGFACE_MMAP_MODELS:
+                    from app.services.model_store import MmapModelStore
+                    cls._instance.model_store = MmapModelStore(os.path.join(settings.MODEL_CACHE_DIR, "safetensors"))
+                cls._instance.language_engines = settings.HUGGINGFACE_LANGUAGE_ENGINES
+                cls._instance.onnx_threads = settings.HUGGINGFACE_ONNX_THREADS
+                cls._instance.batch_token_budget = settings.HUGGINGFACE_BATCH_TOKEN_BUDGET
+                cls._instance.max_batch_size = settings.HUGGINGFACE_MAX_BATCH_SIZE
+                cls._instance.max_input_tokens = settings.HUGGINGFACE_MAX_INPUT_TOKENS
+                cls._instance.generation_profiles = settings.HUGGINGFACE_GENERATION_PROFILES
+                cls._instance.default_profile = settings.HUGGINGFACE_DEFAULT_PROFILE
+                cls._instance.language_profiles = settings.HUGGINGFACE_LANGUAGE_PROFILES
+                cls._instance.micro_batching = settings.HUGGINGFACE_MICRO_BATCHING
+                cls._instance.schedulers = {}
+                cls._instance.schedulers_lock = threading.Lock()
+                cls._instance.worker_processes = settings.HUGGINGFACE_WORKER_PROCESSES
+                cls._instance.worker_pool = None
+                cls._instance.worker_pool_lock = threading.Lock()
                 
                 # Ensure cache directory exists
                 os.makedirs(cls._instance.cache_dir, exist_ok=True)
@@ -36,64 +78,433 @@ class HuggingFaceTranslationService:
         ]
     
     def load_model(self, target_lang: str) -> Tuple[MarianTokenizer, MarianMTModel]:
-        """Load model and tokenizer for the specified target language"""
+        """
+        Load model and tokenizer for the specified target language
+        
+        Resident models are kept in least-recently-used order. When a new model
+        would push the total parameter footprint over the memory budget, the least
+        recently used models of languages that are not pinned are evicted first.
+        """
         if target_lang not in self.language_models:
             raise ValueError(f"Unsupported target language: {target_lang}")
         
         model_name = self.language_models[target_lang]
         
-        if model_name not in self.models:
-            logger.info(f"Loading model for {target_lang}: {model_name}")
+        with self.models_lock:
+            if model_name in self.models:
+                self.models.move_to_end(model_name)
+                return self.models[model_name]
+            load_lock = self.load_locks.setdefault(model_name, threading.Lock())
+        
+        # Different models load in parallel; concurrent requests for the same model wait for one load
+        with load_lock:
+            with self.models_lock:
+                if model_name in self.models:
+                    self.models.move_to_end(model_name)
+                    return self.models[model_name]
+            
+            if self.load_states.get(target_lang) != "warming":
+                self.load_states[target_lang] = "loading"
             try:
-                # First try to load from cache dir to avoid network requests
-                tokenizer = MarianTokenizer.from_pretrained(
-                    model_name, 
-                    cache_dir=self.cache_dir,
-                    local_files_only=os.path.exists(os.path.join(self.cache_dir, model_name))
-                )
-                model = MarianMTModel.from_pretrained(
-                    model_name, 
-                    cache_dir=self.cache_dir,
-                    local_files_only=os.path.exists(os.path.join(self.cache_dir, model_name))
-                )
+                tokenizer, model = self._load_pretrained(model_name, target_lang)
+            except Exception:
+                self.load_states[target_lang] = "failed"
+                raise
+            size = self._model_footprint(model)
+            
+            with self.models_lock:
+                self._evict_for(size)
                 self.models[model_name] = (tokenizer, model)
-                logger.info(f"Successfully loaded model for {target_lang}")
-            except Exception as e:
-                # If loading from cache fails, download from Hugging Face
-                logger.warning(f"Failed to load model from cache, downloading: {str(e)}")
-                tokenizer = MarianTokenizer.from_pretrained(
-                    model_name, 
-                    cache_dir=self.cache_dir
-                )
-                model = MarianMTModel.from_pretrained(
-                    model_name, 
-                    cache_dir=self.cache_dir
+                self.model_sizes[model_name] = size
+                self.model_loads += 1
+                if self.load_states.get(target_lang) != "warming":
+                    self.load_states[target_lang] = "ready"
+                logger.info(
+                    f"Model {model_name} resident ({size / 1024 / 1024:.0f} MB, "
+                    f"{self._resident_bytes() / 1024 / 1024:.0f} MB total)"
                 )
-                self.models[model_name] = (tokenizer, model)
-                logger.info(f"Successfully downloaded model for {target_lang}")
+                return self.models[model_name]
+    
+    def warmup(self, languages: List[str], max_workers: int = 4) -> Dict[str, str]:
+        """
+        Load models for the given languages in parallel and run a dummy generate on each
+        
+        Args:
+            languages: Language codes to preload
+            max_workers: Number of models loaded at the same time
+        
+        Returns:
+            Load state per language after warmup
+        """
+        languages = [lang for lang in languages if lang in self.language_models]
+        
+        if self.worker_processes:
+            # Every worker process loads its own copy of the models
+            for lang in languages:
+                self.load_states[lang] = "warming"
+            states = self._get_worker_pool().warmup(languages, max_workers)
+            self.load_states.update(states)
+            return states
+        
+        def warm(target_lang):
+            self.load_states[target_lang] = "warming"
+            try:
+                tokenizer, model = self.load_model(target_lang)
+                # Run one generate so first-call kernel and allocator setup happens now
+                self._generate_batched(tokenizer, model, ["Hello world."], [4], self.resolve_profile(target_lang))
+                self.load_states[target_lang] = "ready"
+                logger.info(f"Model for {target_lang} is warm")
+            except Exception as e:
+                self.load_states[target_lang] = "failed"
+                logger.error(f"Warmup failed for {target_lang}: {str(e)}")
+        
+        if languages:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(languages)))) as executor:
+                list(executor.map(warm, languages))
+        
+        return {lang: self.load_states.get(lang, "unloaded") for lang in languages}
+    
+    def preload(self, languages: List[str]) -> None:
+        """
+        Load models without running them
+        
+        Meant for the master process before workers fork (e.g. gunicorn --preload):
+        the workers inherit the loaded weights copy-on-write. No generate call is
+        made, because torch thread pools started before fork are not fork safe.
+        """
+        for lang in languages:
+            if lang not in self.language_models:
+                continue
+            try:
+                self.load_model(lang)
+            except Exception as e:
+                logger.error(f"Preload failed for {lang}: {str(e)}")
+    
+    def get_load_states(self) -> Dict[str, str]:
+        """Load state of every configured language"""
+        return {lang: self.load_states.get(lang, "unloaded") for lang in self.language_models}
+    
+    def export_bundle(self, target_lang: str, model_path: str, artifacts: List[str]) -> Dict[str, str]:
+        """
+        Build optimized artifacts of a saved model where the service looks for them
+        
+        Used by download_models.py when it assembles an offline bundle. Unlike loading,
+        which falls back to the fp32 model, a failed export raises.
+        
+        Args:
+            target_lang: Language code of the model
+            model_path: Local directory holding the saved fp32 model
+            artifacts: Any of "safetensors", "onnx" and "quantized"
+        
+        Returns:
+            Path of each built artifact
+        """
+        model_name = self.language_models[target_lang]
+        model = MarianMTModel.from_pretrained(model_path, local_files_only=True)
+        paths = {}
+        
+        if "safetensors" in artifacts:
+            from app.services.model_store import MmapModelStore
+            store = self.model_store or MmapModelStore(os.path.join(self.cache_dir, "safetensors"))
+            store.save(model, model_name)
+            paths["safetensors"] = store.model_dir(model_name)
+        
+        if "onnx" in artifacts:
+            from app.services.onnx_engine import export_model
+            export_model(model, self._onnx_dir(model_name))
+            paths["onnx"] = self._onnx_dir(model_name)
+        
+        if "quantized" in artifacts:
+            self._quantize_model(model, model_name)
+            if not os.path.exists(self._quantized_path(model_name)):
+                raise RuntimeError(f"Quantized model of {model_name} was not saved")
+            paths["quantized"] = self._quantized_path(model_name)
+        
+        return paths
+    
+    def _load_pretrained(self, model_name: str, target_lang: str) -> Tuple[MarianTokenizer, MarianMTModel]:
+        """
+        Load a tokenizer and model from the cache directory, downloading them if needed
+        
+        In quantized mode a previously quantized model is loaded from disk instead of
+        the fp32 weights; otherwise the fp32 model is quantized and saved for next time.
+        With the memory-mapped model store, fp32 weights are converted to safetensors
+        once and mapped from there, sharing one copy across processes.
+        Languages using the onnx engine get an ONNX Runtime engine in place of the
+        model, exported from the fp32 weights on first use; if the export is missing
+        and cannot be created they fall back to the torch model.
+        Models listed in the bundle manifest load from their local copy only, with
+        no hub resolution or download fallback.
+        """
+        logger.info(f"Loading model for {target_lang}: {model_name}")
+        use_onnx = self.language_engines.get(target_lang, "torch") == "onnx"
+        if use_onnx:
+            engine = self._load_onnx(model_name)
+            if engine is not None:
+                logger.info(f"Loaded ONNX Runtime engine for {target_lang}")
+                return self._load_tokenizer(model_name), engine
+        elif self.quantize:
+            cached = self._load_quantized(model_name)
+            if cached is not None:
+                logger.info(f"Loaded quantized model for {target_lang} from cache")
+                return self._load_tokenizer(model_name), cached
+        elif self.model_store is not None and self.model_store.has(model_name):
+            try:
+                model = self.model_store.load(model_name, MarianMTModel)
+                logger.info(f"Mapped stored model for {target_lang}")
+                return self._load_tokenizer(model_name), model
+            except Exception as e:
+                logger.warning(f"Could not map stored model {model_name}, loading it again: {str(e)}")
+        
+        local_path = self.manifest.get(model_name)
+        if local_path is not None:
+            tokenizer = MarianTokenizer.from_pretrained(local_path, local_files_only=True)
+            model = MarianMTModel.from_pretrained(local_path, local_files_only=True)
+            logger.info(f"Loaded bundled model for {target_lang} from {local_path}")
+        else:
+            tokenizer, model = self._load_from_hub(model_name, target_lang)
+        
+        if use_onnx:
+            engine = self._export_onnx(model, model_name)
+            if engine is not None:
+                return tokenizer, engine
+            logger.warning(f"ONNX engine unavailable for {target_lang}, using torch")
+        
+        if self.quantize:
+            model = self._quantize_model(model, model_name)
+        elif self.model_store is not None:
+            model = self._store_model(model, model_name)
+        
+        return tokenizer, model
+    
+    def _store_model(self, model: MarianMTModel, model_name: str) -> MarianMTModel:
+        """Convert a model into the store and return the mapped copy, or the model itself on failure"""
+        try:
+            self.model_store.save(model, model_name)
+            return self.model_store.load(model_name, MarianMTModel)
+        except Exception as e:
+            logger.warning(f"Could not store {model_name} for memory mapping: {str(e)}")
+            return model
+    
+    def _load_from_hub(self, model_name: str, target_lang: str) -> Tuple[MarianTokenizer, MarianMTModel]:
+        """Load a tokenizer and model from the hub cache directory, downloading them if needed"""
+        try:
+            # First try to load from cache dir to avoid network requests
+            tokenizer = MarianTokenizer.from_pretrained(
+                model_name, 
+                cache_dir=self.cache_dir,
+                local_files_only=os.path.exists(os.path.join(self.cache_dir, model_name))
+            )
+            model = MarianMTModel.from_pretrained(
+                model_name, 
+                cache_dir=self.cache_dir,
+                local_files_only=os.path.exists(os.path.join(self.cache_dir, model_name))
+            )
+            logger.info(f"Successfully loaded model for {target_lang}")
+        except Exception as e:
+            # If loading from cache fails, download from Hugging Face
+            logger.warning(f"Failed to load model from cache, downloading: {str(e)}")
+            tokenizer = MarianTokenizer.from_pretrained(
+                model_name, 
+                cache_dir=self.cache_dir
+            )
+            model = MarianMTModel.from_pretrained(
+                model_name, 
+                cache_dir=self.cache_dir
+            )
+            logger.info(f"Successfully downloaded model for {target_lang}")
+        
+        return tokenizer, model
+    
+    def _load_tokenizer(self, model_name: str) -> MarianTokenizer:
+        """Load a tokenizer on its own, when the model comes from another cache"""
+        local_path = self.manifest.get(model_name)
+        if local_path is not None:
+            return MarianTokenizer.from_pretrained(local_path, local_files_only=True)
+        return MarianTokenizer.from_pretrained(
+            model_name,
+            cache_dir=self.cache_dir,
+            local_files_only=os.path.exists(os.path.join(self.cache_dir, model_name))
+        )
+    
+    def _onnx_dir(self, model_name: str) -> str:
+        """Location of a model's ONNX export"""
+        return os.path.join(self.cache_dir, "onnx", model_name.replace("/", "--"))
+    
+    def _load_onnx(self, model_name: str):
+        """Create an ONNX Runtime engine from an existing export, or None if there is none"""
+        try:
+            from app.services.onnx_engine import OnnxMarianEngine, is_exported
+        except ImportError as e:
+            logger.warning(f"ONNX engine requires numpy and onnxruntime: {str(e)}")
+            return None
+        
+        export_dir = self._onnx_dir(model_name)
+        if not is_exported(export_dir):
+            return None
+        try:
+            return OnnxMarianEngine(export_dir, num_threads=self.onnx_threads)
+        except Exception as e:
+            logger.warning(f"Could not load ONNX export {export_dir}: {str(e)}")
+            return None
+    
+    def _export_onnx(self, model: MarianMTModel, model_name: str):
+        """Export a model to ONNX and create an engine from it, or None if that fails"""
+        try:
+            from app.services.onnx_engine import export_model
+            logger.info(f"Exporting {model_name} to ONNX")
+            export_model(model, self._onnx_dir(model_name))
+        except Exception as e:
+            logger.warning(f"ONNX export of {model_name} failed: {str(e)}")
+            return None
+        return self._load_onnx(model_name)
+    
+    def _quantized_path(self, model_name: str) -> str:
+        """Location of the cached quantized model; the torch version is part of the name
+        because pickled quantized modules are not portable across releases"""
+        file_name = f"{model_name.replace('/', '--')}-int8-torch{torch.__version__}.pt"
+        return os.path.join(self.cache_dir, "quantized", file_name)
+    
+    def _load_quantized(self, model_name: str):
+        """Load a cached quantized model, or None if there is no usable one"""
+        path = self._quantized_path(model_name)
+        if not os.path.exists(path):
+            return None
+        try:
+            model = torch.load(path, map_location="cpu", weights_only=False)
+            model.eval()
+            return model
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable quantized model {path}: {str(e)}")
+            return None
+    
+    def _quantize_model(self, model: MarianMTModel, model_name: str) -> MarianMTModel:
+        """Apply dynamic int8 quantization to the Linear layers and cache the result"""
+        model.eval()
+        quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        logger.info(
+            f"Quantized {model_name}: {self._model_footprint(model) / 1024 / 1024:.0f} MB -> "
+            f"{self._model_footprint(quantized) / 1024 / 1024:.0f} MB"
+        )
         
-        return self.models[model_name]
+        path = self._quantized_path(model_name)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so a concurrent loader never sees a partial file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            torch.save(quantized, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not cache quantized model {model_name}: {str(e)}")
+        
+        return quantized
+    
+    def _model_footprint(self, model: MarianMTModel) -> int:
+        """Bytes used by a model's parameters and buffers, including packed quantized weights"""
+        if hasattr(model, "footprint_bytes"):
+            # ONNX Runtime engine
+            return model.footprint_bytes
+        tensors = list(model.parameters()) + list(model.buffers())
+        # Dynamically quantized Linear layers keep their int8 weights in packed params
+        for module in model.modules():
+            packed = getattr(module, "_packed_params", None)
+            if hasattr(packed, "_weight_bias"):
+                tensors.extend(tensor for tensor in packed._weight_bias() if tensor is not None)
+        return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+    
+    def _resident_bytes(self) -> int:
+        """Total footprint of the resident models"""
+        return sum(self.model_sizes.values())
+    
+    def _pinned_models(self) -> set:
+        """Model names of the languages that must stay resident"""
+        return {self.language_models[lang] for lang in self.pinned_languages if lang in self.language_models}
+    
+    def _evict_for(self, size: int) -> None:
+        """Evict least recently used, unpinned models until size more bytes fit in the budget"""
+        if not self.memory_budget:
+            return
+        
+        pinned = self._pinned_models()
+        for model_name in list(self.models):
+            if self._resident_bytes() + size <= self.memory_budget:
+                break
+            if model_name in pinned:
+                continue
+            
+            del self.models[model_name]
+            freed = self.model_sizes.pop(model_name)
+            self.model_evictions += 1
+            for lang, name in self.language_models.items():
+                if name == model_name:
+                    self.load_states[lang] = "evicted"
+            logger.info(f"Evicted model {model_name} ({freed / 1024 / 1024:.0f} MB) to stay within memory budget")
+        
+        if self._resident_bytes() + size > self.memory_budget:
+            logger.warning(
+                f"Model memory budget of {self.memory_budget / 1024 / 1024:.0f} MB exceeded; "
+                "only pinned models remain resident"
+            )
+        gc.collect()
     
     # Rest of the implementation remains the same
     
-    def translate(self, text: str, target_lang: str) -> str:
-        """Translate text to the specified target language"""
+    def resolve_profile(self, target_lang: str, profile: Optional[str] = None) -> str:
+        """
+        Name of the generation profile to use
+        
+        Args:
+            target_lang: Target language code
+            profile: Requested profile; defaults to the language's profile, then the global default
+        
+        Returns:
+            A profile name present in generation_profiles
+        """
+        profile = profile or self.language_profiles.get(target_lang) or self.default_profile
+        if profile not in self.generation_profiles:
+            logger.warning(f"Unknown generation profile: {profile}, using {self.default_profile}")
+            profile = self.default_profile
+        return profile
+    
+    def _generation_kwargs(self, profile: Optional[str], input_length: int) -> Dict:
+        """generate() arguments of a profile for inputs of up to input_length tokens"""
+        config = self.generation_profiles.get(profile) if profile else None
+        if not config:
+            # Checkpoint defaults
+            return {}
+        
+        num_beams = int(config.get("num_beams", 1))
+        kwargs = {"num_beams": num_beams}
+        if num_beams > 1:
+            kwargs["early_stopping"] = bool(config.get("early_stopping", True))
+        ratio = config.get("max_new_tokens_ratio")
+        if ratio:
+            kwargs["max_new_tokens"] = math.ceil(input_length * ratio + config.get("max_new_tokens_margin", 0))
+        return kwargs
+    
+    def translate(self, text: str, target_lang: str, profile: Optional[str] = None) -> str:
+        """Translate text to the specified target language using a generation profile"""
         # Skip empty or whitespace-only strings
         if not text or text.isspace():
             return text
         
+        # Single segments join the shared micro-batches or go to the worker pool when enabled
+        if self.micro_batching or self.worker_processes:
+            return self.translate_batch([text], target_lang, profile)[0]
+        
         try:
+            profile = self.resolve_profile(target_lang, profile)
             tokenizer, model = self.load_model(target_lang)
             
-            # Handle long text by breaking it into chunks if needed
-            max_length = tokenizer.model_max_length
-            if len(text) > max_length:
-                return self._translate_long_text(text, target_lang, tokenizer, model)
-            
-            # Tokenize and translate
+            # Tokenize once; long text is split into chunks under the token budget
             inputs = tokenizer(text, return_tensors="pt", padding=True)
+            length = inputs["input_ids"].shape[1]
+            if length > self._token_budget(tokenizer):
+                return self._translate_long_text(text, target_lang, tokenizer, model, profile)
+            
+            # Translate
             with torch.no_grad():
-                translated = model.generate(**inputs)
+                translated = model.generate(**inputs, **self._generation_kwargs(profile, length))
             
             # Decode and return result
             result = tokenizer.decode(translated[0], skip_special_tokens=True)
@@ -104,32 +515,272 @@ class HuggingFaceTranslationService:
             # Return original text on error to avoid breaking the document
             return text
     
-    def _translate_long_text(
-        self, text: str, target_lang: str, tokenizer: MarianTokenizer, model: MarianMTModel
-    ) -> str:
-        """Handle translation of long text by breaking it into smaller chunks"""
-        # Simple sentence splitting based on common punctuation
-        sentences = []
-        current = ""
-        
-        # Split by common sentence terminators
-        for char in text:
-            current += char
-            if char in ['.', '!', '?', ';'] and len(current) > 10:
-                sentences.append(current)
-                current = ""
+    def translate_batch(self, texts: List[str], target_lang: str, profile: Optional[str] = None) -> List[str]:
+        """
+        Translate a list of texts to the specified target language, preserving order
+        
+        Texts are tokenized once, sorted by token length and grouped into padded
+        batches under the configured token budget, with one generate call per batch.
+        Texts over the input token budget are packed into sentence chunks that join
+        the same batches and are reassembled afterwards.
+        """
+        results = list(texts)
+        
+        # Skip empty or whitespace-only strings
+        pending = [i for i, text in enumerate(texts) if text and not text.isspace()]
+        if not pending:
+            return results
+        
+        profile = self.resolve_profile(target_lang, profile)
+        if self.worker_processes:
+            return self._translate_in_workers(texts, pending, target_lang, profile)
+        
+        try:
+            tokenizer, model = self.load_model(target_lang)
+            budget = self._token_budget(tokenizer)
+            lengths = [len(ids) for ids in tokenizer([texts[i] for i in pending]).input_ids]
+            
+            # Inputs to generate, each tagged with the text it belongs to
+            batch_owners = []
+            batch_texts = []
+            batch_lengths = []
+            for i, length in zip(pending, lengths):
+                if length > budget:
+                    chunks, chunk_lengths = self._pack_long_text(texts[i], tokenizer, budget)
+                else:
+                    chunks, chunk_lengths = [texts[i]], [length]
+                batch_owners.extend([i] * len(chunks))
+                batch_texts.extend(chunks)
+                batch_lengths.extend(chunk_lengths)
+            
+            if self.micro_batching:
+                # Share generate calls with segments from other in-flight requests
+                translated = self._get_scheduler(target_lang, profile, tokenizer).translate(batch_texts)
+            else:
+                translated = self._generate_batched(tokenizer, model, batch_texts, batch_lengths, profile)
+            
+            parts = {}
+            for i, result in zip(batch_owners, translated):
+                parts.setdefault(i, []).append(result)
+            for i, translated_parts in parts.items():
+                results[i] = " ".join(translated_parts)
+            
+        except Exception as e:
+            logger.error(f"Batch translation error for target language {target_lang}: {str(e)}")
+            # Return original texts on error to avoid breaking the document
+            return list(texts)
+        
+        return results
+    
+    def _translate_in_workers(
+        self, texts: List[str], pending: List[int], target_lang: str, profile: str
+    ) -> List[str]:
+        """Translate the non-empty texts on the least loaded worker process"""
+        results = list(texts)
+        try:
+            translated = self._get_worker_pool().translate_batch(
+                [texts[i] for i in pending], target_lang, profile
+            )
+        except Exception as e:
+            logger.error(f"Worker translation error for target language {target_lang}: {str(e)}")
+            return results
+        
+        for i, result in zip(pending, translated):
+            results[i] = result
+        return results
+    
+    def _get_worker_pool(self):
+        """Get the model worker pool, starting the worker processes on first use"""
+        with self.worker_pool_lock:
+            if self.worker_pool is None:
+                from app.services.model_worker_pool import ModelWorkerPool
+                self.worker_pool = ModelWorkerPool(
+                    self.worker_processes, settings.HUGGINGFACE_WORKER_THREADS
+                )
+            return self.worker_pool
+    
+    def close(self) -> None:
+        """Stop the micro-batching schedulers and the worker processes"""
+        with self.schedulers_lock:
+            schedulers = list(self.schedulers.values())
+            self.schedulers.clear()
+        for scheduler in schedulers:
+            scheduler.stop()
+        
+        with self.worker_pool_lock:
+            pool, self.worker_pool = self.worker_pool, None
+        if pool is not None:
+            pool.stop()
+    
+    def _get_scheduler(self, target_lang: str, profile: str, tokenizer: MarianTokenizer) -> MicroBatchScheduler:
+        """
+        Get the cross-request micro-batching scheduler for a language and generation
+        profile, starting it on first use; only segments with the same profile share a batch.
+        The scheduler counts tokens with the language's tokenizer, the same unit as the batch budget.
+        """
+        key = f"{target_lang}:{profile}"
+        with self.schedulers_lock:
+            scheduler = self.schedulers.get(key)
+            if scheduler is None:
+                model_name = self.language_models[target_lang]
+                scheduler = MicroBatchScheduler(
+                    f"{model_name}:{key}",
+                    lambda texts: self._generate_for_language(target_lang, texts, profile),
+                    max_wait_ms=settings.HUGGINGFACE_MICRO_BATCH_WAIT_MS,
+                    max_batch_tokens=self.batch_token_budget,
+                    max_batch_size=self.max_batch_size,
+                    count_tokens=lambda text: len(tokenizer([text]).input_ids[0])
+                )
+                self.schedulers[key] = scheduler
+            return scheduler
+    
+    def _generate_for_language(self, target_lang: str, texts: List[str], profile: str) -> List[str]:
+        """Translate a micro-batch collected by a scheduler"""
+        tokenizer, model = self.load_model(target_lang)
+        lengths = [len(ids) for ids in tokenizer(texts).input_ids]
+        return self._generate_batched(tokenizer, model, texts, lengths, profile)
+    
+    def get_stats(self) -> Dict[str, Dict]:
+        """Runtime statistics of model residency and the micro-batching schedulers"""
+        with self.schedulers_lock:
+            schedulers = dict(self.schedulers)
+        pool = self.worker_pool
+        with self.models_lock:
+            models = {
+                "resident": list(self.models),
+                "resident_bytes": self._resident_bytes(),
+                "budget_bytes": self.memory_budget,
+                "quantized": self.quantize,
+                "pinned_languages": sorted(self.pinned_languages),
+                "loads": self.model_loads,
+                "evictions": self.model_evictions,
+            }
+        return {
+            "models": models,
+            "schedulers": {key: scheduler.metrics() for key, scheduler in schedulers.items()},
+            "worker_pool": pool.metrics() if pool is not None else None
+        }
+    
+    def _make_batches(self, lengths: List[int]) -> List[List[int]]:
+        """
+        Group input indices into length-sorted batches
+        
+        A batch is closed when its padded size (longest input x batch size) would
+        exceed the token budget or it reaches the maximum batch size.
+        """
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+        batches = []
+        current = []
+        current_max = 0
+        
+        for i in order:
+            longest = max(current_max, lengths[i])
+            if current and (
+                longest * (len(current) + 1) > self.batch_token_budget
+                or len(current) >= self.max_batch_size
+            ):
+                batches.append(current)
+                current = []
+                longest = lengths[i]
+            current.append(i)
+            current_max = longest
         
         if current:
-            sentences.append(current)
+            batches.append(current)
+        return batches
+    
+    def _generate_batched(
+        self,
+        tokenizer: MarianTokenizer,
+        model: MarianMTModel,
+        texts: List[str],
+        lengths: List[int],
+        profile: Optional[str] = None
+    ) -> List[str]:
+        """
+        Run one padded generate call per length bucket and return results in input order
+        
+        The output length limit of each call follows the longest input in its bucket.
+        Without a profile the checkpoint's generation defaults apply.
+        """
+        results = [None] * len(texts)
         
-        # Translate each sentence
-        translated_parts = []
-        for sentence in sentences:
-            inputs = tokenizer(sentence, return_tensors="pt", padding=True)
+        for batch in self._make_batches(lengths):
+            inputs = tokenizer(
+                [texts[i] for i in batch], return_tensors="pt", padding=True, truncation=True
+            )
+            longest = max(lengths[i] for i in batch)
             with torch.no_grad():
-                translated = model.generate(**inputs)
-            result = tokenizer.decode(translated[0], skip_special_tokens=True)
-            translated_parts.append(result)
+                translated = model.generate(**inputs, **self._generation_kwargs(profile, longest))
+            
+            for i, result in zip(batch, tokenizer.batch_decode(translated, skip_special_tokens=True)):
+                results[i] = result
+        
+        return results
+    
+    def _token_budget(self, tokenizer: MarianTokenizer) -> int:
+        """Longest input in tokens sent to the model in one piece"""
+        return min(self.max_input_tokens, tokenizer.model_max_length)
+    
+    def _pack_long_text(
+        self, text: str, tokenizer: MarianTokenizer, budget: int
+    ) -> Tuple[List[str], List[int]]:
+        """
+        Split text at sentence boundaries and pack neighbouring sentences into chunks
+        
+        All sentences are tokenized in one call. A sentence that alone exceeds the
+        budget is split at word boundaries.
         
-        # Join the translated sentences
-        return " ".join(translated_parts)
\ No newline at end of file
+        Args:
+            text: Text longer than the budget
+            tokenizer: Tokenizer of the target model
+            budget: Maximum tokens per chunk, including the end of sequence token
+        
+        Returns:
+            Chunks in order and their approximate token lengths
+        """
+        sentences = [sentence for sentence in _SENTENCE_BOUNDARY.split(text.strip()) if sentence]
+        # Token counts without the end of sequence token every encoding ends with
+        lengths = [len(ids) - 1 for ids in tokenizer(sentences).input_ids]
+        
+        pieces = []
+        for sentence, length in zip(sentences, lengths):
+            if length + 1 <= budget:
+                pieces.append((sentence, length))
+                continue
+            words = sentence.split()
+            parts = math.ceil(length / (budget - 1))
+            per_part = math.ceil(len(words) / parts)
+            for start in range(0, len(words), per_part):
+                part = words[start:start + per_part]
+                pieces.append((" ".join(part), math.ceil(length * len(part) / len(words))))
+        
+        chunks = []
+        chunk_lengths = []
+        current = []
+        current_length = 0
+        for piece, length in pieces:
+            if current and current_length + length + 1 > budget:
+                chunks.append(" ".join(current))
+                chunk_lengths.append(current_length + 1)
+                current = []
+                current_length = 0
+            current.append(piece)
+            current_length += length
+        
+        if current:
+            chunks.append(" ".join(current))
+            chunk_lengths.append(current_length + 1)
+        return chunks, chunk_lengths
+    
+    def _translate_long_text(
+        self,
+        text: str,
+        target_lang: str,
+        tokenizer: MarianTokenizer,
+        model: MarianMTModel,
+        profile: Optional[str] = None
+    ) -> str:
+        """Translate text over the token budget as sentence chunks in batched generate calls"""
+        chunks, lengths = self._pack_long_text(text, tokenizer, self._token_budget(tokenizer))
+        return " ".join(self._generate_batched(tokenizer, model, chunks, lengths, profile))
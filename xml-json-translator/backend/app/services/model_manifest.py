@@ -0,0 +1,152 @@
+# app/services/model_manifest.py
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def git_blob_sha1(path: str) -> str:
+    """Git object id of a file, which the hub publishes for files not stored in LFS"""
+    digest = hashlib.sha1(f"blob {os.path.getsize(path)}\0".encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def verify_download(directory: str, expected: Dict[str, Dict[str, str]]) -> List[str]:
+    """
+    Files of a download that are missing or differ from the checksums the hub publishes
+
+    Args:
+        directory: Directory the repository files were downloaded to
+        expected: Per file path, {"sha256": ...} for LFS files or {"blob_id": ...} for the rest
+
+    Returns:
+        Description of every problem; empty if the download matches
+    """
+    problems = []
+    for path, checksum in expected.items():
+        full_path = os.path.join(directory, path)
+        if not os.path.exists(full_path):
+            problems.append(f"{path} is missing")
+        elif "sha256" in checksum and file_sha256(full_path) != checksum["sha256"]:
+            problems.append(f"{path} does not match the published sha256")
+        elif "blob_id" in checksum and git_blob_sha1(full_path) != checksum["blob_id"]:
+            problems.append(f"{path} does not match the published git blob id")
+    return problems
+
+
+def checksum_paths(root: str, paths: Iterable[str]) -> Dict[str, str]:
+    """
+    Checksums of every file under the given paths
+
+    Args:
+        root: Directory the manifest lives in
+        paths: Files or directories relative to root
+
+    Returns:
+        SHA-256 per file path relative to root
+    """
+    checksums = {}
+    for path in paths:
+        full_path = os.path.join(root, path)
+        if os.path.isfile(full_path):
+            checksums[path] = file_sha256(full_path)
+            continue
+        for directory, _, files in os.walk(full_path):
+            for name in sorted(files):
+                file_path = os.path.join(directory, name)
+                checksums[os.path.relpath(file_path, root)] = file_sha256(file_path)
+    return checksums
+
+
+def write_manifest(root: str, models: Dict[str, Dict]) -> str:
+    """
+    Write the manifest of a model bundle
+
+    Args:
+        root: Bundle directory
+        models: Entry per language with model_name, path, artifacts and files
+
+    Returns:
+        Path of the written manifest
+    """
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "models": models,
+    }
+    path = os.path.join(root, MANIFEST_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+    return path
+
+
+def verify_entry(root: str, entry: Dict) -> List[str]:
+    """Files of a manifest entry that are missing or whose checksum differs"""
+    problems = []
+    for path, checksum in entry.get("files", {}).items():
+        full_path = os.path.join(root, path)
+        if not os.path.exists(full_path):
+            problems.append(f"{path} is missing")
+        elif file_sha256(full_path) != checksum:
+            problems.append(f"{path} has a wrong checksum")
+    return problems
+
+
+def load_manifest(path: str, verify: bool = False) -> Dict[str, str]:
+    """
+    Read a bundle manifest
+
+    Args:
+        path: Location of manifest.json
+        verify: Check every file checksum and skip models that do not match
+
+    Returns:
+        Absolute local path of each bundled model, by model name; empty if there is no manifest
+    """
+    if not os.path.exists(path):
+        return {}
+
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except Exception as e:
+        logger.error(f"Could not read model manifest {path}: {str(e)}")
+        return {}
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        logger.error(f"Unsupported model manifest version {manifest.get('version')} in {path}")
+        return {}
+
+    root = os.path.dirname(os.path.abspath(path))
+    local_paths = {}
+    for language, entry in manifest.get("models", {}).items():
+        if verify:
+            problems = verify_entry(root, entry)
+            if problems:
+                logger.error(f"Ignoring bundled model for {language}: {'; '.join(problems[:3])}")
+                continue
+        local_paths[entry["model_name"]] = os.path.join(root, entry["path"])
+
+    logger.info(f"Model manifest {path} lists {len(local_paths)} models")
+    return local_paths
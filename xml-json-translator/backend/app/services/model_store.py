@@ -0,0 +1,164 @@
+# app/services/model_store.py
+import json
+import logging
+import os
+import shutil
+import struct
+from typing import Dict
+
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+WEIGHTS_FILE = "model.safetensors"
+
+# safetensors dtype names that numpy can view directly
+_NUMPY_DTYPES = {
+    "F64": np.float64,
+    "F32": np.float32,
+    "F16": np.float16,
+    "I64": np.int64,
+    "I32": np.int32,
+    "I16": np.int16,
+    "I8": np.int8,
+    "U8": np.uint8,
+    "BOOL": np.bool_,
+}
+
+
+class MmapModelStore:
+    """
+    Model weights stored as safetensors and memory-mapped copy-on-write
+
+    Every process that loads a model maps the same file, so the weights occupy
+    one copy in the OS page cache however many worker processes use them.
+    Tensors are built directly on the mapping, so nothing is read until a page
+    is touched and pages are only copied if a process writes to them.
+    """
+
+    def __init__(self, store_dir: str):
+        """
+        Args:
+            store_dir: Directory holding one subdirectory per model
+        """
+        self.store_dir = store_dir
+
+    def model_dir(self, model_name: str) -> str:
+        """Directory of a stored model"""
+        return os.path.join(self.store_dir, model_name.replace("/", "--"))
+
+    def has(self, model_name: str) -> bool:
+        """Whether a model has been converted"""
+        return os.path.exists(os.path.join(self.model_dir(model_name), WEIGHTS_FILE))
+
+    def save(self, model: torch.nn.Module, model_name: str) -> None:
+        """
+        Convert a loaded model to safetensors with its config
+
+        Tied weights are stored once; the other names are recorded as aliases.
+        """
+        model_dir = self.model_dir(model_name)
+        tmp_dir = f"{model_dir}.{os.getpid()}.tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        try:
+            if hasattr(model, "config"):
+                model.config.save_pretrained(tmp_dir)
+            save_tensors(model, os.path.join(tmp_dir, WEIGHTS_FILE))
+
+            if os.path.exists(model_dir):
+                shutil.rmtree(model_dir)
+            os.replace(tmp_dir, model_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        logger.info(f"Stored {model_name} as safetensors in {model_dir}")
+
+    def load(self, model_name: str, model_class):
+        """
+        Build a model from its stored config and map its weights
+
+        Args:
+            model_name: Name of a converted model
+            model_class: transformers model class, e.g. MarianMTModel
+
+        Returns:
+            The model in eval mode with parameters backed by the mapped file
+        """
+        from transformers.modeling_utils import no_init_weights
+
+        model_dir = self.model_dir(model_name)
+        config = model_class.config_class.from_pretrained(model_dir)
+        # Skip random initialization; every weight is replaced by the mapped tensors
+        with no_init_weights():
+            model = model_class(config)
+        load_into(model, os.path.join(model_dir, WEIGHTS_FILE))
+        model.eval()
+        return model
+
+
+def save_tensors(model: torch.nn.Module, path: str) -> None:
+    """Write a model's parameters and buffers to a safetensors file, storing tied tensors once"""
+    from safetensors.torch import save_file
+
+    tensors = {}
+    aliases = {}
+    seen = {}
+    for name, tensor in _named_tensors(model).items():
+        key = (tensor.data_ptr(), tensor.dtype, tuple(tensor.shape))
+        if key in seen:
+            aliases[name] = seen[key]
+            continue
+        seen[key] = name
+        tensors[name] = tensor.detach().cpu().contiguous()
+
+    save_file(tensors, path, metadata={"aliases": json.dumps(aliases)})
+
+
+def mmap_tensors(path: str) -> Dict[str, torch.Tensor]:
+    """
+    Map a safetensors file copy-on-write and return its tensors, including aliases
+
+    The header is a little-endian u64 length followed by JSON giving each tensor's
+    dtype, shape and byte range in the data section.
+    """
+    with open(path, "rb") as f:
+        header_size = struct.unpack("<Q", f.read(8))[0]
+        header = json.loads(f.read(header_size))
+
+    metadata = header.pop("__metadata__", None) or {}
+    data = np.memmap(path, dtype=np.uint8, mode="c", offset=8 + header_size)
+
+    tensors = {}
+    for name, info in header.items():
+        if info["dtype"] not in _NUMPY_DTYPES:
+            raise ValueError(f"Cannot map tensor {name} with dtype {info['dtype']}")
+        start, end = info["data_offsets"]
+        array = data[start:end].view(_NUMPY_DTYPES[info["dtype"]]).reshape(info["shape"])
+        tensors[name] = torch.from_numpy(array)
+
+    for alias, name in json.loads(metadata.get("aliases", "{}")).items():
+        tensors[alias] = tensors[name]
+    return tensors
+
+
+def load_into(model: torch.nn.Module, path: str) -> None:
+    """Point every parameter and buffer of a model at the mapped tensors of a safetensors file"""
+    tensors = mmap_tensors(path)
+    missing = []
+    with torch.no_grad():
+        for name, tensor in _named_tensors(model).items():
+            mapped = tensors.get(name)
+            if mapped is None or mapped.shape != tensor.shape:
+                missing.append(name)
+                continue
+            tensor.data = mapped
+    if missing:
+        raise ValueError(f"Stored weights do not match the model: {', '.join(missing[:5])}")
+
+
+def _named_tensors(model: torch.nn.Module) -> Dict[str, torch.Tensor]:
+    """Parameters and buffers by name, including every name of tied tensors"""
+    tensors = dict(model.named_parameters(remove_duplicate=False))
+    tensors.update(model.named_buffers(remove_duplicate=False))
+    return tensors
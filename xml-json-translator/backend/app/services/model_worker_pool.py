@@ -0,0 +1,215 @@
+# app/services/model_worker_pool.py
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# How often the result thread checks that workers are still alive
+_HEALTH_CHECK_SECONDS = 1.0
+
+
+class ModelWorkerPool:
+    """
+    Pool of worker processes that each run their own HuggingFaceTranslationService
+
+    Every worker has a fixed torch thread count, its own request queue and loads
+    models on demand. Calls are dispatched to the worker with the fewest segments
+    in flight, preferring workers that already served the language so models are
+    not loaded by every worker. One thread in the parent reads the shared result
+    queue and resolves the callers' futures.
+    """
+
+    def __init__(self, num_workers: int, threads_per_worker: int = 0):
+        """
+        Args:
+            num_workers: Number of worker processes
+            threads_per_worker: torch intra-op threads per worker; 0 divides the cores evenly
+        """
+        # Spawn instead of fork: forking a process that already runs torch threads can deadlock
+        context = multiprocessing.get_context("spawn")
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // num_workers)
+
+        self._results = context.Queue()
+        self._lock = threading.Lock()
+        self._request_ids = itertools.count()
+        self._pending = {}  # Request id -> (future, worker index, segments)
+        self._in_flight = [0] * num_workers
+        self._completed = [0] * num_workers
+        self._languages = [set() for _ in range(num_workers)]
+        self._stopped = threading.Event()
+
+        self._requests = []
+        self._processes = []
+        for index in range(num_workers):
+            requests = context.Queue()
+            process = context.Process(
+                target=_worker_main,
+                args=(index, requests, self._results, self.threads_per_worker),
+                name=f"model-worker-{index}",
+                daemon=True
+            )
+            process.start()
+            self._requests.append(requests)
+            self._processes.append(process)
+
+        self._result_thread = threading.Thread(target=self._read_results, name="model-worker-results", daemon=True)
+        self._result_thread.start()
+        logger.info(f"Started {num_workers} model workers with {self.threads_per_worker} threads each")
+
+    def translate_batch(self, texts: List[str], target_lang: str, profile: Optional[str] = None) -> List[str]:
+        """Translate texts on the least loaded worker, blocking until the result arrives"""
+        return self._submit("translate_batch", (texts, target_lang, profile), len(texts), target_lang).result()
+
+    def warmup(self, languages: List[str], max_workers: int = 4) -> Dict[str, str]:
+        """
+        Load and warm the languages in every worker
+
+        Returns:
+            Load state per language; ready only if every worker warmed it
+        """
+        futures = [
+            self._submit("warmup", (languages, max_workers), 0, None, worker=index)
+            for index in self._alive_workers()
+        ]
+        states = {lang: "ready" for lang in languages}
+        for future in futures:
+            try:
+                worker_states = future.result()
+            except Exception as e:
+                logger.error(f"Worker warmup failed: {str(e)}")
+                return {lang: "failed" for lang in languages}
+            for lang in languages:
+                if worker_states.get(lang) != "ready":
+                    states[lang] = worker_states.get(lang, "failed")
+
+        with self._lock:
+            for known in self._languages:
+                known.update(languages)
+        return states
+
+    def stop(self) -> None:
+        """Ask the workers to exit and fail any call still waiting"""
+        self._stopped.set()
+        for requests in self._requests:
+            requests.put(None)
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        self._result_thread.join(timeout=5)
+        self._fail_pending(lambda worker: True, "Model worker pool is stopped")
+
+    def metrics(self) -> Dict:
+        """Per-worker process id, liveness, segments in flight and calls completed"""
+        with self._lock:
+            return {
+                "threads_per_worker": self.threads_per_worker,
+                "workers": [
+                    {
+                        "pid": process.pid,
+                        "alive": process.is_alive(),
+                        "in_flight_segments": self._in_flight[index],
+                        "completed": self._completed[index],
+                        "languages": sorted(self._languages[index]),
+                    }
+                    for index, process in enumerate(self._processes)
+                ],
+            }
+
+    def _alive_workers(self) -> List[int]:
+        """Indexes of the workers that are still running"""
+        return [index for index, process in enumerate(self._processes) if process.is_alive()]
+
+    def _pick_worker(self, target_lang: str) -> int:
+        """Least loaded live worker, preferring one that has the language loaded; the caller holds the lock"""
+        alive = self._alive_workers()
+        if not alive:
+            raise RuntimeError("No model workers are running")
+        return min(alive, key=lambda index: (self._in_flight[index], target_lang not in self._languages[index]))
+
+    def _submit(self, method: str, args: tuple, segments: int, target_lang, worker: int = None) -> Future:
+        """Send a call to a worker and return the future for its result"""
+        if self._stopped.is_set():
+            raise RuntimeError("Model worker pool is stopped")
+
+        future = Future()
+        with self._lock:
+            index = self._pick_worker(target_lang) if worker is None else worker
+            request_id = next(self._request_ids)
+            self._pending[request_id] = (future, index, segments)
+            self._in_flight[index] += segments
+            if target_lang:
+                self._languages[index].add(target_lang)
+        self._requests[index].put((request_id, method, args))
+        return future
+
+    def _read_results(self) -> None:
+        """Resolve futures from the result queue and fail calls on workers that died"""
+        while not self._stopped.is_set():
+            try:
+                request_id, result, error = self._results.get(timeout=_HEALTH_CHECK_SECONDS)
+            except queue.Empty:
+                dead = {index for index, process in enumerate(self._processes) if not process.is_alive()}
+                if dead:
+                    self._fail_pending(lambda worker: worker in dead, "Model worker exited")
+                continue
+
+            with self._lock:
+                entry = self._pending.pop(request_id, None)
+                if entry is None:
+                    continue
+                future, index, segments = entry
+                self._in_flight[index] -= segments
+                self._completed[index] += 1
+
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(RuntimeError(error))
+
+    def _fail_pending(self, matches, message: str) -> None:
+        """Fail the waiting calls of the workers selected by matches"""
+        with self._lock:
+            failed = [
+                (request_id, entry) for request_id, entry in self._pending.items() if matches(entry[1])
+            ]
+            for request_id, (_, index, segments) in failed:
+                del self._pending[request_id]
+                self._in_flight[index] -= segments
+
+        for _, (future, index, _) in failed:
+            logger.error(f"{message}: worker {index}")
+            future.set_exception(RuntimeError(message))
+
+
+def _worker_main(index: int, requests, results, num_threads: int) -> None:
+    """Worker process loop: run service calls until a None request arrives"""
+    # Workers serve in-process; they must not start pools of their own
+    os.environ["HUGGINGFACE_WORKER_PROCESSES"] = "0"
+
+    import torch
+    torch.set_num_threads(num_threads)
+
+    from app.services.huggingface_service import HuggingFaceTranslationService
+    service = HuggingFaceTranslationService()
+
+    while True:
+        item = requests.get()
+        if item is None:
+            break
+
+        request_id, method, args = item
+        try:
+            results.put((request_id, getattr(service, method)(*args), None))
+        except Exception as e:
+            logger.error(f"Model worker {index} failed in {method}: {str(e)}")
+            results.put((request_id, None, str(e)))
+
+    service.close()
@@ -0,0 +1,221 @@
+# app/services/onnx_engine.py
+import json
+import logging
+import os
+import shutil
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ENCODER_FILE = "encoder.onnx"
+DECODER_FILE = "decoder.onnx"
+GENERATION_FILE = "generation.json"
+
+
+class OnnxMarianEngine:
+    """
+    MarianMT inference on ONNX Runtime's CPU provider
+
+    The encoder and the decoder (with the language model head) run as two ONNX
+    graphs. Decoding is greedy and recomputes the decoder over the whole prefix
+    at each step. The engine exposes generate() with the arguments the service
+    passes to MarianMTModel.generate, so it can stand in for the torch model.
+    """
+
+    def __init__(self, export_dir: str, num_threads: int = 0):
+        """
+        Args:
+            export_dir: Directory written by export_model
+            num_threads: Intra-op threads for each session; 0 uses the ONNX Runtime default
+        """
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        providers = ["CPUExecutionProvider"]
+        self.export_dir = export_dir
+        self.encoder = ort.InferenceSession(os.path.join(export_dir, ENCODER_FILE), options, providers=providers)
+        self.decoder = ort.InferenceSession(os.path.join(export_dir, DECODER_FILE), options, providers=providers)
+
+        with open(os.path.join(export_dir, GENERATION_FILE)) as f:
+            generation = json.load(f)
+        self.decoder_start_token_id = generation["decoder_start_token_id"]
+        self.eos_token_id = generation["eos_token_id"]
+        self.pad_token_id = generation["pad_token_id"]
+        self.max_length = generation["max_length"]
+
+    @property
+    def footprint_bytes(self) -> int:
+        """Size of the exported graphs, which ONNX Runtime keeps in memory"""
+        return sum(
+            os.path.getsize(os.path.join(self.export_dir, name))
+            for name in (ENCODER_FILE, DECODER_FILE)
+        )
+
+    def generate(
+        self,
+        input_ids,
+        attention_mask=None,
+        max_length: Optional[int] = None,
+        max_new_tokens: Optional[int] = None,
+        **kwargs
+    ) -> np.ndarray:
+        """
+        Greedy decoding of a padded batch
+
+        Args:
+            input_ids: Token ids of shape (batch, source_length), torch tensor or array
+            attention_mask: Source padding mask; all ones when omitted
+            max_length: Maximum output length including the start token
+            max_new_tokens: Maximum generated tokens; takes precedence over max_length
+            kwargs: Other generation arguments such as num_beams, ignored by greedy decoding
+
+        Returns:
+            Output token ids of shape (batch, output_length), padded after EOS
+        """
+        input_ids = _to_numpy(input_ids)
+        attention_mask = np.ones_like(input_ids) if attention_mask is None else _to_numpy(attention_mask)
+        if max_new_tokens:
+            max_length = max_new_tokens + 1
+        max_length = min(max_length or self.max_length, self.max_length)
+
+        hidden_states = self.encoder.run(
+            None, {"input_ids": input_ids, "attention_mask": attention_mask}
+        )[0]
+
+        batch_size = input_ids.shape[0]
+        output_ids = np.full((batch_size, 1), self.decoder_start_token_id, dtype=np.int64)
+        finished = np.zeros(batch_size, dtype=bool)
+
+        for _ in range(max_length - 1):
+            logits = self.decoder.run(None, {
+                "decoder_input_ids": output_ids,
+                "encoder_hidden_states": hidden_states,
+                "encoder_attention_mask": attention_mask,
+            })[0][:, -1, :]
+            # Marian never generates the pad token
+            logits[:, self.pad_token_id] = -np.inf
+            next_tokens = np.where(finished, self.pad_token_id, logits.argmax(axis=-1))
+
+            output_ids = np.concatenate([output_ids, next_tokens[:, None].astype(np.int64)], axis=1)
+            finished |= next_tokens == self.eos_token_id
+            if finished.all():
+                break
+
+        return output_ids
+
+
+def export_model(model, export_dir: str, opset: int = 14) -> None:
+    """
+    Export a MarianMTModel's encoder and decoder to ONNX
+
+    The files are written to a temporary directory first and moved into place,
+    so a concurrent loader never sees a partial export.
+
+    Args:
+        model: Loaded fp32 MarianMTModel
+        export_dir: Destination directory
+        opset: ONNX opset version
+    """
+    import torch
+
+    class Encoder(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.encoder = model.get_encoder()
+
+        def forward(self, input_ids, attention_mask):
+            return self.encoder(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+
+    class Decoder(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.decoder = model.get_decoder()
+            self.lm_head = model.lm_head
+            self.register_buffer("final_logits_bias", model.final_logits_bias)
+
+        def forward(self, decoder_input_ids, encoder_hidden_states, encoder_attention_mask):
+            hidden = self.decoder(
+                input_ids=decoder_input_ids,
+                encoder_hidden_states=encoder_hidden_states,
+                encoder_attention_mask=encoder_attention_mask,
+                use_cache=False
+            ).last_hidden_state
+            return self.lm_head(hidden) + self.final_logits_bias
+
+    model.eval()
+    tmp_dir = f"{export_dir}.{os.getpid()}.tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    input_ids = torch.ones((2, 8), dtype=torch.long)
+    attention_mask = torch.ones((2, 8), dtype=torch.long)
+    decoder_input_ids = torch.full((2, 3), model.config.decoder_start_token_id, dtype=torch.long)
+
+    try:
+        encoder = Encoder(model)
+        decoder = Decoder(model)
+        with torch.no_grad():
+            torch.onnx.export(
+                encoder, (input_ids, attention_mask), os.path.join(tmp_dir, ENCODER_FILE),
+                input_names=["input_ids", "attention_mask"],
+                output_names=["last_hidden_state"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "source"},
+                    "attention_mask": {0: "batch", 1: "source"},
+                    "last_hidden_state": {0: "batch", 1: "source"},
+                },
+                opset_version=opset
+            )
+            hidden_states = encoder(input_ids, attention_mask)
+            torch.onnx.export(
+                decoder, (decoder_input_ids, hidden_states, attention_mask), os.path.join(tmp_dir, DECODER_FILE),
+                input_names=["decoder_input_ids", "encoder_hidden_states", "encoder_attention_mask"],
+                output_names=["logits"],
+                dynamic_axes={
+                    "decoder_input_ids": {0: "batch", 1: "target"},
+                    "encoder_hidden_states": {0: "batch", 1: "source"},
+                    "encoder_attention_mask": {0: "batch", 1: "source"},
+                    "logits": {0: "batch", 1: "target"},
+                },
+                opset_version=opset
+            )
+
+        with open(os.path.join(tmp_dir, GENERATION_FILE), "w") as f:
+            json.dump(_generation_config(model), f)
+
+        if os.path.exists(export_dir):
+            shutil.rmtree(export_dir)
+        os.replace(tmp_dir, export_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def is_exported(export_dir: str) -> bool:
+    """Whether export_dir holds a complete export"""
+    return all(
+        os.path.exists(os.path.join(export_dir, name))
+        for name in (ENCODER_FILE, DECODER_FILE, GENERATION_FILE)
+    )
+
+
+def _generation_config(model) -> Dict[str, int]:
+    """Token ids and length limit needed to decode without the torch model"""
+    config = model.config
+    return {
+        "decoder_start_token_id": config.decoder_start_token_id,
+        "eos_token_id": config.eos_token_id,
+        "pad_token_id": config.pad_token_id,
+        "max_length": config.max_length,
+    }
+
+
+def _to_numpy(value) -> np.ndarray:
+    """Convert a torch tensor or sequence of ids to an int64 array"""
+    if hasattr(value, "detach"):
+        value = value.detach().cpu().numpy()
+    return np.asarray(value, dtype=np.int64)
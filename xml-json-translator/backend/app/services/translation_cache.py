@@ -0,0 +1,126 @@
+# app/services/translation_cache.py
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+# Approximate per-entry bookkeeping cost (OrderedDict node and entry tuple)
+_ENTRY_OVERHEAD_BYTES = 120
+
+class TranslationCache:
+    """
+    In-process LRU cache of translations, bounded by total bytes
+
+    Each entry carries its own expiry so results produced by an older model can
+    age out. All operations take a single lock, which is only held for dictionary
+    updates, so the cache is safe to share across the FastAPI threadpool.
+    """
+
+    def __init__(self, max_bytes: int, default_ttl: Optional[float] = None):
+        """
+        Args:
+            max_bytes: Maximum resident size of keys and values
+            default_ttl: Seconds an entry stays valid when put without a ttl;
+                None keeps entries until they are evicted
+        """
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _entry_size(key: str, value: str) -> int:
+        """Approximate memory used by an entry"""
+        return sys.getsizeof(key) + sys.getsizeof(value) + _ENTRY_OVERHEAD_BYTES
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry; the caller must hold the lock"""
+        _, size, _ = self._entries.pop(key)
+        self.resident_bytes -= size
+
+    def _lookup(self, key: str, now: float) -> Optional[str]:
+        """Find a live entry and mark it recently used; the caller must hold the lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, _, expires_at = entry
+        if expires_at is not None and expires_at <= now:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached translation, or None if it is missing or expired"""
+        with self._lock:
+            return self._lookup(key, time.monotonic())
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Get every cached translation among keys"""
+        found = {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                value = self._lookup(key, now)
+                if value is not None:
+                    found[key] = value
+        return found
+
+    def put(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """Cache a translation, evicting least recently used entries to stay within max_bytes"""
+        self.put_many({key: value}, ttl)
+
+    def put_many(self, items: Dict[str, str], ttl: Optional[float] = None) -> None:
+        """Cache several translations with the same ttl"""
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.monotonic()
+        expires_at = now + ttl if ttl else None
+
+        with self._lock:
+            for key, value in items.items():
+                size = self._entry_size(key, value)
+                if size > self.max_bytes:
+                    continue
+
+                if key in self._entries:
+                    self._remove(key)
+                self._entries[key] = (value, size, expires_at)
+                self.resident_bytes += size
+
+            while self.resident_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry, e.g. after a model upgrade"""
+        with self._lock:
+            self._entries.clear()
+            self.resident_bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Hit rate, evictions and resident size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+                "resident_bytes": self.resident_bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -1,24 +1,52 @@
-from typing import List, Dict, Union
+from typing import Callable, List, Dict, Optional, Union
+import importlib
 import logging
+import threading
 
 from app.core.config import get_settings
-from app.services.huggingface_service import HuggingFaceTranslationService
-from app.services.claude_service import ClaudeTranslationService
+from app.services.translation_cache import TranslationCache
+from app.services.translation_memory import TranslationMemory
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Translation backends as "module:ClassName", imported on first use so that a
+# deployment never pays for engines it does not use (e.g. torch for Claude-only)
+SERVICE_REGISTRY: Dict[str, str] = {
+    "huggingface": "app.services.huggingface_service:HuggingFaceTranslationService",
+    "claude": "app.services.claude_service:ClaudeTranslationService",
+}
+
+DEFAULT_SERVICE_TYPE = "huggingface"
+
 class TranslationServiceFactory:
     """Factory for creating translation service instances based on configuration"""
     
-    _huggingface_instance = None
-    _claude_instance = None
+    _instances: Dict[str, object] = {}
+    _instances_lock = threading.RLock()
+    _translation_cache = None
+    _translation_cache_lock = threading.Lock()
+    _translation_memory = None
+    _translation_memory_lock = threading.Lock()
+    
+    @classmethod
+    def register_service(cls, service_type: str, import_path: str) -> None:
+        """
+        Register a translation backend to be imported lazily
+        
+        Args:
+            service_type: Name used to select the service
+            import_path: Location of the service class as "module:ClassName"
+        """
+        SERVICE_REGISTRY[service_type.lower()] = import_path
     
     @classmethod
     def get_service(cls, service_type: str = None):
         """
         Get the translation service based on the specified type or default configuration
         
+        The service module is imported and instantiated the first time it is requested.
+        
         Args:
             service_type: Optional service type override ('huggingface' or 'claude')
         
@@ -29,23 +57,49 @@ class TranslationServiceFactory:
         service_type = service_type or settings.TRANSLATION_SERVICE
         service_type = service_type.lower()
         
-        if service_type == "huggingface":
-            if cls._huggingface_instance is None:
-                logger.info("Creating HuggingFace translation service")
-                cls._huggingface_instance = HuggingFaceTranslationService()
-            return cls._huggingface_instance
-            
-        elif service_type == "claude":
-            if cls._claude_instance is None:
-                logger.info("Creating Claude API translation service")
-                cls._claude_instance = ClaudeTranslationService()
-            return cls._claude_instance
-            
-        else:
+        if service_type not in SERVICE_REGISTRY:
             logger.warning(f"Unknown service type: {service_type}, falling back to HuggingFace")
-            if cls._huggingface_instance is None:
-                cls._huggingface_instance = HuggingFaceTranslationService()
-            return cls._huggingface_instance
+            service_type = DEFAULT_SERVICE_TYPE
+        
+        instance = cls._instances.get(service_type)
+        if instance is not None:
+            return instance
+        
+        with cls._instances_lock:
+            if service_type not in cls._instances:
+                module_name, class_name = SERVICE_REGISTRY[service_type].split(":")
+                logger.info(f"Creating {service_type} translation service")
+                service_class = getattr(importlib.import_module(module_name), class_name)
+                cls._instances[service_type] = service_class()
+            return cls._instances[service_type]
+    
+    @classmethod
+    def get_loaded_service(cls, service_type: str):
+        """
+        Get a service instance only if it has already been created
+        
+        Args:
+            service_type: Service type name
+        
+        Returns:
+            The service instance, or None without importing the backend
+        """
+        return cls._instances.get(service_type.lower())
+    
+    @classmethod
+    def close(cls) -> None:
+        """Release resources held by the created services, e.g. worker processes"""
+        with cls._instances_lock:
+            instances = list(cls._instances.items())
+        
+        for service_type, service in instances:
+            close = getattr(service, "close", None)
+            if close is None:
+                continue
+            try:
+                close()
+            except Exception as e:
+                logger.error(f"Error closing {service_type} translation service: {str(e)}")
     
     @classmethod
     def get_supported_languages(cls, service_type: str = None) -> List[Dict[str, str]]:
@@ -62,7 +116,175 @@ class TranslationServiceFactory:
         return service.get_supported_languages()
     
     @classmethod
-    def translate(cls, text: str, target_lang: str, service_type: str = None) -> str:
+    def get_translation_memory(cls) -> Optional[TranslationMemory]:
+        """
+        Get the shared translation memory, or None if it is disabled
+        
+        Returns:
+            The TranslationMemory instance backed by TRANSLATION_MEMORY_PATH
+        """
+        if not settings.TRANSLATION_MEMORY_ENABLED:
+            return None
+        
+        with cls._translation_memory_lock:
+            if cls._translation_memory is None:
+                logger.info(f"Opening translation memory at {settings.TRANSLATION_MEMORY_PATH}")
+                cls._translation_memory = TranslationMemory(
+                    settings.TRANSLATION_MEMORY_PATH,
+                    max_bytes=settings.TRANSLATION_MEMORY_MAX_MB * 1024 * 1024,
+                    touch_interval=settings.TRANSLATION_MEMORY_TOUCH_INTERVAL_SECONDS
+                )
+        return cls._translation_memory
+    
+    @classmethod
+    def get_translation_cache(cls) -> Optional[TranslationCache]:
+        """
+        Get the in-process translation cache, or None if it is disabled
+        
+        Returns:
+            The TranslationCache instance shared by all requests in this process
+        """
+        if not settings.TRANSLATION_CACHE_ENABLED:
+            return None
+        
+        with cls._translation_cache_lock:
+            if cls._translation_cache is None:
+                cls._translation_cache = TranslationCache(
+                    max_bytes=settings.TRANSLATION_CACHE_MAX_MB * 1024 * 1024,
+                    default_ttl=settings.TRANSLATION_CACHE_TTL_SECONDS or None
+                )
+        return cls._translation_cache
+    
+    @classmethod
+    def get_stats(cls) -> Dict[str, Dict]:
+        """
+        Get runtime statistics of the translation layers
+        
+        Returns:
+            Dictionary of statistics keyed by component
+        """
+        stats = {}
+        cache = cls.get_translation_cache()
+        if cache is not None:
+            stats["translation_cache"] = cache.stats()
+        memory = cls.get_translation_memory()
+        if memory is not None:
+            stats["translation_memory"] = memory.stats()
+        huggingface = cls.get_loaded_service("huggingface")
+        if huggingface is not None:
+            stats["huggingface"] = huggingface.get_stats()
+        claude = cls.get_loaded_service("claude")
+        if claude is not None:
+            stats["claude"] = claude.get_stats()
+        return stats
+    
+    @classmethod
+    def _model_name(cls, service, target_lang: str) -> str:
+        """Name of the model a service uses for a language, part of the translation memory key"""
+        language_models = getattr(service, 'language_models', None)
+        if language_models is not None:
+            return language_models.get(target_lang, '')
+        return getattr(service, 'model', '')
+    
+    @classmethod
+    def _translate_cached(
+        cls,
+        texts: List[str],
+        target_lang: str,
+        service_type: Optional[str],
+        translate_missing: Callable[[List[str]], List[str]],
+        variant: str = ''
+    ) -> List[str]:
+        """
+        Answer texts from the in-process cache, then the translation memory,
+        and translate only what neither of them holds
+        
+        Args:
+            texts: Texts to translate
+            target_lang: Target language code
+            service_type: Optional service type override
+            translate_missing: Function translating the texts not found in either tier
+            variant: Suffix distinguishing specialized prompts (e.g. JSON fields) or generation profiles
+        
+        Returns:
+            Translated texts in the same order as the input
+        """
+        cache = cls.get_translation_cache()
+        memory = cls.get_translation_memory()
+        if cache is None and memory is None:
+            return translate_missing(texts)
+        
+        service = cls.get_service(service_type)
+        service_key = (service_type or settings.TRANSLATION_SERVICE).lower()
+        if variant:
+            service_key = f"{service_key}:{variant}"
+        model_name = cls._model_name(service, target_lang)
+        
+        # Empty and whitespace-only strings are returned as-is by the services
+        keys = [
+            TranslationMemory.make_key(text, target_lang, service_key, model_name)
+            if text and not text.isspace() else None
+            for text in texts
+        ]
+        lookup_keys = [key for key in keys if key is not None]
+        
+        found = cache.get_many(lookup_keys) if cache is not None else {}
+        
+        if memory is not None:
+            try:
+                from_memory = memory.get_many(key for key in lookup_keys if key not in found)
+            except Exception as e:
+                logger.warning(f"Translation memory lookup failed: {str(e)}")
+                from_memory = {}
+            
+            # Promote durable hits into the fast tier
+            if cache is not None and from_memory:
+                cache.put_many(from_memory)
+            found.update(from_memory)
+        
+        results = [found.get(key) if key is not None else None for key in keys]
+        missing = [i for i, key in enumerate(keys) if key is None or key not in found]
+        
+        if missing:
+            translated = translate_missing([texts[i] for i in missing])
+            new_entries = {}
+            for i, translation in zip(missing, translated):
+                results[i] = translation
+                # Services return the source text when translation fails, so don't store it
+                if keys[i] is not None and translation != texts[i]:
+                    new_entries[keys[i]] = translation
+            
+            if cache is not None:
+                cache.put_many(new_entries)
+            
+            if memory is not None:
+                try:
+                    memory.put_many([
+                        (key, target_lang, service_key, model_name, translation)
+                        for key, translation in new_entries.items()
+                    ])
+                except Exception as e:
+                    logger.warning(f"Translation memory update failed: {str(e)}")
+        
+        return results
+    
+    @classmethod
+    def _generation_options(cls, service, target_lang: str, profile: Optional[str]):
+        """
+        Service arguments and cache key variant for a generation profile
+        
+        Services without generation profiles (Claude) ignore the profile.
+        
+        Returns:
+            Keyword arguments for the service call and the resolved profile name
+        """
+        if not hasattr(service, 'resolve_profile'):
+            return {}, ''
+        resolved = service.resolve_profile(target_lang, profile)
+        return {"profile": resolved}, resolved
+    
+    @classmethod
+    def translate(cls, text: str, target_lang: str, service_type: str = None, profile: str = None) -> str:
         """
         Translate text using the specified service
         
@@ -70,15 +292,21 @@ class TranslationServiceFactory:
             text: Text to translate
             target_lang: Target language code
             service_type: Optional service type override
+            profile: Optional generation profile (fast, balanced or quality)
         
         Returns:
             Translated text
         """
         service = cls.get_service(service_type)
-        return service.translate(text, target_lang)
+        options, variant = cls._generation_options(service, target_lang, profile)
+        return cls._translate_cached(
+            [text], target_lang, service_type,
+            lambda missing: [service.translate(item, target_lang, **options) for item in missing],
+            variant=variant
+        )[0]
     
     @classmethod
-    def translate_json_field(cls, text: str, target_lang: str, service_type: str = None) -> str:
+    def translate_json_field(cls, text: str, target_lang: str, service_type: str = None, profile: str = None) -> str:
         """
         Translate JSON field specifically, with special handling for different services
         
@@ -86,6 +314,7 @@ class TranslationServiceFactory:
             text: Text to translate
             target_lang: Target language code
             service_type: Optional service type override
+            profile: Optional generation profile for services that support them
         
         Returns:
             Translated text optimized for JSON fields
@@ -94,7 +323,97 @@ class TranslationServiceFactory:
         
         # Use specialized method if available (for Claude)
         if service_type == "claude" and hasattr(service, 'translate_json_field'):
-            return service.translate_json_field(text, target_lang)
+            return cls._translate_cached(
+                [text], target_lang, service_type,
+                lambda missing: [service.translate_json_field(item, target_lang) for item in missing],
+                variant='json'
+            )[0]
         else:
             # Fall back to regular translation for other services
-            return service.translate(text, target_lang)
\ No newline at end of file
+            return cls.translate(text, target_lang, service_type, profile)
+    
+    @classmethod
+    def translate_batch(
+        cls, texts: List[str], target_lang: str, service_type: str = None, profile: str = None
+    ) -> List[str]:
+        """
+        Translate a list of texts in one call using the specified service
+        
+        Args:
+            texts: Texts to translate
+            target_lang: Target language code
+            service_type: Optional service type override
+            profile: Optional generation profile (fast, balanced or quality)
+        
+        Returns:
+            Translated texts in the same order as the input
+        """
+        service = cls.get_service(service_type)
+        options, variant = cls._generation_options(service, target_lang, profile)
+        
+        # Use the batch entry point if available, otherwise translate one by one
+        def translate_missing(missing):
+            if hasattr(service, 'translate_batch'):
+                return service.translate_batch(missing, target_lang, **options)
+            return [service.translate(item, target_lang, **options) for item in missing]
+        
+        return cls._translate_cached(texts, target_lang, service_type, translate_missing, variant=variant)
+    
+    @classmethod
+    def translate_bulk(
+        cls, texts: List[str], target_lang: str, service_type: str = None, json_fields: bool = False
+    ) -> List[str]:
+        """
+        Translate a large list of texts for an offline job, e.g. every segment of a catalog
+        
+        Services with a bulk mode (Claude's Message Batches) use it; the others use
+        their batch entry point.
+        
+        Args:
+            texts: Texts to translate
+            target_lang: Target language code
+            service_type: Optional service type override
+            json_fields: Whether the texts are JSON field values
+        
+        Returns:
+            Translated texts in the same order as the input
+        """
+        service = cls.get_service(service_type)
+        if not hasattr(service, 'translate_bulk'):
+            if json_fields:
+                return cls.translate_json_batch(texts, target_lang, service_type)
+            return cls.translate_batch(texts, target_lang, service_type)
+        
+        return cls._translate_cached(
+            texts, target_lang, service_type,
+            lambda missing: service.translate_bulk(missing, target_lang, json_fields=json_fields),
+            variant='json' if json_fields else ''
+        )
+    
+    @classmethod
+    def translate_json_batch(
+        cls, texts: List[str], target_lang: str, service_type: str = None, profile: str = None
+    ) -> List[str]:
+        """
+        Translate a list of JSON field values in one call
+        
+        Args:
+            texts: Texts to translate
+            target_lang: Target language code
+            service_type: Optional service type override
+            profile: Optional generation profile for services that support them
+        
+        Returns:
+            Translated texts optimized for JSON fields, in the same order as the input
+        """
+        service = cls.get_service(service_type)
+        
+        # Use specialized method if available (for Claude)
+        if service_type == "claude" and hasattr(service, 'translate_json_batch'):
+            return cls._translate_cached(
+                texts, target_lang, service_type,
+                lambda missing: service.translate_json_batch(missing, target_lang),
+                variant='json'
+            )
+        else:
+            return cls.translate_batch(texts, target_lang, service_type, profile)
@@ -0,0 +1,238 @@
+# app/services/translation_memory.py
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement
+_QUERY_CHUNK_SIZE = 500
+
+class TranslationMemory:
+    """
+    Persistent translation memory stored in a WAL-mode SQLite file
+
+    Entries are keyed by a hash of the normalized masked source text together with
+    the target language, service type and model name, so any worker process sharing
+    the file can reuse a translation. Each thread gets its own connection; WAL mode
+    lets readers in other processes run while one process writes.
+
+    Lookups only write when a hit's access time is older than touch_interval, so
+    hot entries don't take the write lock on every request. The total size is kept
+    in a meta row maintained by triggers, so writes never sum the whole table.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 0, touch_interval: float = 3600):
+        """
+        Args:
+            path: Location of the SQLite database file
+            max_bytes: Evict least recently used entries once stored translations
+                exceed this size; 0 disables eviction
+            touch_interval: Seconds before a hit refreshes the entry's access time
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS translations (
+                    key TEXT PRIMARY KEY,
+                    target_lang TEXT NOT NULL,
+                    service_type TEXT NOT NULL,
+                    model_name TEXT NOT NULL,
+                    translation TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_access ON translations (last_access)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS translations_size_insert AFTER INSERT ON translations
+                BEGIN UPDATE meta SET value = value + NEW.size WHERE name = 'total_bytes'; END
+                """
+            )
+            conn.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS translations_size_update AFTER UPDATE OF size ON translations
+                BEGIN UPDATE meta SET value = value + NEW.size - OLD.size WHERE name = 'total_bytes'; END
+                """
+            )
+            conn.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS translations_size_delete AFTER DELETE ON translations
+                BEGIN UPDATE meta SET value = value - OLD.size WHERE name = 'total_bytes'; END
+                """
+            )
+            # Stores created before the meta row are summed once; the triggers keep it current from here on
+            conn.execute(
+                "INSERT OR IGNORE INTO meta (name, value) "
+                "SELECT 'total_bytes', COALESCE(SUM(size), 0) FROM translations"
+            )
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize unicode form and collapse whitespace so trivially different sources share an entry"""
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    @classmethod
+    def make_key(cls, text: str, target_lang: str, service_type: str, model_name: str) -> str:
+        """Build the lookup key for a masked source segment"""
+        digest = hashlib.sha256(cls.normalize(text).encode("utf-8")).hexdigest()
+        return f"{digest}:{target_lang}:{service_type}:{model_name}"
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get the connection for the current thread, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Look up many keys at once, returning the translations that were found"""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        if not keys:
+            return found
+
+        now = time.time()
+        stale_before = now - self.touch_interval
+        stale = []
+        conn = self._connection()
+        for chunk in _chunks(keys, _QUERY_CHUNK_SIZE):
+            placeholders = ",".join("?" * len(chunk))
+            for key, translation, last_access in conn.execute(
+                f"SELECT key, translation, last_access FROM translations WHERE key IN ({placeholders})", chunk
+            ):
+                found[key] = translation
+                if last_access < stale_before:
+                    stale.append(key)
+
+        # Record the access time so eviction removes the least recently used entries;
+        # entries touched within the interval are left alone to keep lookups read-only
+        if stale:
+            with conn:
+                for chunk in _chunks(stale, _QUERY_CHUNK_SIZE):
+                    placeholders = ",".join("?" * len(chunk))
+                    conn.execute(
+                        f"UPDATE translations SET last_access = ? WHERE key IN ({placeholders})", [now, *chunk]
+                    )
+
+        with self._stats_lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+
+        return found
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a single key"""
+        return self.get_many([key]).get(key)
+
+    def put_many(self, entries: List[Tuple[str, str, str, str, str]]) -> None:
+        """
+        Store translations
+
+        Args:
+            entries: (key, target_lang, service_type, model_name, translation) tuples
+        """
+        if not entries:
+            return
+
+        now = time.time()
+        rows = [
+            (key, target_lang, service_type, model_name, translation,
+             len(key) + len(translation.encode("utf-8")), now, now)
+            for key, target_lang, service_type, model_name, translation in entries
+        ]
+
+        conn = self._connection()
+        with conn:
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete would skip the size trigger
+            conn.executemany(
+                """
+                INSERT INTO translations VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    translation = excluded.translation,
+                    size = excluded.size,
+                    created_at = excluded.created_at,
+                    last_access = excluded.last_access
+                """,
+                rows
+            )
+
+        if self.max_bytes:
+            self.evict()
+
+    def total_bytes(self) -> int:
+        """Total size of stored entries"""
+        row = self._connection().execute("SELECT value FROM meta WHERE name = 'total_bytes'").fetchone()
+        return row[0]
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the store fits in max_bytes"""
+        excess = self.total_bytes() - self.max_bytes
+        if excess <= 0:
+            return 0
+
+        conn = self._connection()
+        keys = []
+        freed = 0
+        for key, size in conn.execute("SELECT key, size FROM translations ORDER BY last_access"):
+            keys.append(key)
+            freed += size
+            if freed >= excess:
+                break
+
+        with conn:
+            for chunk in _chunks(keys, _QUERY_CHUNK_SIZE):
+                placeholders = ",".join("?" * len(chunk))
+                conn.execute(f"DELETE FROM translations WHERE key IN ({placeholders})", chunk)
+
+        with self._stats_lock:
+            self.evictions += len(keys)
+        logger.info(f"Evicted {len(keys)} translation memory entries ({freed} bytes)")
+        return len(keys)
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters for this process and the current size of the store"""
+        entries = self._connection().execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        size = self.total_bytes()
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def _chunks(items: List, size: int):
+    """Yield consecutive slices of at most size items"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
@@ -0,0 +1,84 @@
+import re
+from typing import Dict, Optional, Tuple
+
+# Token kinds that are kept out of the text sent for translation
+TAG = 'tag'
+ATTRIBUTE = 'attr'
+PLACEHOLDER = 'placeholder'
+
+
+class SegmentMasker:
+    """
+    Single-pass masking of HTML tags, HTML attributes and placeholders
+
+    One combined pattern scans each segment once and replaces protected spans with
+    markers such as HTML_TAG_0 or PLACEHOLDER_1. The translated text is restored
+    with one scan over the markers, each resolved by a dictionary lookup instead
+    of a replace per marker.
+    """
+
+    # Tags are tried first so attributes and placeholders inside a tag stay part of it
+    token_pattern = re.compile(
+        r'(?P<tag><[^>]*>)'
+        r'|(?P<attr>\s+[a-zA-Z0-9_-]+="[^"]*")'
+        r'|(?P<placeholder>__[a-zA-Z0-9]+__)'
+    )
+    marker_pattern = re.compile(r'(HTML_TAG|HTML_ATTR|PLACEHOLDER)_(\d+)')
+
+    marker_prefixes = {
+        TAG: 'HTML_TAG',
+        ATTRIBUTE: 'HTML_ATTR',
+        PLACEHOLDER: 'PLACEHOLDER',
+    }
+
+    def mask(self, text: str) -> Tuple[str, Dict[str, str]]:
+        """
+        Replace protected spans with numbered markers in a single scan
+
+        Returns:
+            The masked text and a mapping of marker to original span
+        """
+        preserved = {}
+        counters = {TAG: 0, ATTRIBUTE: 0, PLACEHOLDER: 0}
+        prefixes = self.marker_prefixes
+
+        def replace(match):
+            kind = match.lastgroup
+            index = counters[kind]
+            counters[kind] = index + 1
+            marker = f"{prefixes[kind]}_{index}"
+            preserved[marker] = match.group()
+            return marker
+
+        return self.token_pattern.sub(replace, text), preserved
+
+    def unmask(self, text: str, preserved: Dict[str, str]) -> str:
+        """Restore the preserved spans in translated text in a single scan"""
+        if not preserved:
+            return text
+
+        def replace(match):
+            marker = match.group()
+            original = preserved.get(marker)
+            if original is None:
+                original = self._restore_marker(match.group(1), match.group(2), preserved)
+            return marker if original is None else original
+
+        return self.marker_pattern.sub(replace, text)
+
+    def _restore_marker(self, prefix: str, digits: str, preserved: Dict[str, str]) -> Optional[str]:
+        """
+        Resolve a marker followed by digits that belong to the translated text
+
+        The longest known marker wins, so HTML_TAG_10 never resolves to HTML_TAG_1,
+        while in HTML_TAG_05 the marker is HTML_TAG_0 and the 5 is kept.
+        """
+        for length in range(len(digits) - 1, 0, -1):
+            # Markers are never written with leading zeros
+            if length > 1 and digits[0] == '0':
+                continue
+            original = preserved.get(f"{prefix}_{digits[:length]}")
+            if original is not None:
+                return original + digits[length:]
+
+        return None
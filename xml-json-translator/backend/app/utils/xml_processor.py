@@ -1,18 +1,56 @@
 
 import xml.etree.ElementTree as ET
-from typing import Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, TextIO, Tuple, Union
+import copy
 import re
 import logging
+import time
+
+from app.core.exceptions import TranslationServiceError
+from app.utils.masking import SegmentMasker
 
 logger = logging.getLogger(__name__)
 
-class XMLProcessor:
+# Per-language translation functions: language -> (translate_func, translate_batch)
+Translators = Dict[str, Tuple[Callable[[str], str], Optional[Callable[[List[str]], List[str]]]]]
+
+class SegmentStats:
+    """Counts of segments found in a document and unique segments actually translated"""
+    
     def __init__(self):
+        self.total_segments = 0
+        self.unique_segments = 0
+    
+    @property
+    def dedup_ratio(self) -> float:
+        """Fraction of segments that did not need their own translation call"""
+        if not self.total_segments:
+            return 0.0
+        return 1 - self.unique_segments / self.total_segments
+    
+    def to_headers(self) -> Dict[str, str]:
+        """Response headers reporting the deduplication result"""
+        return {
+            "X-Translation-Segments": str(self.total_segments),
+            "X-Translation-Unique-Segments": str(self.unique_segments),
+            "X-Translation-Dedup-Ratio": f"{self.dedup_ratio:.4f}",
+        }
+
+class XMLProcessor:
+    def __init__(self, max_concurrency: int = 1, batch_size: Optional[int] = None):
+        """
+        Args:
+            max_concurrency: Maximum number of translation calls in flight at once
+                for a single document; 1 translates sequentially
+            batch_size: Number of segments per translate_batch call; None sends
+                all segments of a document in a single call
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.batch_size = batch_size or None
         self.cdata_pattern = re.compile(r'<!\[CDATA\[(.*?)\]\]>', re.DOTALL)
-        # HTML tag pattern to identify tags that should be preserved
-        self.html_tag_pattern = re.compile(r'<[^>]*>|<\/[^>]*>')
-        # HTML attribute pattern
-        self.html_attribute_pattern = re.compile(r'(\s+)([a-zA-Z0-9_-]+)(="[^"]*")')
+        # Single-pass masking of HTML tags, attributes and placeholders
+        self.masker = SegmentMasker()
         
     def _extract_cdata_content(self, text: str) -> Tuple[bool, str]:
         """Extract content from CDATA section if present"""
@@ -28,67 +66,164 @@ class XMLProcessor:
         """Wrap text in CDATA section"""
         return f"<![CDATA[{text}]]>"
     
-    def _preserve_html_tags(self, text: str) -> Tuple[str, Dict[str, str]]:
+    def _mask_segment(self, text: str) -> Tuple[str, Dict[str, str]]:
+        """Mask HTML tags, attributes and placeholders before translation"""
+        return self.masker.mask(text)
+    
+    def _unmask_segment(self, text: str, preserved: Dict[str, str]) -> str:
+        """Restore placeholders, HTML attributes and tags after translation"""
+        return self.masker.unmask(text, preserved)
+    
+    def _translate_segments(
+        self,
+        texts: List[str],
+        translate_func: Callable[[str], str],
+        translate_batch: Optional[Callable[[List[str]], List[str]]] = None,
+        stats: Optional[SegmentStats] = None
+    ) -> List[str]:
         """
-        Preserve HTML tags by replacing them with markers for translation
+        Translate a list of masked segments, in one batch call when possible
+        
+        Identical segments are translated once and the result is fanned back out
+        to every position. Falls back to calling translate_func once per unique
+        segment if no batch function is given or a batch call does not return
+        one result per input.
         """
-        preserved_tags = {}
-        
-        # Find and replace all HTML tags with markers
-        for idx, match in enumerate(self.html_tag_pattern.finditer(text)):
-            tag = match.group(0)
-            marker = f"HTML_TAG_{idx}"
-            preserved_tags[marker] = tag
-            text = text.replace(tag, marker)
-            
-        return text, preserved_tags
+        unique_texts, positions = self._dedupe_segments(texts)
+        
+        if stats is not None:
+            stats.total_segments += len(texts)
+            stats.unique_segments += len(unique_texts)
+        
+        if not unique_texts:
+            return []
+        
+        if len(unique_texts) < len(texts):
+            logger.debug(f"Translating {len(unique_texts)} unique segments out of {len(texts)}")
+        
+        translated = self._translate_unique_segments(unique_texts, translate_func, translate_batch)
+        return [translated[position] for position in positions]
     
-    def _preserve_html_attributes(self, text: str) -> Tuple[str, Dict[str, str]]:
+    def _dedupe_segments(self, texts: List[str]) -> Tuple[List[str], List[int]]:
+        """Distinct segments in first-seen order, and the index of each input among them"""
+        unique_index = {}
+        positions = [unique_index.setdefault(text, len(unique_index)) for text in texts]
+        return list(unique_index), positions
+    
+    def _translate_fanout(
+        self,
+        texts: List[str],
+        translators: Translators,
+        max_workers: int,
+        stats: Optional[SegmentStats] = None,
+        timings: Optional[Dict[str, Dict[str, float]]] = None
+    ):
         """
-        Preserve HTML attributes by replacing them with markers for translation
+        Translate the same masked segments into several languages in parallel
+        
+        Segments are deduplicated once; each language then gets its own translation
+        calls on a separate thread. Yields (language, translations) as each language
+        finishes, recording its translation time in timings.
         """
-        preserved_attrs = {}
-        
-        # Find and replace all HTML attributes with markers
-        for idx, match in enumerate(self.html_attribute_pattern.finditer(text)):
-            space, attr_name, attr_value = match.groups()
-            full_attr = space + attr_name + attr_value
-            marker = f"HTML_ATTR_{idx}"
-            preserved_attrs[marker] = full_attr
-            text = text.replace(full_attr, marker)
-            
-        return text, preserved_attrs
-    
-    def _restore_preserved_content(self, text: str, preserved_dict: Dict[str, str]) -> str:
-        """Restore preserved content (tags, attributes, placeholders)"""
-        for marker, original in preserved_dict.items():
-            text = text.replace(marker, original)
-        return text
+        unique_texts, positions = self._dedupe_segments(texts)
+        if stats is not None:
+            stats.total_segments += len(texts)
+            stats.unique_segments += len(unique_texts)
+        
+        def translate(language):
+            translate_func, translate_batch = translators[language]
+            start = time.perf_counter()
+            translated = (
+                self._translate_unique_segments(unique_texts, translate_func, translate_batch)
+                if unique_texts else []
+            )
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            return [translated[position] for position in positions], elapsed_ms
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(translators)))) as executor:
+            futures = {executor.submit(translate, language): language for language in translators}
+            for future in as_completed(futures):
+                language = futures[future]
+                translations, elapsed_ms = future.result()
+                if timings is not None:
+                    timings.setdefault(language, {})["translate_ms"] = round(elapsed_ms, 1)
+                yield language, translations
     
-    def _preserve_placeholders(self, text: str) -> Tuple[str, Dict[str, str]]:
+    def _translate_unique_segments(
+        self,
+        texts: List[str],
+        translate_func: Callable[[str], str],
+        translate_batch: Optional[Callable[[List[str]], List[str]]] = None
+    ) -> List[str]:
         """
-        Preserve placeholders like __name__, __phonePrefix__, etc.
-        and replace them with unique identifiers for translation
+        Translate distinct segments, dispatching up to max_concurrency calls at once
+        
+        With translate_batch the segments are split into batches of batch_size,
+        otherwise each segment is its own call. Results are returned in input order.
         """
-        placeholders = {}
-        placeholder_pattern = re.compile(r'__([a-zA-Z0-9]+)__')
-        
-        # Find all placeholders and replace them with unique markers
-        for idx, match in enumerate(placeholder_pattern.finditer(text)):
-            placeholder = match.group(0)
-            marker = f"PLACEHOLDER_{idx}"
-            placeholders[marker] = placeholder
-            text = text.replace(placeholder, marker)
+        if translate_batch is not None:
+            batch_size = self.batch_size or len(texts)
+            work = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
             
-        return text, placeholders
+            def run(batch):
+                return self._translate_batch_with_fallback(batch, translate_func, translate_batch)
+        else:
+            work = texts
+            run = translate_func
+        
+        if self.max_concurrency == 1 or len(work) == 1:
+            results = [run(item) for item in work]
+        else:
+            # Executor.map keeps results in document order
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(work))) as executor:
+                results = list(executor.map(run, work))
+        
+        if translate_batch is not None:
+            return [translated for batch in results for translated in batch]
+        return results
     
-    def process_xml(self, xml_content: str, translate_func: Callable[[str], str]) -> str:
+    def _translate_batch_with_fallback(
+        self,
+        texts: List[str],
+        translate_func: Callable[[str], str],
+        translate_batch: Callable[[List[str]], List[str]]
+    ) -> List[str]:
+        """Translate one batch, falling back to translate_func if the batch call fails"""
+        try:
+            translated = translate_batch(texts)
+            if len(translated) == len(texts):
+                return list(translated)
+            logger.warning(
+                f"Batch translation returned {len(translated)} results for {len(texts)} segments, "
+                "falling back to per-segment translation"
+            )
+        except TranslationServiceError:
+            # The service already retried; sending every segment again would only add load
+            raise
+        except Exception as e:
+            logger.error(f"Batch translation failed, falling back to per-segment translation: {str(e)}")
+        
+        return [translate_func(text) for text in texts]
+    
+    def process_xml(
+        self,
+        xml_content: str,
+        translate_func: Callable[[str], str],
+        translate_batch: Optional[Callable[[List[str]], List[str]]] = None,
+        stats: Optional[SegmentStats] = None
+    ) -> str:
         """
         Process XML and translate text content while preserving structure, IDs, CDATA, and HTML elements
         
+        Translation runs in two phases: every masked TEXT segment is collected first,
+        then all segments are translated together and written back into the tree.
+        
         Args:
             xml_content: XML content as string
             translate_func: Function that takes a string and returns translated string
+            translate_batch: Optional function that takes a list of strings and returns
+                the translated strings in the same order
+            stats: Optional SegmentStats that receives segment and dedup counts
             
         Returns:
             Translated XML content as string
@@ -102,56 +237,260 @@ class XMLProcessor:
             if '}' in root.tag:
                 namespace = root.tag.split('}')[0] + '}'
             
-            # Process all TEXT elements
-            for elem in root.findall(f".//{namespace}TEXT"):
-                text_id = elem.get('id')
-                logger.debug(f"Processing element with ID: {text_id}")
-                
-                # Skip translation if no text content
-                if elem.text is None:
-                    continue
-                
-                # Extract text content, handling CDATA if present
-                is_cdata, content = self._extract_cdata_content(elem.text)
-                
-                # Preserve HTML tags
-                content_with_tags_preserved, preserved_tags = self._preserve_html_tags(content)
-                
-                # Preserve HTML attributes
-                content_with_attrs_preserved, preserved_attrs = self._preserve_html_attributes(content_with_tags_preserved)
-                
-                # Preserve placeholders
-                content_for_translation, placeholders = self._preserve_placeholders(content_with_attrs_preserved)
-                
-                # Translate the content
-                translated_content = translate_func(content_for_translation)
-                
-                # Restore placeholders, HTML tags and attributes in reverse order
-                restored_content = self._restore_preserved_content(translated_content, placeholders)
-                restored_content = self._restore_preserved_content(restored_content, preserved_attrs)
-                restored_content = self._restore_preserved_content(restored_content, preserved_tags)
-                
-                # Wrap in CDATA if original was in CDATA
-                if is_cdata:
-                    elem.text = self._wrap_in_cdata(restored_content)
-                else:
-                    elem.text = restored_content
+            # Collect all TEXT elements and their masked content
+            segments = self._collect_text_segments(root.findall(f".//{namespace}TEXT"))
             
-            # Convert back to string with proper XML declaration
-            xml_declaration = '<?xml version="1.0" encoding="utf-8"?>\n'
-            xml_string = ET.tostring(root, encoding='utf-8', method='xml').decode('utf-8')
+            # Translate all segments together and write them back into the tree
+            self._translate_text_segments(segments, translate_func, translate_batch, stats)
             
-            # Add XML declaration if it's not present
-            if not xml_string.startswith('<?xml'):
-                xml_string = xml_declaration + xml_string
-                
-            return xml_string
+            return self._serialize_xml(root)
         
         except Exception as e:
             logger.error(f"Error processing XML: {str(e)}")
             raise
     
-    def process_json(self, json_data: Dict, translate_func: Callable[[str], str], is_claude: bool = False) -> Dict:
+    def process_xml_multi(
+        self,
+        xml_content: str,
+        translators: Translators,
+        max_workers: int = 4,
+        stats: Optional[SegmentStats] = None,
+        timings: Optional[Dict[str, Dict[str, float]]] = None
+    ) -> Dict[str, str]:
+        """
+        Translate one XML document into several languages
+        
+        The document is parsed and its segments masked once. The languages are
+        translated in parallel, and each finished language is written into the
+        shared tree and serialized in turn.
+        
+        Args:
+            xml_content: XML content as string
+            translators: Translation functions per target language
+            max_workers: Number of languages translated at the same time
+            stats: Optional SegmentStats that receives segment and dedup counts (same for every language)
+            timings: Optional dict that receives translate_ms and render_ms per language
+            
+        Returns:
+            Translated XML content per language
+        """
+        root = ET.fromstring(xml_content)
+        namespace = root.tag.split('}')[0] + '}' if '}' in root.tag else ''
+        segments = self._collect_text_segments(root.findall(f".//{namespace}TEXT"))
+        
+        outputs = {}
+        for language, translations in self._translate_fanout(
+            [segment[2] for segment in segments], translators, max_workers, stats, timings
+        ):
+            start = time.perf_counter()
+            self._write_text_segments(segments, translations)
+            outputs[language] = self._serialize_xml(root)
+            if timings is not None:
+                timings[language]["render_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        
+        return outputs
+    
+    def process_xml_documents(
+        self,
+        xml_contents: List[str],
+        translate_func: Callable[[str], str],
+        translate_batch: Optional[Callable[[List[str]], List[str]]] = None,
+        stats: Optional[SegmentStats] = None
+    ) -> List[str]:
+        """
+        Translate several XML documents with one set of translation calls
+        
+        The TEXT segments of every document are collected and deduplicated
+        together, so with a bulk translate_batch a whole catalog becomes a single
+        call whose results are written back into each document.
+        
+        Args:
+            xml_contents: XML documents as strings
+            translate_func: Function that takes a string and returns translated string
+            translate_batch: Optional function translating a list of strings in order
+            stats: Optional SegmentStats that receives segment and dedup counts
+            
+        Returns:
+            Translated XML content of each document, in input order
+        """
+        roots = [ET.fromstring(xml_content) for xml_content in xml_contents]
+        segments = []
+        for root in roots:
+            namespace = root.tag.split('}')[0] + '}' if '}' in root.tag else ''
+            segments.extend(self._collect_text_segments(root.findall(f".//{namespace}TEXT")))
+        
+        self._translate_text_segments(segments, translate_func, translate_batch, stats)
+        return [self._serialize_xml(root) for root in roots]
+    
+    def _serialize_xml(self, root: ET.Element) -> str:
+        """Convert a tree back to string with proper XML declaration"""
+        xml_declaration = '<?xml version="1.0" encoding="utf-8"?>\n'
+        xml_string = ET.tostring(root, encoding='utf-8', method='xml').decode('utf-8')
+        
+        # Add XML declaration if it's not present
+        if not xml_string.startswith('<?xml'):
+            xml_string = xml_declaration + xml_string
+            
+        return xml_string
+    
+    def _collect_text_segments(self, elements: Iterable[ET.Element]) -> List[Tuple]:
+        """Collect (element, is_cdata, masked text, preserved) for each TEXT element with content"""
+        segments = []
+        for elem in elements:
+            text_id = elem.get('id')
+            logger.debug(f"Processing element with ID: {text_id}")
+            
+            # Skip translation if no text content
+            if elem.text is None:
+                continue
+            
+            # Extract text content, handling CDATA if present
+            is_cdata, content = self._extract_cdata_content(elem.text)
+            
+            # Preserve HTML tags, attributes and placeholders
+            content_for_translation, preserved = self._mask_segment(content)
+            segments.append((elem, is_cdata, content_for_translation, preserved))
+        return segments
+    
+    def _translate_text_segments(
+        self,
+        segments: List[Tuple],
+        translate_func: Callable[[str], str],
+        translate_batch: Optional[Callable[[List[str]], List[str]]] = None,
+        stats: Optional[SegmentStats] = None
+    ) -> None:
+        """Translate collected TEXT segments and write the results back into their elements"""
+        translations = self._translate_segments(
+            [segment[2] for segment in segments], translate_func, translate_batch, stats
+        )
+        self._write_text_segments(segments, translations)
+    
+    def _write_text_segments(self, segments: List[Tuple], translations: List[str]) -> None:
+        """Unmask translations and write them into their TEXT elements"""
+        for (elem, is_cdata, _, preserved), translated_content in zip(segments, translations):
+            restored_content = self._unmask_segment(translated_content, preserved)
+            
+            # Wrap in CDATA if original was in CDATA
+            if is_cdata:
+                elem.text = self._wrap_in_cdata(restored_content)
+            else:
+                elem.text = restored_content
+    
+    def _split_element_tags(self, elem: ET.Element) -> Tuple[str, str]:
+        """Serialize an element without its children, split into start (with text) and end tag"""
+        shell = ET.Element(elem.tag, elem.attrib)
+        shell.text = elem.text
+        shell_string = ET.tostring(shell, encoding='unicode', method='xml', short_empty_elements=False)
+        end_index = shell_string.rindex('</')
+        return shell_string[:end_index], shell_string[end_index:]
+    
+    def process_xml_stream(
+        self,
+        source: Union[str, BinaryIO],
+        output_stream: TextIO,
+        translate_func: Callable[[str], str],
+        translate_batch: Optional[Callable[[List[str]], List[str]]] = None,
+        window_size: int = 256,
+        stats: Optional[SegmentStats] = None
+    ) -> None:
+        """
+        Translate XML incrementally, writing the result to output_stream as it goes
+        
+        The document is read with iterparse. Finished TEXT elements are buffered until
+        window_size segments are waiting, then translated. Everything that has ended is
+        written out and removed from the tree, at any depth: the start tags of the
+        still open ancestors are written first and their end tags once they close. So
+        memory use does not grow with the size of the file, even when the TEXT
+        elements sit inside a single large group.
+        
+        Args:
+            source: File path or binary file object containing the XML
+            output_stream: Text stream the translated XML is written to
+            translate_func: Function that takes a string and returns translated string
+            translate_batch: Optional function that takes a list of strings and returns
+                the translated strings in the same order
+            window_size: Number of TEXT segments to translate per window
+            stats: Optional SegmentStats that receives segment and dedup counts
+        """
+        try:
+            namespace = ''
+            # Open elements from the root down, each with the number of its children that have ended
+            stack = []
+            # Elements whose start tag is already written; their end tag is written when they are
+            end_tags = {}
+            text_depth = 0
+            pending_segments = []
+            
+            output_stream.write('<?xml version="1.0" encoding="utf-8"?>\n')
+            
+            def open_element(elem):
+                if elem not in end_tags:
+                    start_tag, end_tags[elem] = self._split_element_tags(elem)
+                    output_stream.write(start_tag)
+            
+            def write_element(elem):
+                if elem not in end_tags:
+                    output_stream.write(ET.tostring(elem, encoding='unicode', method='xml'))
+                    return
+                # Started in an earlier window: the rest of its children, its end tag and tail
+                for child in elem:
+                    write_element(child)
+                output_stream.write(end_tags.pop(elem))
+                output_stream.write(elem.tail or '')
+            
+            def flush(final=False):
+                # Translate the buffered window, then write and release every ended element.
+                # The tail of the element that ended last may not be parsed yet, so it
+                # waits for the next window unless the document is complete.
+                self._translate_text_segments(pending_segments, translate_func, translate_batch, stats)
+                pending_segments.clear()
+                for level, (parent, ended) in enumerate(stack):
+                    open_element(parent)
+                    if not final and level == len(stack) - 1:
+                        ended -= 1
+                    for child in list(parent)[:ended]:
+                        write_element(child)
+                        parent.remove(child)
+                    stack[level][1] -= max(ended, 0)
+            
+            for event, elem in ET.iterparse(source, events=('start', 'end')):
+                if event == 'start':
+                    if not stack and '}' in elem.tag:
+                        namespace = elem.tag.split('}')[0] + '}'
+                    if elem.tag == f"{namespace}TEXT":
+                        text_depth += 1
+                    stack.append([elem, 0])
+                    continue
+                
+                stack.pop()
+                if not stack:
+                    # The root is complete
+                    stack.append([elem, len(elem)])
+                    flush(final=True)
+                    output_stream.write(end_tags.pop(elem))
+                    break
+                stack[-1][1] += 1
+                
+                if elem.tag == f"{namespace}TEXT":
+                    text_depth -= 1
+                    # TEXT nested in TEXT is collected with its outermost TEXT
+                    if text_depth == 0:
+                        pending_segments.extend(self._collect_text_segments(elem.iter(f"{namespace}TEXT")))
+                        if len(pending_segments) >= window_size:
+                            flush()
+        
+        except Exception as e:
+            logger.error(f"Error processing XML stream: {str(e)}")
+            raise
+    
+    def process_json(
+        self,
+        json_data: Dict,
+        translate_func: Callable[[str], str],
+        is_claude: bool = False,
+        translate_batch: Optional[Callable[[List[str]], List[str]]] = None,
+        stats: Optional[SegmentStats] = None
+    ) -> Dict:
         """
         Process JSON data and translate text values while preserving structure
         
@@ -159,6 +498,9 @@ class XMLProcessor:
             json_data: JSON data as dictionary
             translate_func: Function that takes a string and returns translated string
             is_claude: Whether we're using Claude API (affects translation method)
+            translate_batch: Optional function that takes a list of strings and returns
+                the translated strings in the same order
+            stats: Optional SegmentStats that receives segment and dedup counts
             
         Returns:
             Translated JSON data as dictionary
@@ -188,55 +530,118 @@ class XMLProcessor:
                     return translate_func(text)
                     
             # Use our wrapper for translation
-            return self._process_json_internal(json_data, translate_json_field_wrapper)
+            return self._process_json_internal(json_data, translate_json_field_wrapper, translate_batch, stats)
         else:
             # For other services, use the regular translation
-            return self._process_json_internal(json_data, translate_func)
+            return self._process_json_internal(json_data, translate_func, translate_batch, stats)
     
-    # This is the internal implementation that does the actual recursion
-    def _process_json_internal(self, json_data: Dict, translate_func: Callable[[str], str]) -> Dict:
+    # This is the internal implementation that does the two-phase processing
+    def _process_json_internal(
+        self,
+        json_data: Dict,
+        translate_func: Callable[[str], str],
+        translate_batch: Optional[Callable[[List[str]], List[str]]] = None,
+        stats: Optional[SegmentStats] = None
+    ) -> Dict:
         """Internal implementation of JSON processing"""
+        # Copy the structure and collect every translatable string
+        segments = []
+        translated_data = self._collect_json_segments(json_data, segments)
+        
+        # Translate all segments together
+        translations = self._translate_segments(
+            [segment[2] for segment in segments], translate_func, translate_batch, stats
+        )
+        
+        # Write the translations back into the copied structure
+        self._write_json_segments(segments, translations)
+                    
+        return translated_data
+    
+    def process_json_multi(
+        self,
+        json_data: Dict,
+        translators: Translators,
+        max_workers: int = 4,
+        stats: Optional[SegmentStats] = None,
+        timings: Optional[Dict[str, Dict[str, float]]] = None
+    ) -> Dict[str, Dict]:
+        """
+        Translate one JSON document into several languages
+        
+        Translatable strings are collected and masked once. The languages are
+        translated in parallel, and each finished language is written into the
+        shared copy of the structure and copied out in turn.
+        
+        Args:
+            json_data: JSON data as dictionary
+            translators: Translation functions per target language
+            max_workers: Number of languages translated at the same time
+            stats: Optional SegmentStats that receives segment and dedup counts (same for every language)
+            timings: Optional dict that receives translate_ms and render_ms per language
+            
+        Returns:
+            Translated JSON data per language
+        """
+        segments = []
+        translated_data = self._collect_json_segments(json_data, segments)
+        
+        outputs = {}
+        for language, translations in self._translate_fanout(
+            [segment[2] for segment in segments], translators, max_workers, stats, timings
+        ):
+            start = time.perf_counter()
+            self._write_json_segments(segments, translations)
+            outputs[language] = copy.deepcopy(translated_data)
+            if timings is not None:
+                timings[language]["render_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        
+        return outputs
+    
+    def _write_json_segments(self, segments: List[Tuple], translations: List[str]) -> None:
+        """Unmask translations and write them into their containers"""
+        for (container, key, _, preserved), translated_content in zip(segments, translations):
+            container[key] = self._unmask_segment(translated_content, preserved)
+    
+    def _collect_json_segments(self, json_data: Dict, segments: List[Tuple]) -> Dict:
+        """
+        Recursively copy JSON data, recording (container, key, masked text, preserved)
+        for every string that should be translated
+        """
         translated_data = {}
         
         for key, value in json_data.items():
             if isinstance(value, dict):
                 # Recursively process nested dictionaries
-                translated_data[key] = self._process_json_internal(value, translate_func)
+                translated_data[key] = self._collect_json_segments(value, segments)
             elif isinstance(value, list):
-                # Process lists
-                if all(isinstance(item, str) for item in value):
-                    # If all items are strings, translate each one
-                    translated_data[key] = [translate_func(item) for item in value]
-                else:
-                    # Process lists of mixed/complex types
-                    translated_data[key] = [
-                        self._process_json_internal(item, translate_func) if isinstance(item, dict) 
-                        else translate_func(item) if isinstance(item, str) and self._should_translate_key(key)
-                        else item
-                        for item in value
-                    ]
+                # Process lists; string items are translated if all items are strings
+                # or the key looks translatable
+                all_strings = all(isinstance(item, str) for item in value)
+                translated_list = []
+                for index, item in enumerate(value):
+                    if isinstance(item, dict):
+                        translated_list.append(self._collect_json_segments(item, segments))
+                    elif isinstance(item, str) and (all_strings or self._should_translate_key(key)):
+                        translated_list.append(item)
+                        self._add_json_segment(translated_list, index, item, segments)
+                    else:
+                        translated_list.append(item)
+                translated_data[key] = translated_list
             elif isinstance(value, str) and self._should_translate_key(key):
                 # Translate text fields
-                content_for_translation, placeholders = self._preserve_placeholders(value)
-                
-                # Preserve HTML tags if present
-                content_with_tags_preserved, preserved_tags = self._preserve_html_tags(content_for_translation)
-                content_with_attrs_preserved, preserved_attrs = self._preserve_html_attributes(content_with_tags_preserved)
-                
-                # Translate the processed content
-                translated_content = translate_func(content_with_attrs_preserved)
-                
-                # Restore placeholders, HTML tags and attributes in reverse order
-                restored_content = self._restore_preserved_content(translated_content, preserved_attrs)
-                restored_content = self._restore_preserved_content(restored_content, preserved_tags)
-                restored_content = self._restore_preserved_content(restored_content, placeholders)
-                
-                translated_data[key] = restored_content
+                translated_data[key] = value
+                self._add_json_segment(translated_data, key, value, segments)
             else:
                 # Keep other fields unchanged
                 translated_data[key] = value
                     
         return translated_data
+    
+    def _add_json_segment(self, container, key, value: str, segments: List[Tuple]) -> None:
+        """Mask a JSON string value and record where its translation belongs"""
+        content_for_translation, preserved = self._mask_segment(value)
+        segments.append((container, key, content_for_translation, preserved))
 
     def _should_translate_key(self, key: str) -> bool:
         """Determine if a JSON key likely contains translatable content"""
@@ -276,21 +681,11 @@ class XMLProcessor:
         if not text:
             return text
             
-        # Preserve HTML tags
-        text_with_tags_preserved, preserved_tags = self._preserve_html_tags(text)
-        
-        # Preserve HTML attributes
-        text_with_attrs_preserved, preserved_attrs = self._preserve_html_attributes(text_with_tags_preserved)
-        
-        # Preserve placeholders
-        text_for_translation, placeholders = self._preserve_placeholders(text_with_attrs_preserved)
+        # Preserve HTML tags, attributes and placeholders
+        text_for_translation, preserved = self._mask_segment(text)
         
         # Translate the text
         translated_text = translate_func(text_for_translation)
         
-        # Restore placeholders, HTML tags and attributes in reverse order
-        restored_text = self._restore_preserved_content(translated_text, placeholders)
-        restored_text = self._restore_preserved_content(restored_text, preserved_attrs)
-        restored_text = self._restore_preserved_content(restored_text, preserved_tags)
-        
-        return restored_text
\ No newline at end of file
+        # Restore placeholders, HTML tags and attributes
+        return self._unmask_segment(translated_text, preserved)
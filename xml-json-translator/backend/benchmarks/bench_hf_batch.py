@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+HuggingFace Batch Throughput Benchmark
+
+Measures segments/second of one-at-a-time translate() against length-bucketed
+translate_batch() for different torch thread counts, using the TEXT segments of
+samples/sample.xml (masked the same way the XML processor masks them).
+
+Usage:
+    python benchmarks/bench_hf_batch.py [--language fi] [--threads 4 16] [--segments 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import torch
+
+from app.services.huggingface_service import HuggingFaceTranslationService
+from app.utils.xml_processor import XMLProcessor
+
+
+def load_segments(path, count):
+    """Masked TEXT segments from a sample file, repeated up to count"""
+    processor = XMLProcessor()
+    root = ET.parse(path).getroot()
+    segments = [
+        processor._mask_segment(elem.text)[0]
+        for elem in root.iter("TEXT") if elem.text and not elem.text.isspace()
+    ]
+    return (segments * (count // len(segments) + 1))[:count]
+
+
+def measure(func):
+    """Run func once and return elapsed seconds"""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batched HuggingFace inference')
+    parser.add_argument('--language', default='fi', help='Target language code')
+    parser.add_argument('--threads', type=int, nargs='*', default=[4, 16], help='torch thread counts to test')
+    parser.add_argument('--segments', type=int, default=200, help='Number of segments to translate')
+    parser.add_argument('--source', default=os.path.join(BACKEND_DIR, 'samples', 'sample.xml'),
+                        help='XML file providing the segments')
+    args = parser.parse_args()
+
+    service = HuggingFaceTranslationService()
+    segments = load_segments(args.source, args.segments)
+
+    # Load and warm the model outside the measurements
+    service.load_model(args.language)
+    service.translate_batch(segments[:8], args.language)
+
+    print(f"{len(segments)} segments, target language {args.language}")
+    print(f"{'threads':>8} {'sequential seg/s':>17} {'batched seg/s':>14} {'speedup':>8}")
+    for threads in args.threads:
+        torch.set_num_threads(threads)
+        sequential = measure(lambda: [service.translate(text, args.language) for text in segments])
+        batched = measure(lambda: service.translate_batch(segments, args.language))
+        print(
+            f"{threads:>8} {len(segments) / sequential:>17.1f} "
+            f"{len(segments) / batched:>14.1f} {sequential / batched:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
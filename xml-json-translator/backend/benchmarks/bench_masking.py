@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Masking Microbenchmark
+
+Compares the single-pass SegmentMasker against the previous str.replace based
+_preserve_* / _restore_preserved_content implementation on tag-heavy CDATA content.
+
+Usage:
+    python benchmarks/bench_masking.py [--repeat N] [--tags N]
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.masking import SegmentMasker
+
+
+class LegacyMasker:
+    """The original replace-based masking, kept here as the baseline"""
+
+    def __init__(self):
+        self.html_tag_pattern = re.compile(r'<[^>]*>|<\/[^>]*>')
+        self.html_attribute_pattern = re.compile(r'(\s+)([a-zA-Z0-9_-]+)(="[^"]*")')
+        self.placeholder_pattern = re.compile(r'__([a-zA-Z0-9]+)__')
+
+    def _preserve(self, text, pattern, prefix):
+        preserved = {}
+        for idx, match in enumerate(pattern.finditer(text)):
+            original = match.group(0)
+            marker = f"{prefix}_{idx}"
+            preserved[marker] = original
+            text = text.replace(original, marker)
+        return text, preserved
+
+    def mask(self, text):
+        text, tags = self._preserve(text, self.html_tag_pattern, "HTML_TAG")
+        text, attrs = self._preserve(text, self.html_attribute_pattern, "HTML_ATTR")
+        text, placeholders = self._preserve(text, self.placeholder_pattern, "PLACEHOLDER")
+        return text, [placeholders, attrs, tags]
+
+    def unmask(self, text, preserved):
+        for preserved_dict in preserved:
+            for marker, original in preserved_dict.items():
+                text = text.replace(marker, original)
+        return text
+
+
+def build_segment(tag_count):
+    """Build CDATA-style HTML content with the given number of tag pairs"""
+    parts = []
+    for i in range(tag_count):
+        parts.append(f'<span class="c{i}">Item __item{i}__ is <b>ready</b></span> ')
+    return "<div>" + "".join(parts) + "</div>"
+
+
+def bench(masker, text, repeat):
+    """Time mask + unmask of one segment, returning seconds per round trip"""
+    def round_trip():
+        masked, preserved = masker.mask(text)
+        masker.unmask(masked, preserved)
+
+    return min(timeit.repeat(round_trip, number=repeat, repeat=3)) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark segment masking')
+    parser.add_argument('--repeat', type=int, default=200, help='Round trips per measurement')
+    parser.add_argument('--tags', type=int, nargs='*', default=[10, 50, 200, 500],
+                        help='Tag pairs per segment to benchmark')
+    args = parser.parse_args()
+
+    legacy = LegacyMasker()
+    single_pass = SegmentMasker()
+
+    print(f"{'tags':>6} {'chars':>8} {'legacy (us)':>12} {'single-pass (us)':>17} {'speedup':>8}")
+    for tag_count in args.tags:
+        text = build_segment(tag_count)
+        legacy_time = bench(legacy, text, args.repeat)
+        single_time = bench(single_pass, text, args.repeat)
+        print(
+            f"{tag_count:>6} {len(text):>8} {legacy_time * 1e6:>12.1f} "
+            f"{single_time * 1e6:>17.1f} {legacy_time / single_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Model Store Benchmark
+
+Starts several worker processes at once that each load the same MarianMT model,
+either with from_pretrained (a private copy per process) or from the
+memory-mapped safetensors store (one shared copy in the page cache). Reports the
+cold load time, RSS and PSS of every worker while all of them hold the model.
+PSS divides shared pages among the processes that map them, so it shows the
+real per-worker cost.
+
+Usage:
+    python benchmarks/bench_model_store.py [--language fi] [--workers 4]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Load the model, touch every weight as inference would, report, then wait to be released
+WORKER_SCRIPT = """
+import sys
+import time
+import torch
+from transformers import MarianMTModel
+from app.services.huggingface_service import HuggingFaceTranslationService
+from app.services.model_store import MmapModelStore
+
+mode, model_name, store_dir = sys.argv[1:4]
+service = HuggingFaceTranslationService()
+start = time.perf_counter()
+if mode == "mmap":
+    model = MmapModelStore(store_dir).load(model_name, MarianMTModel)
+else:
+    model = MarianMTModel.from_pretrained(model_name, cache_dir=service.cache_dir)
+with torch.no_grad():
+    checksum = sum(float(param.sum()) for param in model.parameters())
+load_ms = (time.perf_counter() - start) * 1000
+
+def memory_kb(path, field):
+    with open(path) as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1])
+    return 0
+
+print(f"LOAD_MS={load_ms:.0f}", flush=True)
+sys.stdin.readline()
+print(f"RSS_KB={memory_kb('/proc/self/status', 'VmRSS:')}", flush=True)
+print(f"PSS_KB={memory_kb('/proc/self/smaps_rollup', 'Pss:')}", flush=True)
+"""
+
+
+def run_workers(mode, model_name, store_dir, workers):
+    """Start the workers together and collect (load_ms, rss_mb, pss_mb) once all have loaded"""
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER_SCRIPT, mode, model_name, store_dir],
+            cwd=BACKEND_DIR, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+        )
+        for _ in range(workers)
+    ]
+
+    load_times = []
+    for process in processes:
+        line = process.stdout.readline()
+        load_times.append(float(line.split("=", 1)[1]))
+
+    # Every worker holds the model now; measure memory while they are all alive
+    results = []
+    for process, load_ms in zip(processes, load_times):
+        output, _ = process.communicate("\n")
+        values = dict(line.split("=", 1) for line in output.splitlines() if "=" in line)
+        results.append((load_ms, int(values["RSS_KB"]) / 1024, int(values["PSS_KB"]) / 1024))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark memory-mapped model loading across workers')
+    parser.add_argument('--language', default='fi', help='Target language code')
+    parser.add_argument('--workers', type=int, default=4, help='Number of concurrent worker processes')
+    args = parser.parse_args()
+
+    from transformers import MarianMTModel
+    from app.services.huggingface_service import HuggingFaceTranslationService
+    from app.services.model_store import MmapModelStore
+
+    service = HuggingFaceTranslationService()
+    model_name = service.language_models[args.language]
+    store = MmapModelStore(os.path.join(service.cache_dir, "safetensors"))
+    if not store.has(model_name):
+        print(f"Converting {model_name} to safetensors")
+        store.save(MarianMTModel.from_pretrained(model_name, cache_dir=service.cache_dir), model_name)
+
+    print(f"{args.workers} workers, model {model_name}")
+    print(f"{'mode':>10} {'load ms':>9} {'RSS MB':>8} {'PSS MB':>8}")
+    for mode in ("pretrained", "mmap"):
+        results = run_workers(mode, model_name, store.store_dir, args.workers)
+        load_ms = sum(result[0] for result in results) / len(results)
+        rss = sum(result[1] for result in results) / len(results)
+        pss = sum(result[2] for result in results) / len(results)
+        print(f"{mode:>10} {load_ms:>9.0f} {rss:>8.0f} {pss:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Quantized Inference Benchmark
+
+Compares the fp32 MarianMT model with its dynamic int8 quantized version on the
+TEXT segments of samples/sample.xml: per-segment latency, batched throughput,
+weight memory, and a corpus BLEU score of the int8 output against the fp32
+output (100 means identical translations).
+
+Usage:
+    python benchmarks/bench_quantization.py [--language fi] [--threads 4] [--segments 100]
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import torch
+
+from app.services.huggingface_service import HuggingFaceTranslationService
+from app.utils.xml_processor import XMLProcessor
+
+
+def load_segments(path, count):
+    """Masked TEXT segments from a sample file, repeated up to count"""
+    processor = XMLProcessor()
+    root = ET.parse(path).getroot()
+    segments = [
+        processor._mask_segment(elem.text)[0]
+        for elem in root.iter("TEXT") if elem.text and not elem.text.isspace()
+    ]
+    return (segments * (count // len(segments) + 1))[:count]
+
+
+def corpus_bleu(hypotheses, references, max_order=4):
+    """Corpus BLEU with uniform n-gram weights and brevity penalty, on whitespace tokens"""
+    matches = [0] * max_order
+    totals = [0] * max_order
+    hyp_length = ref_length = 0
+
+    for hypothesis, reference in zip(hypotheses, references):
+        hyp, ref = hypothesis.split(), reference.split()
+        hyp_length += len(hyp)
+        ref_length += len(ref)
+        for n in range(1, max_order + 1):
+            hyp_ngrams = Counter(tuple(hyp[i:i + n]) for i in range(len(hyp) - n + 1))
+            ref_ngrams = Counter(tuple(ref[i:i + n]) for i in range(len(ref) - n + 1))
+            matches[n - 1] += sum((hyp_ngrams & ref_ngrams).values())
+            totals[n - 1] += max(len(hyp) - n + 1, 0)
+
+    if not hyp_length or 0 in matches:
+        return 0.0
+    log_precision = sum(math.log(m / t) for m, t in zip(matches, totals)) / max_order
+    brevity = min(1.0, math.exp(1 - ref_length / hyp_length))
+    return 100 * brevity * math.exp(log_precision)
+
+
+def run(service, tokenizer, model, segments):
+    """Sequential latency (ms/segment), batched throughput (seg/s) and batched outputs"""
+    lengths = [len(ids) for ids in tokenizer(segments).input_ids]
+
+    start = time.perf_counter()
+    for text, length in zip(segments, lengths):
+        service._generate_batched(tokenizer, model, [text], [length])
+    latency = (time.perf_counter() - start) / len(segments) * 1000
+
+    start = time.perf_counter()
+    outputs = service._generate_batched(tokenizer, model, segments, lengths)
+    throughput = len(segments) / (time.perf_counter() - start)
+
+    return latency, throughput, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark int8 quantized HuggingFace inference')
+    parser.add_argument('--language', default='fi', help='Target language code')
+    parser.add_argument('--threads', type=int, default=4, help='torch thread count')
+    parser.add_argument('--segments', type=int, default=100, help='Number of segments to translate')
+    parser.add_argument('--source', default=os.path.join(BACKEND_DIR, 'samples', 'sample.xml'),
+                        help='XML file providing the segments')
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    service = HuggingFaceTranslationService()
+    service.quantize = False
+    segments = load_segments(args.source, args.segments)
+    model_name = service.language_models[args.language]
+
+    tokenizer, fp32 = service._load_pretrained(model_name, args.language)
+    fp32.eval()
+    int8 = torch.quantization.quantize_dynamic(fp32, {torch.nn.Linear}, dtype=torch.qint8)
+
+    results = {}
+    for label, model in (("fp32", fp32), ("int8", int8)):
+        # Warm up outside the measurements
+        service._generate_batched(tokenizer, model, segments[:4], [8] * 4)
+        results[label] = run(service, tokenizer, model, segments)
+
+    print(f"{len(segments)} segments, target language {args.language}, {args.threads} threads")
+    print(f"{'model':>6} {'memory MB':>10} {'ms/segment':>11} {'batched seg/s':>14}")
+    for label, model in (("fp32", fp32), ("int8", int8)):
+        latency, throughput, _ = results[label]
+        memory = service._model_footprint(model) / 1024 / 1024
+        print(f"{label:>6} {memory:>10.1f} {latency:>11.1f} {throughput:>14.1f}")
+
+    fp32_latency, fp32_throughput, fp32_outputs = results["fp32"]
+    int8_latency, int8_throughput, int8_outputs = results["int8"]
+    identical = sum(a == b for a, b in zip(fp32_outputs, int8_outputs))
+    print(f"latency speedup     {fp32_latency / int8_latency:.2f}x")
+    print(f"throughput speedup  {int8_throughput / fp32_throughput:.2f}x")
+    print(f"BLEU vs fp32        {corpus_bleu(int8_outputs, fp32_outputs):.1f}")
+    print(f"identical outputs   {identical}/{len(segments)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Startup Time Benchmark
+
+Measures the cold start of main:app for each translation service configuration
+in a fresh interpreter, using python -X importtime. For every configuration it
+reports the time to import the app, the time until the configured service is
+created on first use, whether torch/transformers were imported, and the
+slowest imports.
+
+Usage:
+    python benchmarks/bench_startup.py [--services claude huggingface] [--top 10]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import the app, then create the configured service as the first request would
+STARTUP_SCRIPT = """
+import sys
+import time
+start = time.perf_counter()
+import main
+app_ready = time.perf_counter()
+heavy = ",".join(name for name in ("torch", "transformers") if name in sys.modules) or "none"
+from app.services.translation_factory import TranslationServiceFactory
+TranslationServiceFactory.get_service()
+service_ready = time.perf_counter()
+print(f"APP_IMPORT_MS={(app_ready - start) * 1000:.1f}")
+print(f"FIRST_SERVICE_MS={(service_ready - start) * 1000:.1f}")
+print(f"HEAVY_AT_APP_IMPORT={heavy}")
+"""
+
+
+def parse_importtime(stderr):
+    """Parse -X importtime output into (cumulative_us, module) pairs"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            rows.append((int(parts[1].strip()), parts[2].rstrip()))
+        except ValueError:
+            continue
+    return rows
+
+
+def run_configuration(service, top):
+    """Start a fresh interpreter with TRANSLATION_SERVICE=service and report its startup"""
+    env = dict(os.environ, TRANSLATION_SERVICE=service, PYTHONPATH=BACKEND_DIR)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(f"[{service}] startup failed:\n{result.stderr[-2000:]}")
+        return
+
+    values = dict(line.split("=", 1) for line in result.stdout.splitlines() if "=" in line)
+    rows = parse_importtime(result.stderr)
+    # Nested imports are indented further than the modules imported directly
+    top_level = [
+        (cumulative, module) for cumulative, module in rows
+        if len(module) - len(module.lstrip()) <= 1
+    ]
+
+    print(f"[{service}]")
+    print(f"  import main:app          {values.get('APP_IMPORT_MS', '?')} ms")
+    print(f"  first service created    {values.get('FIRST_SERVICE_MS', '?')} ms")
+    print(f"  heavy modules at import  {values.get('HEAVY_AT_APP_IMPORT', '?')}")
+    print("  slowest top-level imports:")
+    for cumulative, module in sorted(top_level, reverse=True)[:top]:
+        print(f"    {cumulative / 1000:>9.1f} ms  {module.strip()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cold start of main:app')
+    parser.add_argument('--services', nargs='*', default=['claude', 'huggingface'],
+                        help='TRANSLATION_SERVICE values to test')
+    parser.add_argument('--top', type=int, default=10, help='Number of slowest imports to show')
+    args = parser.parse_args()
+
+    for service in args.services:
+        run_configuration(service, args.top)
+
+
+if __name__ == "__main__":
+    main()
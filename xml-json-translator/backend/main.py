@@ -1,10 +1,13 @@
 import logging
+import threading
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.api.router import api_router
 from app.core.config import get_settings
+from app.services.translation_factory import TranslationServiceFactory
 
 # Configure logging
 logging.basicConfig(
@@ -31,11 +34,51 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["GET", "POST", "OPTIONS"],  
         allow_headers=["Content-Type", "Authorization"],
+        expose_headers=[
+            "Content-Disposition",
+            "X-Translation-Segments",
+            "X-Translation-Unique-Segments",
+            "X-Translation-Dedup-Ratio",
+            "X-Translation-Timings",
+        ],
     )
 
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# Load models in the master process so forked workers share them (e.g. gunicorn --preload)
+if settings.HUGGINGFACE_PRELOAD_BEFORE_FORK and settings.HUGGINGFACE_PRELOAD_LANGUAGES:
+    logger.info(f"Preloading models before fork: {', '.join(settings.HUGGINGFACE_PRELOAD_LANGUAGES)}")
+    TranslationServiceFactory.get_service("huggingface").preload(settings.HUGGINGFACE_PRELOAD_LANGUAGES)
+
+# Outcome of the startup warmup, reported by the readiness endpoint
+warmup_status = {"finished": False, "languages": {}, "error": None}
+
+def _warmup_models():
+    """Preload and warm the configured HuggingFace languages"""
+    try:
+        service = TranslationServiceFactory.get_service("huggingface")
+        states = service.warmup(settings.HUGGINGFACE_PRELOAD_LANGUAGES, settings.HUGGINGFACE_WARMUP_WORKERS)
+        warmup_status["languages"] = states
+        logger.info(f"Model warmup finished: {states}")
+    except Exception as e:
+        warmup_status["error"] = str(e)
+        logger.exception(f"Model warmup failed: {str(e)}")
+    finally:
+        warmup_status["finished"] = True
+
+# Warm models in the background so the process stays live while they load
+@app.on_event("startup")
+async def start_model_warmup():
+    if settings.HUGGINGFACE_PRELOAD_LANGUAGES:
+        logger.info(f"Warming models for: {', '.join(settings.HUGGINGFACE_PRELOAD_LANGUAGES)}")
+        threading.Thread(target=_warmup_models, name="model-warmup", daemon=True).start()
+
+# Stop worker processes and background threads of the created services
+@app.on_event("shutdown")
+async def close_translation_services():
+    TranslationServiceFactory.close()
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -46,6 +89,38 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+# Readiness endpoint: ready once the startup warmup has finished with warm models. Failed
+# languages keep the worker out of rotation unless HUGGINGFACE_READY_WITH_FAILED_LANGUAGES
+# allows it, and always when none warmed; models evicted later reload on demand.
+@app.get("/ready")
+async def readiness_check():
+    if not settings.HUGGINGFACE_PRELOAD_LANGUAGES:
+        return {"status": "ready", "languages": {}, "failed": []}
+    
+    if warmup_status["finished"]:
+        languages = dict(warmup_status["languages"])
+    else:
+        # Report progress while warming
+        service = TranslationServiceFactory.get_loaded_service("huggingface")
+        states = service.get_load_states() if service is not None else {}
+        languages = {lang: states.get(lang, "unloaded") for lang in settings.HUGGINGFACE_PRELOAD_LANGUAGES}
+    
+    failed = [lang for lang, state in languages.items() if state == "failed"]
+    warm = [lang for lang, state in languages.items() if state == "ready"]
+    ready = (
+        warmup_status["finished"]
+        and not warmup_status["error"]
+        and (not failed or (warm and settings.HUGGINGFACE_READY_WITH_FAILED_LANGUAGES))
+    )
+    
+    body = {"status": "ready" if ready else "not_ready", "languages": languages, "failed": failed}
+    if warmup_status["error"]:
+        body["error"] = warmup_status["error"]
+    
+    if ready:
+        return body
+    return JSONResponse(status_code=503, content=body)
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
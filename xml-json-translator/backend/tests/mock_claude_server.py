@@ -0,0 +1,184 @@
+"""
+Local stand-in for the Claude messages and Message Batches API
+
+Answers packed prompts (a JSON array of strings) with the strings upper-cased
+and other prompts with their last line upper-cased, so translation flows can
+run offline. Batches end after a set number of polls; chosen custom ids can be
+made to fail or come back misaligned.
+
+Usage:
+    python tests/mock_claude_server.py --port 8765
+    CLAUDE_API_BASE_URL=http://127.0.0.1:8765 CLAUDE_API_KEY=test TRANSLATION_SERVICE=claude \
+        python ../bulk_translate.py catalog/*.xml --target-languages fi sv --output-dir out
+"""
+import argparse
+import itertools
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BATCH_PATH = re.compile(r"^/v1/messages/batches/(?P<id>[^/]+)(?P<action>/results|/cancel)?$")
+
+
+def answer(content: str, misaligned: bool = False) -> str:
+    """Mock translation of a prompt"""
+    last_line = content.strip().splitlines()[-1].strip()
+    if not last_line.startswith("["):
+        return last_line.upper()
+    items = [item.upper() for item in json.loads(last_line)]
+    if misaligned:
+        items = items[:-1]
+    return json.dumps(items, ensure_ascii=False)
+
+
+def message(text: str) -> dict:
+    """Messages API response body with one text block"""
+    return {
+        "type": "message",
+        "role": "assistant",
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "usage": {"input_tokens": 0, "output_tokens": 0},
+    }
+
+
+class MockClaudeServer:
+    """Threaded HTTP server implementing the parts of the API the service uses"""
+
+    def __init__(self, port: int = 0, polls_until_ended: int = 1, failed_ids=(), misaligned_ids=()):
+        """
+        Args:
+            port: Port to listen on; 0 picks a free one
+            polls_until_ended: Status requests a batch answers in_progress before it ends
+            failed_ids: Custom ids whose batch result is errored
+            misaligned_ids: Custom ids whose batch result drops the last translation
+        """
+        self.polls_until_ended = polls_until_ended
+        self.failed_ids = set(failed_ids)
+        self.misaligned_ids = set(misaligned_ids)
+        self.batches = {}
+        self.message_requests = 0
+        self._batch_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockClaudeServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-claude", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockClaudeServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _batch_status(self, batch_id: str) -> dict:
+        """Batch object as returned by the status endpoint"""
+        batch = self.batches[batch_id]
+        ended = batch["status"] == "ended"
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": batch["status"],
+            "request_counts": {
+                "processing": 0 if ended else len(batch["requests"]),
+                "succeeded": len(batch["requests"]) if ended else 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "results_url": f"{self.url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def _batch_results(self, batch_id: str) -> str:
+        """JSONL results of an ended batch"""
+        lines = []
+        for request in self.batches[batch_id]["requests"]:
+            custom_id = request["custom_id"]
+            if custom_id in self.failed_ids:
+                result = {"type": "errored", "error": {"type": "error", "error": {"type": "api_error", "message": "mock failure"}}}
+            else:
+                content = request["params"]["messages"][0]["content"]
+                result = {"type": "succeeded", "message": message(answer(content, custom_id in self.misaligned_ids))}
+            lines.append(json.dumps({"custom_id": custom_id, "result": result}, ensure_ascii=False))
+        return "\n".join(lines) + "\n"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))) or b"{}")
+                if self.path == "/v1/messages":
+                    with server._lock:
+                        server.message_requests += 1
+                    return self._send_json(message(answer(body["messages"][0]["content"])))
+
+                if self.path == "/v1/messages/batches":
+                    with server._lock:
+                        batch_id = f"msgbatch_{next(server._batch_ids)}"
+                        server.batches[batch_id] = {"requests": body["requests"], "status": "in_progress", "polls": 0}
+                        return self._send_json(server._batch_status(batch_id))
+
+                match = BATCH_PATH.match(self.path)
+                if match and match.group("action") == "/cancel" and match.group("id") in server.batches:
+                    with server._lock:
+                        server.batches[match.group("id")]["status"] = "canceling"
+                        return self._send_json(server._batch_status(match.group("id")))
+                self._send_json({"type": "error", "error": {"type": "not_found_error"}}, 404)
+
+            def do_GET(self):
+                match = BATCH_PATH.match(self.path)
+                if not match or match.group("id") not in server.batches:
+                    return self._send_json({"type": "error", "error": {"type": "not_found_error"}}, 404)
+
+                batch_id = match.group("id")
+                with server._lock:
+                    if match.group("action") == "/results":
+                        return self._send(server._batch_results(batch_id).encode(), "application/x-jsonl")
+                    batch = server.batches[batch_id]
+                    batch["polls"] += 1
+                    if batch["status"] == "in_progress" and batch["polls"] >= server.polls_until_ended:
+                        batch["status"] = "ended"
+                    return self._send_json(server._batch_status(batch_id))
+
+            def _send_json(self, data, status=200):
+                self._send(json.dumps(data, ensure_ascii=False).encode(), "application/json", status)
+
+            def _send(self, payload, content_type, status=200):
+                self.send_response(status)
+                self.send_header("content-type", content_type)
+                self.send_header("content-length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a mock Claude API server")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--polls", type=int, default=2, help="Status polls before a batch ends")
+    args = parser.parse_args()
+
+    server = MockClaudeServer(args.port, polls_until_ended=args.polls)
+    print(f"Mock Claude API listening on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
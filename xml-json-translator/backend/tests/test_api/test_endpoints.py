@@ -3,8 +3,10 @@ from fastapi.testclient import TestClient
 import os
 import io
 import json
+import zipfile
 from unittest.mock import patch, MagicMock
 
+import main
 from main import app
 
 client = TestClient(app)
@@ -36,6 +38,34 @@ def test_health_check():
     assert response.status_code == 200
     assert response.json() == {"status": "healthy"}
 
+def test_readiness_check():
+    """Test the readiness endpoint when no models are preloaded"""
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+def test_readiness_after_failed_warmup():
+    """Test that failed languages keep a finished warmup unready unless partial warmups are allowed"""
+    with patch.object(main.settings, "HUGGINGFACE_PRELOAD_LANGUAGES", ["fi", "sv"]), \
+            patch.dict(main.warmup_status, {"finished": False, "languages": {}, "error": None}):
+        assert client.get("/ready").status_code == 503
+        
+        main.warmup_status.update(finished=True, languages={"fi": "ready", "sv": "failed"})
+        strict = client.get("/ready")
+        with patch.object(main.settings, "HUGGINGFACE_READY_WITH_FAILED_LANGUAGES", True):
+            partial = client.get("/ready")
+        
+            main.warmup_status.update(languages={"fi": "failed", "sv": "failed"})
+            all_failed = client.get("/ready")
+    
+    assert strict.status_code == 503
+    assert strict.json()["failed"] == ["sv"]
+    assert partial.status_code == 200
+    assert partial.json()["status"] == "ready"
+    assert partial.json()["failed"] == ["sv"]
+    assert all_failed.status_code == 503
+    assert all_failed.json()["failed"] == ["fi", "sv"]
+
 def test_root():
     """Test the root endpoint"""
     response = client.get("/")
@@ -62,9 +92,9 @@ def test_translate_xml_endpoint():
     data = {"target_language": "fi"}  # Using Finnish as test target
     
     # Mock the translation service to avoid actual API calls
-    with patch("app.services.translation_factory.TranslationServiceFactory.translate") as mock_translate:
-        # Mock translation function
-        mock_translate.side_effect = lambda text, target_lang, service_type: f"[MOCK_TRANSLATED] {text}"
+    with patch("app.services.translation_factory.TranslationServiceFactory.translate_batch") as mock_translate:
+        # Mock batch translation function
+        mock_translate.side_effect = lambda texts, target_lang, service_type, profile=None: [f"[MOCK_TRANSLATED] {text}" for text in texts]
         
         # Make the request
         response = client.post("/api/v1/translate/xml", files=files, data=data)
@@ -74,6 +104,36 @@ def test_translate_xml_endpoint():
     assert response.headers["content-type"] == "application/xml"
     assert "content-disposition" in response.headers
 
+def test_translate_xml_multiple_languages():
+    """Test that a multi-target request returns a zip with one file per language and timings"""
+    files = {"file": ("test.xml", io.BytesIO(SAMPLE_XML.encode()), "application/xml")}
+    data = {"target_languages": "fi, sv"}
+    
+    with patch("app.services.translation_factory.TranslationServiceFactory.translate_batch") as mock_translate:
+        mock_translate.side_effect = lambda texts, target_lang, service_type, profile=None: [
+            f"[{target_lang}] {text}" for text in texts
+        ]
+        response = client.post("/api/v1/translate/xml", files=files, data=data)
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert set(dict(item.split("=") for item in response.headers["x-translation-timings"].split(";"))) == {"fi", "sv"}
+    
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert sorted(archive.namelist()) == ["test_fi.xml", "test_sv.xml", "timings.json"]
+        assert "[sv] Welcome" in archive.read("test_sv.xml").decode()
+        assert set(json.loads(archive.read("timings.json"))) == {"fi", "sv"}
+
+def test_translate_xml_rejects_unknown_profile():
+    """Test that an unknown generation profile is rejected before translating"""
+    files = {"file": ("test.xml", io.BytesIO(SAMPLE_XML.encode()), "application/xml")}
+    data = {"target_language": "fi", "profile": "turbo"}
+    
+    response = client.post("/api/v1/translate/xml", files=files, data=data)
+    
+    assert response.status_code == 400
+    assert "turbo" in response.json()["detail"]
+
 @pytest.mark.skipif(os.environ.get("SKIP_MODEL_TESTS") == "1", reason="Skip tests that require model downloads")
 def test_translate_json_endpoint():
     """Test the JSON translation endpoint with a simple file"""
@@ -85,9 +145,9 @@ def test_translate_json_endpoint():
     data = {"target_language": "fi"}  # Using Finnish as test target
     
     # Mock the translation service to avoid actual API calls
-    with patch("app.services.translation_factory.TranslationServiceFactory.translate") as mock_translate:
-        # Mock translation function
-        mock_translate.side_effect = lambda text, target_lang, service_type: f"[MOCK_TRANSLATED] {text}"
+    with patch("app.services.translation_factory.TranslationServiceFactory.translate_batch") as mock_translate:
+        # Mock batch translation function
+        mock_translate.side_effect = lambda texts, target_lang, service_type, profile=None: [f"[MOCK_TRANSLATED] {text}" for text in texts]
         
         # Make the request
         response = client.post("/api/v1/translate/json", files=files, data=data)
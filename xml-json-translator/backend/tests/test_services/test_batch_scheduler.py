@@ -0,0 +1,52 @@
+import threading
+import pytest
+from app.services.batch_scheduler import MicroBatchScheduler
+
+
+def test_scheduler_merges_concurrent_callers():
+    """Test that segments from concurrent callers share batches and get their own results"""
+    batches = []
+    
+    def run_batch(texts):
+        batches.append(list(texts))
+        return [text.upper() for text in texts]
+    
+    scheduler = MicroBatchScheduler("test", run_batch, max_wait_ms=50)
+    results = {}
+    
+    def caller(name):
+        results[name] = scheduler.translate([f"{name}-1", f"{name}-2"])
+    
+    threads = [threading.Thread(target=caller, args=(name,)) for name in ("a", "b", "c")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    scheduler.stop()
+    
+    assert results == {name: [f"{name.upper()}-1", f"{name.upper()}-2"] for name in ("a", "b", "c")}
+    assert len(batches) < 6
+    
+    metrics = scheduler.metrics()
+    assert metrics["segments"] == 6
+    assert metrics["queue_depth"] == 0
+    assert sum(metrics["batch_size_distribution"].values()) == metrics["batches"]
+
+
+def test_scheduler_respects_batch_size_and_errors():
+    """Test the batch size limit and that failures reach every caller"""
+    sizes = []
+    
+    def run_batch(texts):
+        sizes.append(len(texts))
+        if "fail" in texts:
+            raise RuntimeError("model error")
+        return texts
+    
+    scheduler = MicroBatchScheduler("test", run_batch, max_wait_ms=20, max_batch_size=2)
+    assert scheduler.translate(["a", "b", "c"]) == ["a", "b", "c"]
+    assert max(sizes) <= 2
+    
+    with pytest.raises(RuntimeError):
+        scheduler.translate(["fail"])
+    scheduler.stop()
@@ -0,0 +1,77 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("pydantic_settings")
+
+from app.services.claude_service import ClaudeTranslationService
+from app.utils.xml_processor import XMLProcessor
+from tests.mock_claude_server import MockClaudeServer
+
+
+def make_service(server):
+    """A service talking to the mock server with synchronous requests and fast polling"""
+    service = ClaudeTranslationService()
+    if service.async_client is not None:
+        service.async_client.close()
+        service.async_client = None
+    service.api_key = "test-key"
+    service.base_url = server.url
+    service.client = httpx.Client(base_url=server.url, headers=service.headers)
+    service.batch_poll_interval = 0.01
+    return service
+
+
+def test_bulk_maps_results_by_custom_id():
+    """Test that packs go out as one message batch and come back in input order"""
+    with MockClaudeServer(polls_until_ended=3) as server:
+        service = make_service(server)
+        service.pack_token_budget = 10
+        texts = ["one", "two", "", "three", "four", "five", "one"]
+        
+        assert service.translate_bulk(texts, "fi") == ["ONE", "TWO", "", "THREE", "FOUR", "FIVE", "ONE"]
+        
+        assert len(server.batches) == 1
+        custom_ids = [request["custom_id"] for request in next(iter(server.batches.values()))["requests"]]
+        assert len(custom_ids) > 1
+        assert server.message_requests == 0
+        assert service.get_stats()["message_batches"] == 1
+        service.close()
+
+
+def test_bulk_retries_failed_and_misaligned_results():
+    """Test that errored and misaligned batch results are translated with regular requests"""
+    with MockClaudeServer(failed_ids={"fi-0"}, misaligned_ids={"fi-1"}) as server:
+        service = make_service(server)
+        service.pack_token_budget = 6
+        texts = ["alpha", "beta", "gamma", "delta", "epsilon"]
+        
+        assert service.translate_bulk(texts, "fi") == [text.upper() for text in texts]
+        assert server.message_requests > 0
+        service.close()
+
+
+def test_bulk_translates_several_documents():
+    """Test the whole offline flow: several documents, one batch, results written into each document"""
+    documents = [
+        '<LOCALIZATION><TEXT id="a">Save</TEXT><TEXT id="b">Open the file</TEXT></LOCALIZATION>',
+        '<LOCALIZATION><TEXT id="c">Save</TEXT><TEXT id="d">Close</TEXT></LOCALIZATION>',
+    ]
+    
+    with MockClaudeServer() as server:
+        service = make_service(server)
+        processor = XMLProcessor()
+        translated = processor.process_xml_documents(
+            documents,
+            lambda text: service.translate(text, "fi"),
+            lambda texts: service.translate_bulk(texts, "fi")
+        )
+        
+        assert len(server.batches) == 1
+        texts = [
+            [elem.text for elem in ET.fromstring(document).findall(".//TEXT")]
+            for document in translated
+        ]
+        assert texts == [["SAVE", "OPEN THE FILE"], ["SAVE", "CLOSE"]]
+        service.close()
@@ -0,0 +1,168 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from app.services.claude_client import AimdLimiter, AsyncClaudeClient, ClaudeAPIError, TokenBucket
+
+
+def make_client(responses, **kwargs):
+    """A client whose transport replays the given status codes and retry-after headers"""
+    replies = list(responses)
+    calls = []
+    
+    async def handler(request):
+        calls.append(request)
+        status, retry_after = replies.pop(0) if len(replies) > 1 else replies[0]
+        headers = {"retry-after": retry_after} if retry_after is not None else {}
+        return httpx.Response(status, headers=headers, json={"content": [{"type": "text", "text": "ok"}]})
+    
+    options = {"max_retries": 3, "backoff_base": 0.0, "initial_concurrency": 4, "max_concurrency": 8}
+    options.update(kwargs)
+    client = AsyncClaudeClient(
+        "https://api.test", {}, 10, httpx.Limits(), transport=httpx.MockTransport(handler), **options
+    )
+    return client, calls
+
+
+def test_throttled_requests_are_retried_after_retry_after():
+    """Test that 429 and 529 responses are retried and halve the concurrency limit"""
+    client, calls = make_client([(429, "0"), (529, None), (200, None)])
+    try:
+        response = client.send_sync({"messages": []}, 10)
+        
+        assert response.status_code == 200
+        assert len(calls) == 3
+        metrics = client.metrics()
+        assert metrics["retries"] == 2
+        assert metrics["throttled"] == 2
+        # 4 halved twice to 1, then one success adds one back
+        assert metrics["concurrency_decreases"] == 2
+        assert metrics["concurrency_limit"] == 2
+    finally:
+        client.close()
+
+
+def test_exhausted_retries_raise():
+    """Test that a request failing every attempt raises instead of returning the failure"""
+    client, calls = make_client([(503, None)], max_retries=2)
+    try:
+        with pytest.raises(ClaudeAPIError):
+            client.send_sync({"messages": []}, 10)
+        assert len(calls) == 3
+        assert client.metrics()["failures"] == 1
+    finally:
+        client.close()
+
+
+def test_non_retryable_errors_are_returned():
+    """Test that a client error is returned to the caller without retrying"""
+    client, calls = make_client([(400, None)])
+    try:
+        assert client.send_sync({"messages": []}, 10).status_code == 400
+        assert len(calls) == 1
+    finally:
+        client.close()
+
+
+def test_send_works_from_a_running_event_loop():
+    """Test that callers inside another event loop can await or block on the client"""
+    client, calls = make_client([(200, None)])
+    
+    async def caller():
+        awaited = await client.send({"messages": []}, 10)
+        blocking = client.send_sync({"messages": []}, 10)
+        return awaited.status_code, blocking.status_code
+    
+    try:
+        assert asyncio.run(caller()) == (200, 200)
+    finally:
+        client.close()
+
+
+def test_token_bucket_waits_for_refill():
+    """Test that a drained bucket delays the next request by the refill time"""
+    bucket = TokenBucket(600)  # 10 per second
+    
+    async def drain():
+        await bucket.acquire(600)
+        start = time.monotonic()
+        await bucket.acquire(1)
+        return time.monotonic() - start
+    
+    assert asyncio.run(drain()) >= 0.08
+
+
+def test_aimd_limit_grows_after_successes():
+    """Test that the limit increases by one after a limit's worth of successes"""
+    limiter = AimdLimiter(initial=2, maximum=3)
+    
+    async def run():
+        for _ in range(2):
+            epoch = await limiter.acquire()
+            limiter.release(epoch, success=True, throttled=False)
+    
+    asyncio.run(run())
+    assert limiter.limit == 3
+
+
+def test_failed_requests_free_their_slot():
+    """Test that a request raising an unexpected error does not keep its concurrency slot"""
+    async def broken(request):
+        raise ValueError("unexpected")
+    
+    client = AsyncClaudeClient(
+        "https://api.test", {}, 10, httpx.Limits(),
+        initial_concurrency=1, max_concurrency=1, transport=httpx.MockTransport(broken)
+    )
+    try:
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                client.send_sync({"messages": []}, 10)
+        assert client.metrics()["in_flight"] == 0
+        assert client.metrics()["concurrency_decreases"] == 0
+    finally:
+        client.close()
+
+
+def test_closing_fails_waiting_and_later_requests():
+    """Test that close() fails a request in flight and later sends instead of blocking forever"""
+    started = asyncio.Event()
+    
+    async def hanging(request):
+        started.set()
+        await asyncio.sleep(60)
+    
+    client = AsyncClaudeClient("https://api.test", {}, 10, httpx.Limits(), transport=httpx.MockTransport(hanging))
+    
+    async def close_once_started():
+        await started.wait()
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = executor.submit(client.send_sync, {"messages": []}, 10)
+        asyncio.run_coroutine_threadsafe(close_once_started(), client._loop).result(timeout=5)
+        client.close()
+        with pytest.raises(ClaudeAPIError):
+            pending.result(timeout=5)
+    
+    with pytest.raises(ClaudeAPIError):
+        client.send_sync({"messages": []}, 10)
+
+
+def test_send_sync_waits_a_bounded_time():
+    """Test that a request outliving every attempt and backoff raises instead of blocking"""
+    async def hanging(request):
+        await asyncio.sleep(60)
+    
+    client = AsyncClaudeClient(
+        "https://api.test", {}, 10, httpx.Limits(), max_retries=0, transport=httpx.MockTransport(hanging)
+    )
+    client.timeout = 0.1
+    try:
+        with pytest.raises(ClaudeAPIError):
+            client.send_sync({"messages": []}, 10)
+    finally:
+        client.close()
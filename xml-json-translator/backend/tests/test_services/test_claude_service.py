@@ -0,0 +1,205 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("pydantic_settings")
+
+from app.services.claude_client import AsyncClaudeClient, ClaudeAPIError
+from app.core.config import get_settings
+from app.services.claude_service import ClaudeTranslationService
+from tests.mock_claude_server import MockClaudeServer
+
+
+@pytest.fixture
+def service():
+    """A service whose pooled client answers from a mock transport"""
+    service = ClaudeTranslationService()
+    if service.async_client is not None:
+        service.async_client.close()
+        service.async_client = None
+    service.api_key = "test-key"
+    service.sent = []
+    
+    service.max_aligned = 100
+    
+    def handler(request):
+        service.sent.append(request)
+        text = json.loads(request.content)["messages"][0]["content"].strip().splitlines()[-1].strip()
+        if text.startswith("["):
+            # Packed request: answer with an array, dropping one item above max_aligned segments
+            items = [item.upper() for item in json.loads(text)]
+            if len(items) > service.max_aligned:
+                items = items[:-1]
+            text = json.dumps(items)
+        return httpx.Response(200, json={"content": [{"type": "text", "text": text.upper()}]})
+    
+    service.client = httpx.Client(
+        base_url=service.base_url,
+        headers={"anthropic-version": "2023-06-01"},
+        transport=httpx.MockTransport(handler)
+    )
+    yield service
+    service.close()
+
+
+def test_requests_share_the_pooled_client(service):
+    """Test that every segment goes through the one client with the API headers"""
+    assert service.translate("hello", "fi") == "HELLO"
+    assert service.translate("world", "fi") == "WORLD"
+    
+    assert [request.url.path for request in service.sent] == ["/v1/messages", "/v1/messages"]
+    assert all(request.headers["anthropic-version"] == "2023-06-01" for request in service.sent)
+    
+    stats = service.get_stats()
+    assert stats["requests"] == 2
+    # The mock transport never opens a connection
+    assert stats["new_connections"] == 0
+    assert stats["connection_reuse_rate"] == 1.0
+
+
+def test_api_errors_return_the_source_text(service):
+    """Test that a failed request leaves the text untranslated"""
+    service.client = httpx.Client(
+        base_url=service.base_url,
+        transport=httpx.MockTransport(lambda request: httpx.Response(529, text="overloaded"))
+    )
+    
+    assert service.translate("hello", "fi") == "hello"
+    assert service.get_stats()["requests"] == 1
+
+
+def test_failed_pack_raises_instead_of_returning_the_source(service):
+    """Test that an error response for a pack fails the batch rather than passing off English as translated"""
+    service.client = httpx.Client(
+        base_url=service.base_url,
+        transport=httpx.MockTransport(lambda request: httpx.Response(400, text="bad request"))
+    )
+    
+    with pytest.raises(ClaudeAPIError):
+        service.translate_batch(["hello", "world"], "fi")
+
+
+def test_batch_is_packed_under_the_token_budget(service):
+    """Test that segments share requests within the budget and come back in order"""
+    service.pack_token_budget = 8
+    texts = ["one", "", "two", "three", "x" * 80, "four"]
+    
+    assert service.translate_batch(texts, "fi") == ["ONE", "", "TWO", "THREE", "X" * 80, "FOUR"]
+    # The long text alone, then one/two/three in one pack and four on its own
+    assert len(service.sent) == 3
+    assert service.get_stats()["packed_requests"] == 1
+
+
+def test_packs_are_sent_concurrently(service):
+    """Test that the packs of one batch are in flight at the same time, up to pack_concurrency"""
+    service.pack_max_segments = 1
+    service.pack_concurrency = 3
+    lock = threading.Lock()
+    in_flight = [0]
+    max_in_flight = [0]
+    all_started = threading.Barrier(3, timeout=5)
+    
+    def handler(request):
+        with lock:
+            in_flight[0] += 1
+            max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+        # Every request waits for two others, so this only passes when three overlap
+        all_started.wait()
+        with lock:
+            in_flight[0] -= 1
+        text = json.loads(request.content)["messages"][0]["content"].strip().splitlines()[-1]
+        return httpx.Response(200, json={"content": [{"type": "text", "text": text.upper()}]})
+    
+    service.client = httpx.Client(base_url=service.base_url, transport=httpx.MockTransport(handler))
+    texts = [f"segment {index}" for index in range(6)]
+    
+    assert service.translate_batch(texts, "fi") == [text.upper() for text in texts]
+    assert max_in_flight[0] == 3
+
+
+def test_misaligned_pack_is_bisected(service):
+    """Test that a misaligned response is retried as halves until the answers align"""
+    service.max_aligned = 2
+    service.translate_json_field = lambda text, target_lang: text.upper()
+    texts = [f"segment {index}" for index in range(6)]
+    
+    assert service.translate_json_batch(texts, "fi") == [text.upper() for text in texts]
+    stats = service.get_stats()
+    # 6 -> 3 + 3 -> (1 + 2) + (1 + 2); lone segments use the single-field request
+    assert stats["bisections"] == 3
+    assert stats["packed_requests"] == 5
+
+
+def test_exhausted_retries_fail_the_translation(service):
+    """Test that a throttled batch raises instead of returning the English source"""
+    async def throttled(request):
+        return httpx.Response(429, headers={"retry-after": "0"})
+    
+    service.async_client = AsyncClaudeClient(
+        "https://api.test", {}, 10, httpx.Limits(),
+        max_retries=1, backoff_base=0.0, transport=httpx.MockTransport(throttled)
+    )
+    
+    with pytest.raises(ClaudeAPIError):
+        service.translate_batch(["hello", "world"], "fi")
+
+
+def test_instructions_are_a_cached_system_prompt_with_glossary(service, tmp_path):
+    """Test that instructions and glossary form a cached system prefix and cache usage is recorded"""
+    (tmp_path / "fi.json").write_text(json.dumps({"Save": "Tallenna"}), encoding="utf-8")
+    service.glossary_dir = str(tmp_path)
+    bodies = []
+    
+    def handler(request):
+        bodies.append(json.loads(request.content))
+        usage = {"input_tokens": 4, "output_tokens": 2, "cache_creation_input_tokens": 0, "cache_read_input_tokens": 1200}
+        return httpx.Response(200, json={"content": [{"type": "text", "text": "Tallenna"}], "usage": usage})
+    
+    service.client = httpx.Client(base_url=service.base_url, transport=httpx.MockTransport(handler))
+    
+    assert service.translate("Save", "fi") == "Tallenna"
+    assert service.translate("Save", "fi") == "Tallenna"
+    
+    system = bodies[0]["system"]
+    assert "Finnish" in system[0]["text"]
+    assert "Save => Tallenna" in system[1]["text"]
+    assert system[-1]["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" not in system[0]
+    assert bodies[0]["messages"][0]["content"] == "Save"
+    assert bodies[1]["system"] == system
+    
+    usage = service.get_stats()["usage"]
+    assert usage["cache_read_input_tokens"] == 2400
+    assert usage["input_tokens"] == 8
+    assert usage["cache_read_ratio"] == round(2400 / 2408, 4)
+
+
+def test_default_async_client_against_a_real_socket(monkeypatch):
+    """Test the production path: the async client enabled, talking HTTP to the mock server"""
+    settings = get_settings()
+    with MockClaudeServer() as server:
+        monkeypatch.setattr(settings, "CLAUDE_API_BASE_URL", server.url)
+        monkeypatch.setattr(settings, "CLAUDE_API_KEY", "test-key")
+        monkeypatch.setattr(settings, "CLAUDE_ASYNC_CLIENT", True)
+        service = ClaudeTranslationService()
+        try:
+            assert service.async_client is not None
+            calls = 3 * settings.CLAUDE_INITIAL_CONCURRENCY + 1
+            texts = [f"segment {index}" for index in range(calls)]
+            
+            # Sequential calls would hang if a request leaked its concurrency slot
+            sequential = [service.translate(text, "fi") for text in texts]
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                concurrent = list(executor.map(lambda text: service.translate(text, "fi"), texts))
+            
+            assert sequential == concurrent == [text.upper() for text in texts]
+            assert server.message_requests == 2 * calls
+            stats = service.get_stats()
+            assert stats["requests"] == 2 * calls
+            assert stats["async_client"]["in_flight"] == 0
+            assert stats["new_connections"] >= 1
+        finally:
+            service.close()
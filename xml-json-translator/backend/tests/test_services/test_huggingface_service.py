@@ -0,0 +1,194 @@
+import pytest
+from unittest.mock import patch
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from app.services.huggingface_service import HuggingFaceTranslationService
+
+
+@pytest.fixture
+def service():
+    """A fresh service instance that never touches the network"""
+    HuggingFaceTranslationService._instance = None
+    service = HuggingFaceTranslationService()
+    yield service
+    HuggingFaceTranslationService._instance = None
+
+
+def fake_pretrained(model_name, target_lang):
+    """A tokenizer placeholder and a 4 KB model"""
+    return object(), torch.nn.Linear(32, 32, bias=False)
+
+
+def test_make_batches_respects_token_budget(service):
+    """Test that inputs are sorted by length and batches stay under the padded token budget"""
+    service.batch_token_budget = 100
+    service.max_batch_size = 3
+    
+    batches = service._make_batches([10, 50, 5, 20, 30, 10, 60])
+    
+    assert batches == [[2, 0, 5], [3, 4], [1], [6]]
+
+
+def test_load_model_evicts_least_recently_used(service):
+    """Test that models are evicted in LRU order to stay within the memory budget"""
+    service.memory_budget = 2 * 32 * 32 * 4
+    
+    with patch.object(service, "_load_pretrained", side_effect=fake_pretrained):
+        service.load_model("fi")
+        service.load_model("sv")
+        service.load_model("fi")
+        service.load_model("de")
+    
+    assert list(service.models) == [service.language_models["fi"], service.language_models["de"]]
+    assert service.model_evictions == 1
+    assert service.get_stats()["models"]["loads"] == 3
+
+
+def test_load_model_keeps_pinned_languages(service):
+    """Test that pinned languages are never evicted"""
+    service.memory_budget = 2 * 32 * 32 * 4
+    service.pinned_languages = {"fi"}
+    
+    with patch.object(service, "_load_pretrained", side_effect=fake_pretrained):
+        service.load_model("fi")
+        service.load_model("sv")
+        service.load_model("de")
+    
+    assert service.language_models["fi"] in service.models
+    assert service.language_models["sv"] not in service.models
+
+
+def test_warmup_marks_languages_ready(service):
+    """Test that warmup loads each language and reports it ready"""
+    with patch.object(service, "_load_pretrained", side_effect=fake_pretrained), \
+            patch.object(service, "_generate_batched", return_value=["Hei maailma."]) as generate:
+        states = service.warmup(["fi", "sv", "xx"])
+    
+    assert states == {"fi": "ready", "sv": "ready"}
+    assert generate.call_count == 2
+    assert service.get_load_states()["de"] == "unloaded"
+
+
+def test_quantized_model_is_cached_and_smaller(service, tmp_path):
+    """Test that quantization shrinks the footprint and reuses the cached model"""
+    service.cache_dir = str(tmp_path)
+    model = torch.nn.Sequential(torch.nn.Linear(64, 64), torch.nn.ReLU(), torch.nn.Linear(64, 8))
+    
+    quantized = service._quantize_model(model, "Helsinki-NLP/opus-mt-en-fi")
+    cached = service._load_quantized("Helsinki-NLP/opus-mt-en-fi")
+    
+    assert service._model_footprint(quantized) < service._model_footprint(model)
+    assert cached is not None
+    inputs = torch.randn(2, 64)
+    assert torch.allclose(cached(inputs), quantized(inputs))
+
+
+def test_export_bundle_builds_artifacts_in_the_cache(service, tmp_path):
+    """Test that export_bundle saves the requested artifacts where the service loads them from"""
+    service.cache_dir = str(tmp_path)
+    model = torch.nn.Sequential(torch.nn.Linear(64, 64), torch.nn.ReLU(), torch.nn.Linear(64, 8))
+    
+    with patch("app.services.huggingface_service.MarianMTModel.from_pretrained", return_value=model) as from_pretrained:
+        paths = service.export_bundle("fi", str(tmp_path / "models" / "fi"), ["quantized"])
+    
+    from_pretrained.assert_called_once_with(str(tmp_path / "models" / "fi"), local_files_only=True)
+    assert paths == {"quantized": service._quantized_path(service.language_models["fi"])}
+    assert service._load_quantized(service.language_models["fi"]) is not None
+
+
+class WordTokenizer:
+    """One token per word plus the end of sequence token"""
+    
+    model_max_length = 512
+    
+    def __call__(self, texts):
+        class Encoding:
+            input_ids = [[1] * (len(text.split()) + 1) for text in texts]
+        return Encoding()
+
+
+def test_pack_long_text_keeps_chunks_under_budget(service):
+    """Test that neighbouring sentences are packed into chunks that fit the token budget"""
+    text = "One two three. Four five six seven! Eight nine? Ten eleven twelve thirteen fourteen."
+    
+    chunks, lengths = service._pack_long_text(text, WordTokenizer(), budget=8)
+    
+    assert chunks == ["One two three. Four five six seven!", "Eight nine? Ten eleven twelve thirteen fourteen."]
+    assert lengths == [8, 8]
+
+
+def test_pack_long_text_splits_oversized_sentence(service):
+    """Test that a sentence longer than the budget is split at word boundaries"""
+    text = " ".join(f"w{i}" for i in range(20)) + "."
+    
+    chunks, lengths = service._pack_long_text(text, WordTokenizer(), budget=8)
+    
+    assert " ".join(chunks) == text
+    assert all(length <= 8 for length in lengths)
+
+
+def test_translate_batch_generates_long_text_chunks_together(service):
+    """Test that the chunks of a long text share one batched generate with the other texts"""
+    service.max_input_tokens = 8
+    texts = ["Short text.", "One two three. Four five six seven! Eight nine?"]
+    
+    def fake_generate(tokenizer, model, batch_texts, lengths, profile=None):
+        return [text.upper() for text in batch_texts]
+    
+    with patch.object(service, "load_model", return_value=(WordTokenizer(), None)), \
+            patch.object(service, "_generate_batched", side_effect=fake_generate) as generate:
+        results = service.translate_batch(texts, "fi")
+    
+    assert generate.call_count == 1
+    assert results == ["SHORT TEXT.", "ONE TWO THREE. FOUR FIVE SIX SEVEN! EIGHT NINE?"]
+
+
+def test_resolve_profile_uses_language_then_global_default(service):
+    """Test that the requested profile wins over the language and global defaults"""
+    service.language_profiles = {"fi": "fast"}
+    
+    assert service.resolve_profile("fi", "quality") == "quality"
+    assert service.resolve_profile("fi") == "fast"
+    assert service.resolve_profile("sv") == service.default_profile
+    assert service.resolve_profile("sv", "turbo") == service.default_profile
+
+
+def test_generation_kwargs_scale_with_input_length(service):
+    """Test that profiles set beams and an output limit derived from the input length"""
+    service.generation_profiles = {
+        "fast": {"num_beams": 1, "max_new_tokens_ratio": 1.5, "max_new_tokens_margin": 8},
+        "quality": {"num_beams": 4, "max_new_tokens_ratio": 3.0, "max_new_tokens_margin": 32, "early_stopping": True},
+    }
+    
+    assert service._generation_kwargs("fast", 10) == {"num_beams": 1, "max_new_tokens": 23}
+    assert service._generation_kwargs("quality", 10) == {"num_beams": 4, "early_stopping": True, "max_new_tokens": 62}
+    assert service._generation_kwargs(None, 10) == {}
+
+
+def test_schedulers_are_separate_per_profile(service):
+    """Test that segments with different profiles never share a micro-batch"""
+    try:
+        fast = service._get_scheduler("fi", "fast", WordTokenizer())
+        quality = service._get_scheduler("fi", "quality", WordTokenizer())
+        
+        assert fast is not quality
+        assert service._get_scheduler("fi", "fast", WordTokenizer()) is fast
+    finally:
+        service.close()
+
+
+def test_scheduler_counts_tokens_with_the_tokenizer(service):
+    """Test that the micro-batch token limit is measured in the tokenizer's tokens, not words"""
+    class CharTokenizer:
+        def __call__(self, texts):
+            class Encoding:
+                input_ids = [[1] * (len(text) + 1) for text in texts]
+            return Encoding()
+    
+    try:
+        scheduler = service._get_scheduler("fi", "fast", CharTokenizer())
+        assert scheduler.count_tokens("Tallennus") == 10
+    finally:
+        service.close()
@@ -0,0 +1,92 @@
+import json
+import os
+
+from app.services.model_manifest import (
+    MANIFEST_FILE,
+    checksum_paths,
+    git_blob_sha1,
+    load_manifest,
+    verify_download,
+    verify_entry,
+    write_manifest,
+)
+
+
+def make_bundle(root):
+    """Write a small model directory and its manifest entry"""
+    model_dir = os.path.join(root, "models", "Helsinki-NLP--opus-mt-en-fi")
+    os.makedirs(model_dir)
+    for name, content in (("config.json", "{}"), ("model.safetensors", "weights")):
+        with open(os.path.join(model_dir, name), "w") as f:
+            f.write(content)
+    
+    path = os.path.join("models", "Helsinki-NLP--opus-mt-en-fi")
+    entry = {
+        "model_name": "Helsinki-NLP/opus-mt-en-fi",
+        "path": path,
+        "artifacts": {},
+        "files": checksum_paths(root, [path]),
+    }
+    write_manifest(root, {"fi": entry})
+    return model_dir, entry
+
+
+def test_manifest_round_trip(tmp_path):
+    """Test that a written manifest maps the model name to its local path"""
+    root = str(tmp_path)
+    model_dir, entry = make_bundle(root)
+    
+    assert len(entry["files"]) == 2
+    assert verify_entry(root, entry) == []
+    assert load_manifest(os.path.join(root, MANIFEST_FILE), verify=True) == {
+        "Helsinki-NLP/opus-mt-en-fi": model_dir
+    }
+
+
+def test_verify_skips_models_with_bad_checksums(tmp_path):
+    """Test that a modified or missing file excludes the model when verifying"""
+    root = str(tmp_path)
+    model_dir, entry = make_bundle(root)
+    with open(os.path.join(model_dir, "model.safetensors"), "w") as f:
+        f.write("corrupted")
+    os.remove(os.path.join(model_dir, "config.json"))
+    
+    problems = verify_entry(root, entry)
+    assert len(problems) == 2
+    
+    manifest_path = os.path.join(root, MANIFEST_FILE)
+    assert load_manifest(manifest_path, verify=True) == {}
+    # Without verification the bundle is trusted as is
+    assert "Helsinki-NLP/opus-mt-en-fi" in load_manifest(manifest_path)
+
+
+def test_missing_or_unknown_manifest_is_ignored(tmp_path):
+    """Test that there are no local paths without a readable manifest"""
+    manifest_path = str(tmp_path / MANIFEST_FILE)
+    assert load_manifest(manifest_path) == {}
+    
+    with open(manifest_path, "w") as f:
+        json.dump({"version": 99, "models": {}}, f)
+    assert load_manifest(manifest_path) == {}
+
+
+def test_download_is_checked_against_published_checksums(tmp_path):
+    """Test that downloads must match the hub's git blob ids and LFS sha256 values"""
+    model_dir, _ = make_bundle(str(tmp_path))
+    expected = {
+        # Values as computed by git hash-object and sha256sum
+        "config.json": {"blob_id": "9e26dfeeb6e641a33dae4961196235bdb965b21b"},
+        "model.safetensors": {"sha256": "9a129038d9a00aed0cf6a7ea059ca50a813449061ab87848cf1a13eafdf33b2c"},
+    }
+    
+    assert git_blob_sha1(os.path.join(model_dir, "config.json")) == expected["config.json"]["blob_id"]
+    assert verify_download(model_dir, expected) == []
+    
+    # A truncated download and a file that never arrived both fail
+    with open(os.path.join(model_dir, "model.safetensors"), "w") as f:
+        f.write("weig")
+    expected["vocab.json"] = {"blob_id": "0" * 40}
+    assert verify_download(model_dir, expected) == [
+        "model.safetensors does not match the published sha256",
+        "vocab.json is missing",
+    ]
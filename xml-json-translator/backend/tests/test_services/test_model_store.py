@@ -0,0 +1,62 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("numpy")
+pytest.importorskip("safetensors")
+
+from app.services.model_store import load_into, mmap_tensors, save_tensors
+
+
+class TiedModel(torch.nn.Module):
+    """Embedding and output projection sharing one weight, like MarianMT"""
+    
+    def __init__(self):
+        super().__init__()
+        self.embed = torch.nn.Embedding(16, 8)
+        self.head = torch.nn.Linear(8, 16, bias=False)
+        self.head.weight = self.embed.weight
+        self.register_buffer("bias", torch.arange(16, dtype=torch.float32))
+    
+    def forward(self, ids):
+        return self.head(self.embed(ids)) + self.bias
+
+
+def test_tied_weights_are_stored_once_and_shared_after_load(tmp_path):
+    """Test that tied weights are written once and both names map to one tensor"""
+    path = str(tmp_path / "model.safetensors")
+    original = TiedModel()
+    save_tensors(original, path)
+    
+    tensors = mmap_tensors(path)
+    assert tensors["embed.weight"] is tensors["head.weight"]
+    
+    model = TiedModel()
+    load_into(model, path)
+    
+    ids = torch.tensor([[1, 2, 3]])
+    assert torch.equal(model(ids), original(ids))
+    assert model.head.weight.data_ptr() == model.embed.weight.data_ptr()
+
+
+def test_mapped_weights_are_copy_on_write(tmp_path):
+    """Test that writing to a mapped tensor never changes the file"""
+    path = str(tmp_path / "model.safetensors")
+    save_tensors(TiedModel(), path)
+    before = (tmp_path / "model.safetensors").read_bytes()
+    
+    model = TiedModel()
+    load_into(model, path)
+    with torch.no_grad():
+        model.embed.weight.zero_()
+    
+    assert (tmp_path / "model.safetensors").read_bytes() == before
+    assert not torch.equal(mmap_tensors(path)["embed.weight"], model.embed.weight)
+
+
+def test_load_into_rejects_mismatched_weights(tmp_path):
+    """Test that a store written for another architecture is not loaded"""
+    path = str(tmp_path / "model.safetensors")
+    save_tensors(torch.nn.Linear(4, 4), path)
+    
+    with pytest.raises(ValueError):
+        load_into(TiedModel(), path)
@@ -0,0 +1,81 @@
+import itertools
+import queue
+import threading
+
+import pytest
+
+from app.services.model_worker_pool import ModelWorkerPool
+
+
+class FakeProcess:
+    def __init__(self, alive=True):
+        self.pid = 0
+        self.alive = alive
+    
+    def is_alive(self):
+        return self.alive
+
+
+@pytest.fixture
+def pool():
+    """A pool wired to in-process queues and fake processes instead of workers"""
+    pool = object.__new__(ModelWorkerPool)
+    pool.num_workers = 3
+    pool.threads_per_worker = 1
+    pool._results = queue.Queue()
+    pool._lock = threading.Lock()
+    pool._request_ids = itertools.count()
+    pool._pending = {}
+    pool._in_flight = [0, 0, 0]
+    pool._completed = [0, 0, 0]
+    pool._languages = [set(), set(), set()]
+    pool._stopped = threading.Event()
+    pool._requests = [queue.Queue() for _ in range(3)]
+    pool._processes = [FakeProcess() for _ in range(3)]
+    pool._result_thread = threading.Thread(target=pool._read_results, daemon=True)
+    pool._result_thread.start()
+    yield pool
+    pool._stopped.set()
+    pool._result_thread.join()
+
+
+def test_dispatch_to_least_loaded_worker(pool):
+    """Test that calls go to the worker with the fewest segments in flight"""
+    pool._submit("translate_batch", (["a"] * 5, "fi"), 5, "fi")
+    pool._submit("translate_batch", (["b"] * 2, "sv"), 2, "sv")
+    pool._submit("translate_batch", (["c"], "de"), 1, "de")
+    pool._submit("translate_batch", (["d"], "de"), 1, "de")
+    
+    assert [requests.qsize() for requests in pool._requests] == [1, 1, 2]
+    assert pool._in_flight == [5, 2, 2]
+
+
+def test_dispatch_prefers_worker_with_language(pool):
+    """Test that ties go to a worker that already served the language"""
+    pool._languages[2].add("fi")
+    
+    pool._submit("translate_batch", (["a"], "fi"), 1, "fi")
+    
+    assert pool._requests[2].qsize() == 1
+
+
+def test_results_resolve_futures(pool):
+    """Test that results from the shared queue complete the matching call"""
+    future = pool._submit("translate_batch", (["Hello"], "fi"), 1, "fi")
+    request_id, method, args = pool._requests[0].get()
+    
+    pool._results.put((request_id, ["Hei"], None))
+    
+    assert future.result(timeout=5) == ["Hei"]
+    assert pool._in_flight == [0, 0, 0]
+    assert pool._completed == [1, 0, 0]
+
+
+def test_dead_worker_fails_pending_calls(pool):
+    """Test that calls waiting on a worker that exited raise instead of hanging"""
+    future = pool._submit("translate_batch", (["Hello"], "fi"), 1, "fi")
+    pool._processes[0].alive = False
+    
+    with pytest.raises(RuntimeError):
+        future.result(timeout=5)
+    assert pool._pick_worker("fi") == 1
@@ -0,0 +1,65 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services.onnx_engine import OnnxMarianEngine, is_exported
+
+
+class FakeEncoder:
+    def run(self, output_names, inputs):
+        batch, length = inputs["input_ids"].shape
+        return [np.zeros((batch, length, 4), dtype=np.float32)]
+
+
+class FakeDecoder:
+    """Emits tokens 5, 6, EOS for the first row and 7, EOS for the second"""
+    
+    def __init__(self, vocab_size=10):
+        self.vocab_size = vocab_size
+        self.script = [[5, 6, 2], [7, 2, 2]]
+    
+    def run(self, output_names, inputs):
+        batch, length = inputs["decoder_input_ids"].shape
+        logits = np.zeros((batch, length, self.vocab_size), dtype=np.float32)
+        for row in range(batch):
+            logits[row, -1, self.script[row][min(length - 1, 2)]] = 1.0
+            # The pad token scores highest but must never be chosen
+            logits[row, -1, 0] = 5.0
+        return [logits]
+
+
+@pytest.fixture
+def engine():
+    """An engine backed by scripted sessions instead of ONNX Runtime"""
+    engine = object.__new__(OnnxMarianEngine)
+    engine.encoder = FakeEncoder()
+    engine.decoder = FakeDecoder()
+    engine.decoder_start_token_id = 0
+    engine.eos_token_id = 2
+    engine.pad_token_id = 0
+    engine.max_length = 16
+    return engine
+
+
+def test_greedy_decoding_stops_at_eos(engine):
+    """Test that each row decodes until EOS and is padded afterwards"""
+    output = engine.generate([[11, 12, 2], [13, 2, 0]], attention_mask=[[1, 1, 1], [1, 1, 0]])
+    
+    assert output.tolist() == [[0, 5, 6, 2], [0, 7, 2, 0]]
+
+
+def test_greedy_decoding_respects_max_length(engine):
+    """Test that decoding stops at max_length even without EOS"""
+    output = engine.generate([[11, 12, 2]], max_length=2)
+    
+    assert output.tolist() == [[0, 5]]
+
+
+def test_is_exported_requires_all_files(tmp_path):
+    """Test that a partial export is not used"""
+    (tmp_path / "encoder.onnx").write_bytes(b"")
+    (tmp_path / "decoder.onnx").write_bytes(b"")
+    assert not is_exported(str(tmp_path))
+    
+    (tmp_path / "generation.json").write_text("{}")
+    assert is_exported(str(tmp_path))
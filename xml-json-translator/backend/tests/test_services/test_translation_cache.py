@@ -0,0 +1,48 @@
+from unittest.mock import patch
+from app.services.translation_cache import TranslationCache
+
+
+def test_translation_cache_hits_and_misses():
+    """Test basic lookups and the stats surface"""
+    cache = TranslationCache(max_bytes=1024 * 1024)
+    cache.put("save", "Tallenna")
+    
+    assert cache.get("save") == "Tallenna"
+    assert cache.get("cancel") is None
+    
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["resident_bytes"] > 0
+
+
+def test_translation_cache_bounded_by_bytes():
+    """Test that least recently used entries are evicted to stay within max_bytes"""
+    entry_size = TranslationCache._entry_size("key0", "x" * 100)
+    cache = TranslationCache(max_bytes=entry_size * 2)
+    
+    cache.put("key0", "x" * 100)
+    cache.put("key1", "x" * 100)
+    cache.get("key0")
+    cache.put("key2", "x" * 100)
+    
+    assert cache.get("key1") is None
+    assert cache.get("key0") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["resident_bytes"] <= entry_size * 2
+
+
+def test_translation_cache_ttl_expiry():
+    """Test that entries expire after their ttl"""
+    cache = TranslationCache(max_bytes=1024 * 1024, default_ttl=10)
+    
+    with patch("app.services.translation_cache.time.monotonic", return_value=100.0):
+        cache.put("short", "a", ttl=1)
+        cache.put("default", "b")
+    
+    with patch("app.services.translation_cache.time.monotonic", return_value=105.0):
+        assert cache.get("short") is None
+        assert cache.get("default") == "b"
+    
+    assert cache.stats()["expirations"] == 1
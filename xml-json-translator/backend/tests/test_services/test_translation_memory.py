@@ -0,0 +1,96 @@
+import pytest
+from app.services.translation_memory import TranslationMemory
+
+
+@pytest.fixture
+def memory(tmp_path):
+    return TranslationMemory(str(tmp_path / "memory.sqlite3"))
+
+
+def test_translation_memory_bulk_lookup(memory):
+    """Test storing and bulk-looking-up translations"""
+    save_key = TranslationMemory.make_key("Save", "fi", "huggingface", "opus-mt-en-fi")
+    cancel_key = TranslationMemory.make_key("Cancel", "fi", "huggingface", "opus-mt-en-fi")
+    
+    memory.put_many([(save_key, "fi", "huggingface", "opus-mt-en-fi", "Tallenna")])
+    found = memory.get_many([save_key, cancel_key])
+    
+    assert found == {save_key: "Tallenna"}
+    stats = memory.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+
+
+def test_translation_memory_key_normalization():
+    """Test that keys ignore whitespace differences but not language, service or model"""
+    key = TranslationMemory.make_key("Hello  world ", "fi", "claude", "model-a")
+    
+    assert key == TranslationMemory.make_key("Hello world", "fi", "claude", "model-a")
+    assert key != TranslationMemory.make_key("Hello world", "sv", "claude", "model-a")
+    assert key != TranslationMemory.make_key("Hello world", "fi", "huggingface", "model-a")
+    assert key != TranslationMemory.make_key("Hello world", "fi", "claude", "model-b")
+
+
+def test_translation_memory_evicts_least_recently_used(tmp_path):
+    """Test that the store is trimmed to max_bytes, keeping recently used entries"""
+    memory = TranslationMemory(str(tmp_path / "memory.sqlite3"), max_bytes=300, touch_interval=0)
+    keys = [TranslationMemory.make_key(f"text {i}", "fi", "claude", "m") for i in range(3)]
+    
+    memory.put_many([(keys[0], "fi", "claude", "m", "x" * 50)])
+    memory.put_many([(keys[1], "fi", "claude", "m", "x" * 50)])
+    memory.get_many([keys[0]])
+    memory.put_many([(keys[2], "fi", "claude", "m", "x" * 50)])
+    
+    assert memory.total_bytes() <= 300
+    assert keys[1] not in memory.get_many(keys)
+    assert memory.stats()["evictions"] == 1
+
+
+def test_translation_memory_lookups_touch_stale_entries_only(memory):
+    """Test that hits only rewrite the access time once it is older than the touch interval"""
+    key = TranslationMemory.make_key("Save", "fi", "claude", "m")
+    memory.put_many([(key, "fi", "claude", "m", "Tallenna")])
+    conn = memory._connection()
+    
+    def last_access():
+        return conn.execute("SELECT last_access FROM translations WHERE key = ?", (key,)).fetchone()[0]
+    
+    stored = last_access()
+    memory.get(key)
+    assert last_access() == stored
+    
+    memory.touch_interval = 0
+    memory.get(key)
+    assert last_access() > stored
+
+
+def test_translation_memory_tracks_total_size(tmp_path):
+    """Test that the tracked size follows inserts, replacements and evictions"""
+    memory = TranslationMemory(str(tmp_path / "memory.sqlite3"), max_bytes=250)
+    key = TranslationMemory.make_key("Save", "fi", "claude", "m")
+    
+    def summed():
+        return memory._connection().execute("SELECT COALESCE(SUM(size), 0) FROM translations").fetchone()[0]
+    
+    memory.put_many([(key, "fi", "claude", "m", "x" * 10)])
+    memory.put_many([(key, "fi", "claude", "m", "x" * 40)])
+    assert memory.total_bytes() == summed() == len(key) + 40
+    
+    other = TranslationMemory.make_key("Cancel", "fi", "claude", "m")
+    memory.put_many([(other, "fi", "claude", "m", "x" * 100)])
+    assert memory.stats()["evictions"] == 1
+    assert memory.total_bytes() == summed() <= 250
+    
+    # A second instance opening the file picks up the stored total
+    assert TranslationMemory(memory.path).total_bytes() == summed()
+
+
+def test_translation_memory_shared_between_instances(tmp_path):
+    """Test that a second connection to the same file sees stored translations"""
+    path = str(tmp_path / "memory.sqlite3")
+    key = TranslationMemory.make_key("OK", "de", "claude", "m")
+    
+    TranslationMemory(path).put_many([(key, "de", "claude", "m", "OK")])
+    
+    assert TranslationMemory(path).get(key) == "OK"
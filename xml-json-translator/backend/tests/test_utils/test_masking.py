@@ -0,0 +1,37 @@
+from app.utils.masking import SegmentMasker
+
+
+def test_mask_and_unmask_round_trip():
+    """Test that masking and unmasking restores the original text"""
+    masker = SegmentMasker()
+    text = '<p class="intro">Hello __name__, see <a href="__url__">this</a> id="main" page</p>'
+    
+    masked, preserved = masker.mask(text)
+    
+    # Tags, attributes and placeholders are hidden from the translator
+    assert "<" not in masked
+    assert "__name__" not in masked
+    assert 'id="main"' not in masked
+    assert masker.unmask(masked, preserved) == text
+
+
+def test_unmask_does_not_confuse_similar_markers():
+    """Test that HTML_TAG_1 is not restored inside HTML_TAG_10"""
+    masker = SegmentMasker()
+    text = "".join(f"<b{i}>word{i}" for i in range(12))
+    
+    masked, preserved = masker.mask(text)
+    assert "HTML_TAG_10" in masked
+    assert masker.unmask(masked, preserved) == text
+
+
+def test_unmask_keeps_digits_after_marker():
+    """Test that digits following a marker in the translation are kept"""
+    masker = SegmentMasker()
+    masked, preserved = masker.mask("<b>5 items")
+    
+    assert masked == "HTML_TAG_05 items"
+    assert masker.unmask(masked, preserved) == "<b>5 items"
+    
+    # Unknown markers are left untouched
+    assert masker.unmask("HTML_TAG_3 PLACEHOLDER_0", preserved) == "HTML_TAG_3 PLACEHOLDER_0"
@@ -1,7 +1,11 @@
 import pytest
+import io
 import xml.etree.ElementTree as ET
 import json
-from app.utils.xml_processor import XMLProcessor
+import threading
+import time
+from app.core.exceptions import TranslationServiceError
+from app.utils.xml_processor import SegmentStats, XMLProcessor
 
 # Sample XML content for testing
 SAMPLE_XML = """<?xml version="1.0" encoding="utf-8"?>
@@ -82,4 +86,256 @@ def test_xml_processor_process_json():
     
     # Check that placeholders are preserved
     email_text = [t for t in translated_json["localization"]["texts"] if t["id"] == "placeholder.email"][0]["text"]
-    assert "__email__" in email_text
\ No newline at end of file
+    assert "__email__" in email_text
+
+def test_xml_processor_process_xml_batch():
+    """Test that process_xml sends all segments to translate_batch in one call"""
+    processor = XMLProcessor()
+    batch_calls = []
+    
+    def mock_translate(text):
+        raise AssertionError("per-segment translation should not be used")
+    
+    def mock_translate_batch(texts):
+        batch_calls.append(list(texts))
+        return [f"[TRANSLATED] {text}" for text in texts]
+    
+    translated_xml = processor.process_xml(SAMPLE_XML, mock_translate, mock_translate_batch)
+    root = ET.fromstring(translated_xml)
+    
+    # One batch call containing every TEXT element
+    assert len(batch_calls) == 1
+    assert len(batch_calls[0]) == 4
+    
+    for elem in root.findall(".//TEXT"):
+        assert "[TRANSLATED]" in elem.text
+    
+    email_elem = root.find(".//TEXT[@id='placeholder.email']")
+    assert "__email__" in email_elem.text
+
+
+def test_xml_processor_batch_fallback():
+    """Test that a misaligned batch result falls back to per-segment translation"""
+    processor = XMLProcessor()
+    
+    def mock_translate(text):
+        return f"[TRANSLATED] {text}"
+    
+    def broken_translate_batch(texts):
+        return texts[:1]
+    
+    translated_json = processor.process_json(SAMPLE_JSON, mock_translate, translate_batch=broken_translate_batch)
+    
+    for text_item in translated_json["localization"]["texts"]:
+        assert text_item["text"].startswith("[TRANSLATED]")
+
+
+def test_xml_processor_service_failure_is_not_retried_per_segment():
+    """Test that a service that gave up fails the document without per-segment retries"""
+    processor = XMLProcessor()
+    single_calls = []
+    
+    def mock_translate(text):
+        single_calls.append(text)
+        return f"[TRANSLATED] {text}"
+    
+    def exhausted_translate_batch(texts):
+        raise TranslationServiceError("retries exhausted")
+    
+    with pytest.raises(TranslationServiceError):
+        processor.process_xml(SAMPLE_XML, mock_translate, exhausted_translate_batch)
+    assert single_calls == []
+
+
+def test_xml_processor_process_xml_stream():
+    """Test that streaming translation matches process_xml and translates in windows"""
+    processor = XMLProcessor()
+    window_sizes = []
+    
+    def mock_translate(text):
+        return f"[TRANSLATED] {text}"
+    
+    def mock_translate_batch(texts):
+        window_sizes.append(len(texts))
+        return [f"[TRANSLATED] {text}" for text in texts]
+    
+    output = io.StringIO()
+    processor.process_xml_stream(
+        io.BytesIO(SAMPLE_XML.encode('utf-8')), output, mock_translate, mock_translate_batch, window_size=2
+    )
+    
+    # Segments are translated in bounded windows
+    assert window_sizes == [2, 2]
+    
+    streamed_root = ET.fromstring(output.getvalue().encode('utf-8'))
+    expected_root = ET.fromstring(processor.process_xml(SAMPLE_XML, mock_translate).encode('utf-8'))
+    
+    assert streamed_root.attrib == expected_root.attrib
+    assert [(e.get('id'), e.text) for e in streamed_root.findall(".//TEXT")] == \
+        [(e.get('id'), e.text) for e in expected_root.findall(".//TEXT")]
+
+
+def test_xml_processor_process_xml_stream_nested_groups():
+    """Test that windows inside a large group are written out before the group closes"""
+    processor = XMLProcessor()
+    output = io.StringIO()
+    written_at_batch = []
+    
+    def mock_translate_batch(texts):
+        written_at_batch.append(output.getvalue())
+        return [f"[TRANSLATED] {text}" for text in texts]
+    
+    texts = "\n".join(f'      <TEXT id="t{i}">Text {i}</TEXT>' for i in range(6))
+    xml_content = f"""<?xml version="1.0" encoding="utf-8"?>
+<LOCALIZATION>
+  <GROUP id="outer">
+    <GROUP id="inner">
+{texts}
+    </GROUP>
+  </GROUP>
+  <TEXT id="after">After</TEXT>
+</LOCALIZATION>
+"""
+    processor.process_xml_stream(
+        io.BytesIO(xml_content.encode('utf-8')), output, lambda text: text, mock_translate_batch, window_size=2
+    )
+    
+    # The third window starts after the first windows were written, with both groups still open
+    assert len(written_at_batch) == 4
+    assert '[TRANSLATED] Text 1</TEXT>' in written_at_batch[2]
+    assert '<GROUP id="inner">' in written_at_batch[2]
+    assert '</GROUP>' not in written_at_batch[2]
+    
+    streamed_root = ET.fromstring(output.getvalue().encode('utf-8'))
+    expected_root = ET.fromstring(processor.process_xml(xml_content, lambda text: f"[TRANSLATED] {text}").encode('utf-8'))
+    assert ET.tostring(streamed_root) == ET.tostring(expected_root)
+
+
+def test_xml_processor_deduplicates_segments():
+    """Test that identical segments are translated once and fanned back out"""
+    processor = XMLProcessor()
+    translated_texts = []
+    
+    def mock_translate_batch(texts):
+        translated_texts.extend(texts)
+        return [f"[TRANSLATED] {text}" for text in texts]
+    
+    xml_content = """<?xml version="1.0" encoding="utf-8"?>
+<LOCALIZATION>
+  <TEXT id="a.save">Save</TEXT>
+  <TEXT id="b.save">Save</TEXT>
+  <TEXT id="c.cancel">Cancel</TEXT>
+  <TEXT id="d.save">Save</TEXT>
+</LOCALIZATION>
+"""
+    stats = SegmentStats()
+    translated_xml = processor.process_xml(xml_content, lambda text: text, mock_translate_batch, stats)
+    root = ET.fromstring(translated_xml)
+    
+    assert sorted(translated_texts) == ["Cancel", "Save"]
+    assert [elem.text for elem in root.findall(".//TEXT")] == [
+        "[TRANSLATED] Save", "[TRANSLATED] Save", "[TRANSLATED] Cancel", "[TRANSLATED] Save"
+    ]
+    
+    assert stats.total_segments == 4
+    assert stats.unique_segments == 2
+    assert stats.to_headers()["X-Translation-Dedup-Ratio"] == "0.5000"
+
+
+def test_xml_processor_process_xml_documents():
+    """Test that the segments of several documents go out in one batch call and return to their documents"""
+    processor = XMLProcessor()
+    calls = []
+    
+    def mock_translate_batch(texts):
+        calls.append(list(texts))
+        return [f"[TRANSLATED] {text}" for text in texts]
+    
+    second_xml = """<?xml version="1.0" encoding="utf-8"?>
+<LOCALIZATION>
+  <TEXT id="button.save">Save</TEXT>
+  <TEXT id="button.cancel">Cancel</TEXT>
+</LOCALIZATION>
+"""
+    stats = SegmentStats()
+    first, second = processor.process_xml_documents([SAMPLE_XML, second_xml], lambda text: text, mock_translate_batch, stats)
+    
+    assert len(calls) == 1
+    assert stats.total_segments == 6
+    assert stats.unique_segments == 5
+    
+    first_texts = {elem.get('id'): elem.text for elem in ET.fromstring(first).findall(".//TEXT")}
+    second_texts = {elem.get('id'): elem.text for elem in ET.fromstring(second).findall(".//TEXT")}
+    assert first_texts["welcome.title"] == "[TRANSLATED] Welcome to our application"
+    assert first_texts["button.save"] == "[TRANSLATED] Save"
+    assert second_texts == {"button.save": "[TRANSLATED] Save", "button.cancel": "[TRANSLATED] Cancel"}
+
+
+def test_xml_processor_concurrent_batches_keep_order():
+    """Test that concurrent batch dispatch respects the in-flight limit and document order"""
+    processor = XMLProcessor(max_concurrency=2, batch_size=1)
+    lock = threading.Lock()
+    in_flight = [0]
+    max_in_flight = [0]
+    
+    def slow_translate_batch(texts):
+        with lock:
+            in_flight[0] += 1
+            max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+        time.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+        return [f"[TRANSLATED] {text}" for text in texts]
+    
+    translated_json = processor.process_json(SAMPLE_JSON, lambda text: text, translate_batch=slow_translate_batch)
+    
+    assert max_in_flight[0] <= 2
+    for original, translated in zip(SAMPLE_JSON["localization"]["texts"], translated_json["localization"]["texts"]):
+        assert translated["text"] == f"[TRANSLATED] {original['text']}"
+
+
+def make_translators(languages, masked_inputs):
+    """Batch translators that prefix the language code and record the masked inputs"""
+    def translator(language):
+        def translate_batch(texts):
+            masked_inputs.setdefault(language, []).extend(texts)
+            return [f"[{language}] {text}" for text in texts]
+        return (lambda text: f"[{language}] {text}", translate_batch)
+    return {language: translator(language) for language in languages}
+
+
+def test_xml_processor_process_xml_multi():
+    """Test that one parse produces a separate translated document per language"""
+    processor = XMLProcessor()
+    masked_inputs = {}
+    stats = SegmentStats()
+    timings = {}
+    
+    outputs = processor.process_xml_multi(
+        SAMPLE_XML, make_translators(["fi", "sv"], masked_inputs), stats=stats, timings=timings
+    )
+    
+    assert set(outputs) == {"fi", "sv"}
+    for language in ("fi", "sv"):
+        root = ET.fromstring(outputs[language])
+        assert root.find(".//TEXT[@id='welcome.title']").text == f"[{language}] Welcome to our application"
+        assert root.find(".//TEXT[@id='placeholder.email']").text == f"[{language}] Please enter your __email__"
+        assert "<b>awesome</b>" in root.find(".//TEXT[@id='welcome.message']").text
+        assert set(timings[language]) == {"translate_ms", "render_ms"}
+    
+    # Both languages received the same masked segments, counted once in the stats
+    assert masked_inputs["fi"] == masked_inputs["sv"]
+    assert stats.total_segments == 4
+
+
+def test_xml_processor_process_json_multi():
+    """Test that every language gets its own copy of the translated JSON"""
+    processor = XMLProcessor()
+    
+    outputs = processor.process_json_multi(SAMPLE_JSON, make_translators(["fi", "de"], {}))
+    
+    for language in ("fi", "de"):
+        texts = outputs[language]["localization"]["texts"]
+        assert texts[2]["text"] == f"[{language}] Save"
+        assert texts[2]["id"] == "button.save"
+    assert SAMPLE_JSON["localization"]["texts"][2]["text"] == "Save"
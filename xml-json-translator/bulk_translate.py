@@ -0,0 +1,60 @@
+# bulk_translate.py
+"""
+Translate a catalog of XML files offline
+
+The TEXT segments of all files are deduplicated and translated together with
+the service's bulk mode, one job per target language. With Claude that is a
+Message Batches job: slower to finish but cheaper, and the command waits
+until the batch ends. Other services use their batch translation. Translated
+files are written to <output-dir>/<language>/<file name>.
+
+Usage:
+    python bulk_translate.py catalog/*.xml --target-languages fi sv --output-dir translated --service claude
+"""
+import os
+import sys
+import argparse
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+def bulk_translate(paths, target_languages, output_dir, service_type=None):
+    """Translate XML files into each target language and write the results"""
+    from app.services.translation_factory import TranslationServiceFactory
+    from app.utils.xml_processor import SegmentStats, XMLProcessor
+
+    documents = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            documents.append(f.read())
+
+    processor = XMLProcessor()
+    try:
+        for lang in target_languages:
+            stats = SegmentStats()
+            translated = processor.process_xml_documents(
+                documents,
+                lambda text: TranslationServiceFactory.translate(text, lang, service_type),
+                lambda texts: TranslationServiceFactory.translate_bulk(texts, lang, service_type),
+                stats
+            )
+
+            language_dir = os.path.join(output_dir, lang)
+            os.makedirs(language_dir, exist_ok=True)
+            for path, content in zip(paths, translated):
+                with open(os.path.join(language_dir, os.path.basename(path)), "w", encoding="utf-8") as f:
+                    f.write(content)
+
+            print(f"{lang}: {len(paths)} files, {stats.unique_segments} unique of {stats.total_segments} segments")
+    finally:
+        TranslationServiceFactory.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Translate XML files offline in bulk')
+    parser.add_argument('files', nargs='+', help='XML files to translate')
+    parser.add_argument('--target-languages', nargs='+', required=True, help='Target language codes')
+    parser.add_argument('--output-dir', default='./translated', help='Directory for the translated files')
+    parser.add_argument('--service', help='Translation service (default: TRANSLATION_SERVICE)')
+
+    args = parser.parse_args()
+    bulk_translate(args.files, args.target_languages, args.output_dir, args.service)
@@ -1,41 +1,195 @@
 # download_models.py
+"""
+Build an offline model bundle
+
+Downloads the models of the requested languages in parallel and saves each one
+as a plain local directory under <cache-dir>/models. Every downloaded file is
+checked against the sha256 (LFS files) or git blob id the hub publishes for the
+pinned revision, and a model that does not match fails. Optionally builds the
+optimized artifacts the backend can use (int8 quantized model, ONNX export,
+memory-mapped safetensors store) in the layout the backend expects. Finally it
+writes <cache-dir>/manifest.json with the SHA-256 of every file and the revision
+each model was downloaded from.
+
+Point MODEL_CACHE_DIR at the bundle and the backend loads the listed models
+from their local paths without contacting the Hugging Face hub.
+
+Usage:
+    python download_models.py --cache-dir ./model_cache --languages fi sv de --artifacts onnx safetensors
+    python download_models.py --cache-dir ./model_cache --verify
+"""
 import os
+import sys
+import json
+import shutil
 import argparse
-from transformers import MarianMTModel, MarianTokenizer
-
-# Default model mapping
-DEFAULT_MODELS = {
-    "fi": "Helsinki-NLP/opus-mt-en-fi",  # English to Finnish
-    "sv": "Helsinki-NLP/opus-mt-en-sv",  # English to Swedish
-    "de": "Helsinki-NLP/opus-mt-en-de",  # English to German
-    "fr": "Helsinki-NLP/opus-mt-en-fr",  # English to French
-    "es": "Helsinki-NLP/opus-mt-en-es",  # English to Spanish
-}
-
-def download_models(cache_dir, languages=None):
-    """Download specified models to cache directory"""
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+ARTIFACTS = ("quantized", "onnx", "safetensors")
+
+# Repository files a model needs: configs, tokenizer files and one copy of the weights
+HUB_FILE_SUFFIXES = (".json", ".spm", ".txt")
+HUB_WEIGHT_FILES = ("model.safetensors", "pytorch_model.bin")
+
+def bundle_path(model_name):
+    """Location of a saved model relative to the bundle directory"""
+    return os.path.join("models", model_name.replace("/", "--"))
+
+def hub_checksums(model_name):
+    """Current revision of a model and the published checksum of each file to download"""
+    from huggingface_hub import HfApi
+
+    info = HfApi().model_info(model_name, files_metadata=True)
+    files = {sibling.rfilename: sibling for sibling in info.siblings}
+    weights = next((name for name in HUB_WEIGHT_FILES if name in files), None)
+    if weights is None:
+        raise RuntimeError(f"{model_name} has none of {', '.join(HUB_WEIGHT_FILES)}")
+
+    expected = {}
+    for name, sibling in files.items():
+        if name != weights and (name.startswith(".") or not name.endswith(HUB_FILE_SUFFIXES)):
+            continue
+        if sibling.lfs is not None:
+            expected[name] = {"sha256": sibling.lfs.sha256}
+        elif sibling.blob_id:
+            expected[name] = {"blob_id": sibling.blob_id}
+        else:
+            raise RuntimeError(f"The hub publishes no checksum for {model_name}/{name}")
+    return info.sha, expected
+
+def download_model(cache_dir, lang, model_name):
+    """Download a model's files, check them against the hub's checksums and save them as a local directory"""
+    from huggingface_hub import snapshot_download
+    from app.services.model_manifest import verify_download
+
+    print(f"Downloading model for {lang}: {model_name}")
+    path = os.path.join(cache_dir, bundle_path(model_name))
+    tmp_path = f"{path}.tmp"
+
+    # Pin the revision so the files match the checksums that were looked up
+    revision, expected = hub_checksums(model_name)
+    try:
+        snapshot_download(model_name, revision=revision, local_dir=tmp_path, allow_patterns=list(expected))
+        # Download metadata kept by huggingface_hub is not part of the model
+        shutil.rmtree(os.path.join(tmp_path, ".cache"), ignore_errors=True)
+
+        problems = verify_download(tmp_path, expected)
+        if problems:
+            raise RuntimeError(f"Download of {model_name} does not match the hub: {'; '.join(problems)}")
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+    print(f"Successfully downloaded and verified model for {lang} at revision {revision}")
+    return revision
+
+def build_artifacts(service, cache_dir, lang, model_name, artifacts):
+    """Build the requested optimized artifacts of a saved model; returns their paths relative to cache_dir"""
+    model_path = os.path.join(cache_dir, bundle_path(model_name))
+    paths = {
+        artifact: os.path.relpath(path, cache_dir)
+        for artifact, path in service.export_bundle(lang, model_path, artifacts).items()
+    }
+
+    print(f"Built {', '.join(paths) or 'no'} artifacts for {lang}")
+    return paths
+
+def read_manifest_models(cache_dir):
+    """Model entries of an existing manifest, so a partial run keeps the other languages"""
+    from app.services.model_manifest import MANIFEST_FILE
+
+    path = os.path.join(cache_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("models", {})
+
+def download_models(cache_dir, languages=None, artifacts=(), workers=4):
+    """Download specified models in parallel, build artifacts and write the manifest"""
     os.makedirs(cache_dir, exist_ok=True)
-    
-    models_to_download = DEFAULT_MODELS
+
+    # The backend settings read MODEL_CACHE_DIR, so artifacts land where the service looks for them
+    os.environ["MODEL_CACHE_DIR"] = cache_dir
+    from app.services.huggingface_service import HuggingFaceTranslationService
+    from app.services.model_manifest import checksum_paths, write_manifest
+
+    service = HuggingFaceTranslationService()
+    models_to_download = service.language_models
     if languages:
-        models_to_download = {lang: DEFAULT_MODELS[lang] for lang in languages if lang in DEFAULT_MODELS}
-    
+        models_to_download = {lang: models_to_download[lang] for lang in languages if lang in models_to_download}
+
+    # Downloads are network bound and run in parallel
+    failed = {}
+    revisions = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            lang: executor.submit(download_model, cache_dir, lang, model_name)
+            for lang, model_name in models_to_download.items()
+        }
+        for lang, future in futures.items():
+            try:
+                revisions[lang] = future.result()
+            except Exception as e:
+                failed[lang] = str(e)
+                print(f"Failed to download model for {lang}: {e}")
+
+    # Artifacts are built one at a time: the ONNX exporter keeps global state
+    models = read_manifest_models(cache_dir)
     for lang, model_name in models_to_download.items():
-        print(f"Downloading model for {lang}: {model_name}")
-        
-        # Download tokenizer
-        tokenizer = MarianTokenizer.from_pretrained(model_name, cache_dir=cache_dir)
-        
-        # Download model
-        model = MarianMTModel.from_pretrained(model_name, cache_dir=cache_dir)
-        
-        print(f"Successfully downloaded model for {lang}")
+        if lang in failed:
+            continue
+        try:
+            artifact_paths = build_artifacts(service, cache_dir, lang, model_name, artifacts)
+        except Exception as e:
+            failed[lang] = str(e)
+            print(f"Failed to build artifacts for {lang}: {e}")
+            continue
+
+        path = bundle_path(model_name)
+        models[lang] = {
+            "model_name": model_name,
+            "revision": revisions[lang],
+            "path": path,
+            "artifacts": artifact_paths,
+            "files": checksum_paths(cache_dir, [path, *artifact_paths.values()]),
+        }
+
+    manifest_path = write_manifest(cache_dir, models)
+    print(f"Wrote {manifest_path} with {len(models)} models")
+    return failed
+
+def verify_models(cache_dir):
+    """Check every file of the manifest against its checksum"""
+    from app.services.model_manifest import verify_entry
+
+    problems = 0
+    for lang, entry in read_manifest_models(cache_dir).items():
+        entry_problems = verify_entry(cache_dir, entry)
+        problems += len(entry_problems)
+        status = "ok" if not entry_problems else "; ".join(entry_problems)
+        print(f"{lang}: {status}")
+    return problems
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Download translation models')
     parser.add_argument('--cache-dir', default='./model_cache', help='Cache directory for models')
     parser.add_argument('--languages', nargs='*', help='Language codes to download (default: all)')
-    
+    parser.add_argument('--artifacts', nargs='*', default=[], choices=ARTIFACTS,
+                        help='Optimized artifacts to build for each model')
+    parser.add_argument('--workers', type=int, default=4, help='Number of parallel downloads')
+    parser.add_argument('--verify', action='store_true', help='Verify the checksums of an existing bundle and exit')
+
     args = parser.parse_args()
-    
-    download_models(args.cache_dir, args.languages)
\ No newline at end of file
+    cache_dir = os.path.abspath(args.cache_dir)
+
+    if args.verify:
+        sys.exit(1 if verify_models(cache_dir) else 0)
+
+    failed = download_models(cache_dir, args.languages, args.artifacts, args.workers)
+    sys.exit(1 if failed else 0)